@@ -0,0 +1,108 @@
+import argparse
+import asyncio
+import sys
+import time
+from datetime import timedelta
+
+from backend.app.config import settings
+from backend.app.db.base import SessionLocal, bind_session, engine
+from backend.app.db.migrate import upgrade_schema
+from backend.app.rag.ann import IvfVectorStore
+from backend.app.repository.document import DocumentRepository
+from backend.app.service.document import IngestReport
+from backend.app.service.token_sweeper import RefreshTokenSweeper
+
+
+async def sweep_tokens(args: argparse.Namespace) -> None:
+    sweeper = RefreshTokenSweeper(
+        SessionLocal,
+        interval_seconds=0,
+        batch_size=args.batch_size,
+        grace=timedelta(minutes=args.grace_minutes),
+    )
+    await upgrade_schema(engine)
+    swept = await sweeper.sweep_once()
+    print(f'Swept {swept} refresh tokens in {sweeper.seconds_spent:.3f}s')
+
+
+async def train_index(args: argparse.Namespace) -> None:
+    await upgrade_schema(engine)
+    async with SessionLocal() as session:
+        rows, chunk_ids = await DocumentRepository(session).vector_rows()
+    # train_min_rows is out of reach so open() only maps the store; training happens explicitly below
+    store = IvfVectorStore(settings.EMBEDDING_DIMENSION, args.lists, settings.IVF_NPROBE, sys.maxsize)
+    store.open(args.directory, rows, chunk_ids)
+    started = time.perf_counter()
+    store.train()
+    store.close()
+    print(f'Trained {args.lists} lists over {len(store)} vectors in {time.perf_counter() - started:.1f}s')
+
+
+def _print_progress(report: IngestReport) -> None:
+    print(
+        f'{report.files} files, {report.chunks} chunks '
+        f'({report.files_per_second:.0f} files/s, {report.chunks_per_second:.0f} chunks/s)',
+        flush=True,
+    )
+
+
+async def ingest(args: argparse.Namespace) -> None:
+    from backend.app.core.container import container
+
+    await upgrade_schema(engine)
+    service = container.document_service
+    async with SessionLocal() as session:
+        with bind_session(session):
+            await service.open_index(args.directory)
+            report = await service.ingest_directory(
+                args.root, args.workers, args.max_in_flight, args.commit_chunks,
+                progress=_print_progress if args.progress else None,
+            )
+    await service.close_index()
+    statuses = ', '.join(f'{count} {status}' for status, count in sorted(report.statuses.items()))
+    print(
+        f'Ingested {report.files} files ({statuses}) into {report.chunks} chunks in {report.seconds:.1f}s: '
+        f'{report.files_per_second:.0f} files/s, {report.chunks_per_second:.0f} chunks/s'
+    )
+    for source, error in sorted(report.failed.items()):
+        print(f'  failed {source}: {error}', file=sys.stderr)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='python -m backend.app.cli')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    sweep = commands.add_parser('sweep-tokens', help='delete expired and revoked refresh tokens once')
+    sweep.add_argument('--batch-size', type=int, default=settings.TOKEN_SWEEP_BATCH_SIZE)
+    sweep.add_argument('--grace-minutes', type=int, default=settings.TOKEN_SWEEP_GRACE_MINUTES)
+    sweep.set_defaults(handler=sweep_tokens)
+
+    train = commands.add_parser('train-index', help='(re)train the ivf vector index; run while the app is stopped, it loads the index on start')
+    train.add_argument('--lists', type=int, default=settings.IVF_LISTS)
+    train.add_argument('--directory', default=settings.VECTOR_STORE_DIR)
+    train.set_defaults(handler=train_index)
+
+    ingest_parser = commands.add_parser(
+        'ingest', help='ingest a directory of Markdown, HTML, text and PDF files; run while the app is stopped',
+    )
+    ingest_parser.add_argument('root')
+    ingest_parser.add_argument('--workers', type=int, default=settings.INGEST_WORKERS, help='0 uses one per CPU')
+    ingest_parser.add_argument('--max-in-flight', type=int, default=settings.INGEST_MAX_IN_FLIGHT_FILES)
+    ingest_parser.add_argument('--commit-chunks', type=int, default=settings.INGEST_COMMIT_CHUNKS)
+    ingest_parser.add_argument('--directory', default=settings.VECTOR_STORE_DIR)
+    ingest_parser.add_argument('--progress', action='store_true', help='report throughput after every commit')
+    ingest_parser.set_defaults(handler=ingest)
+
+    return parser
+
+
+async def main(argv: list[str] | None = None) -> None:
+    args = build_parser().parse_args(argv)
+    try:
+        await args.handler(args)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
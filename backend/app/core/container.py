@@ -0,0 +1,71 @@
+from backend.app.config import settings
+from backend.app.rag.ann import IvfVectorStore
+from backend.app.rag.embedding import build_embedder
+from backend.app.rag.embedding_batcher import EmbeddingBatcher
+from backend.app.rag.embedding_cache import CachedEmbedder
+from backend.app.rag.lexical import Bm25Index
+from backend.app.rag.llm import ExtractiveSummarizer, build_generator
+from backend.app.rag.response_cache import ResponseCache
+from backend.app.rag.vector_store import MmapVectorStore
+from backend.app.repository.auth import AuthRepository
+from backend.app.repository.base import UnitOfWork
+from backend.app.repository.conversation import ConversationRepository
+from backend.app.repository.document import DocumentRepository
+from backend.app.repository.ingestion_job import IngestionJobRepository
+from backend.app.repository.user import UserRepository
+from backend.app.service.auth import AuthService
+from backend.app.service.chat import ChatService
+from backend.app.service.conversation import ConversationService
+from backend.app.service.document import DocumentService
+from backend.app.service.ingestion_job import IngestionJobService
+from backend.app.service.user import UserService
+
+
+class Container:
+    # services and repositories are stateless; the request session is bound per request by get_db
+    def __init__(self):
+        self.unit_of_work = UnitOfWork()
+        self.user_repository = UserRepository()
+        self.auth_repository = AuthRepository()
+        self.user_service = UserService(self.user_repository, self.unit_of_work)
+        self.auth_service = AuthService(self.auth_repository)
+        self.embedder = CachedEmbedder(
+            build_embedder(settings), settings.EMBEDDING_CACHE_MEMORY_BYTES, settings.EMBEDDING_CACHE_DISK,
+        )
+        # started from the lifespan; until then embed calls go straight to a worker thread
+        self.embedding_batcher = EmbeddingBatcher(
+            self.embedder, settings.EMBEDDING_BATCH_MAX_ITEMS, settings.EMBEDDING_BATCH_MAX_WAIT_MS,
+        )
+        # opened from the lifespan so the directory follows the settings the app was started with
+        if settings.VECTOR_INDEX == 'ivf':
+            self.vector_store = IvfVectorStore(
+                settings.EMBEDDING_DIMENSION, settings.IVF_LISTS, settings.IVF_NPROBE, settings.IVF_TRAIN_MIN_ROWS,
+            )
+        else:
+            self.vector_store = MmapVectorStore(settings.EMBEDDING_DIMENSION)
+        self.lexical_index = Bm25Index(settings.BM25_K1, settings.BM25_B, settings.BM25_SAVE_EVERY)
+        self.document_repository = DocumentRepository()
+        self.document_service = DocumentService(
+            self.document_repository, self.unit_of_work, self.embedder, self.vector_store, self.embedding_batcher,
+            self.lexical_index,
+        )
+        self.ingestion_job_repository = IngestionJobRepository()
+        self.ingestion_job_service = IngestionJobService(
+            self.ingestion_job_repository, self.document_service, self.unit_of_work,
+        )
+        self.generator = build_generator(settings)
+        self.conversation_repository = ConversationRepository()
+        self.conversation_service = ConversationService(
+            self.conversation_repository, self.unit_of_work, self.generator,
+            ExtractiveSummarizer() if settings.CHAT_SUMMARY_ENABLED else None,
+        )
+        self.response_cache = ResponseCache(
+            settings.EMBEDDING_DIMENSION, settings.CHAT_CACHE_MAX_ENTRIES, settings.CHAT_CACHE_TTL_SECONDS,
+            settings.CHAT_CACHE_SIMILARITY_THRESHOLD,
+        )
+        self.chat_service = ChatService(
+            self.document_service, self.generator, self.conversation_service, self.response_cache,
+        )
+
+
+container = Container()
@@ -3,41 +3,66 @@ from typing import Annotated
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from pydantic import ValidationError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from backend.app.core.container import container
+from backend.app.core.metrics import registry
 from backend.app.core.security import decode_access_token
+from backend.app.core.token_cache import UserSnapshot, token_cache
 from backend.app.db.base import get_db
 from backend.app.model.user import User
-from backend.app.repository.auth import AuthRepository
-from backend.app.repository.user import UserRepository
 from backend.app.schemas.auth import TokenPayload
 from backend.app.service.auth import AuthService
+from backend.app.service.chat import ChatService
+from backend.app.service.conversation import ConversationService
+from backend.app.service.document import DocumentService
+from backend.app.service.ingestion_job import IngestionJobService
 from backend.app.service.user import UserService
 from backend.app.utils.enum import UserRole
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/token")
 
-SessionDep = Annotated[Session, Depends(get_db)]
+token_cache_lookups = registry.counter(
+    "token_cache_lookups_total", "Access-token cache lookups in get_current_user.", ("result",),
+)
+
+SessionDep = Annotated[AsyncSession, Depends(get_db)]
 TokenDep = Annotated[str, Depends(oauth2_scheme)]
 
 
-def get_user_repository(db: SessionDep) -> UserRepository:
-    return UserRepository(db)
+# async providers run inline on the event loop; plain def dependencies would each take a threadpool hop.
+# Depending on SessionDep is what binds the request session the shared services read from.
+async def get_user_service(db: SessionDep) -> UserService:
+    return container.user_service
+
+
+async def get_auth_service(db: SessionDep) -> AuthService:
+    return container.auth_service
+
 
+async def get_document_service(db: SessionDep) -> DocumentService:
+    return container.document_service
 
-def get_user_service(user_repository: Annotated[UserRepository, Depends(get_user_repository)]) -> UserService:
-    return UserService(user_repository)
 
+async def get_ingestion_job_service(db: SessionDep) -> IngestionJobService:
+    return container.ingestion_job_service
 
-def get_auth_repository(db: SessionDep) -> AuthRepository:
-    return AuthRepository(db)
 
+async def get_chat_service(db: SessionDep) -> ChatService:
+    return container.chat_service
 
-def get_auth_service(auth_repository: Annotated[AuthRepository, Depends(get_auth_repository)]) -> AuthService:
-    return AuthService(auth_repository)
 
+async def get_conversation_service(db: SessionDep) -> ConversationService:
+    return container.conversation_service
+
+
+async def get_current_user(db: SessionDep, token: TokenDep) -> UserSnapshot:
+    cached = token_cache.get(token)
+    if registry.enabled:
+        token_cache_lookups.inc(1, "miss" if cached is None else "hit")
+    if cached is not None:
+        return cached.user
 
-def get_current_user(db: SessionDep, token: TokenDep) -> User:
     payload_data = decode_access_token(token)
     try:
         payload = TokenPayload.model_validate(payload_data)
@@ -53,26 +78,29 @@ def get_current_user(db: SessionDep, token: TokenDep) -> User:
             detail="Invalid token type",
         )
 
-    user = db.get(User, payload.sub)
+    generation = token_cache.generation()
+    user = await db.get(User, payload.sub)
     if user is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     if not user.is_active:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Inactive user")
-    return user
+
+    snapshot = UserSnapshot.from_model(user)
+    token_cache.put(token, payload, snapshot, payload_data["exp"], generation)
+    return snapshot
 
 
-CurrentUser = Annotated[User, Depends(get_current_user)]
+CurrentUser = Annotated[UserSnapshot, Depends(get_current_user)]
 
 
-def get_current_active_user(current_user: CurrentUser) -> User:
+def get_current_active_user(current_user: CurrentUser) -> UserSnapshot:
     if not current_user.is_active:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Inactive user")
     return current_user
 
 
-def get_current_active_admin(current_user: CurrentUser) -> User:
-    role_value = current_user.role if isinstance(current_user.role, str) else current_user.role.value
-    if role_value != UserRole.ADMIN.value:
+def get_current_active_admin(current_user: CurrentUser) -> UserSnapshot:
+    if current_user.role != UserRole.ADMIN.value:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="The user doesn't have enough privileges",
@@ -0,0 +1,187 @@
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import time
+from calendar import timegm
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Mapping
+
+from jose import JWTError, jwk, jwt
+
+from backend.app.config import Settings
+
+HMAC_DIGESTS = {
+    'HS256': hashlib.sha256,
+    'HS384': hashlib.sha384,
+    'HS512': hashlib.sha512,
+}
+TIME_CLAIMS = ('exp', 'iat', 'nbf')
+
+
+class TokenError(Exception):
+    pass
+
+
+def _b64encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b'=')
+
+
+def _b64decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + '=' * (-len(segment) % 4))
+
+
+def _numeric_dates(claims: Mapping[str, Any]) -> Dict[str, Any]:
+    normalized = dict(claims)
+    for claim in TIME_CLAIMS:
+        value = normalized.get(claim)
+        if isinstance(value, datetime):
+            normalized[claim] = timegm(value.utctimetuple())
+    return normalized
+
+
+def _check_time_claims(claims: Mapping[str, Any]) -> None:
+    now = time.time()
+    exp = claims.get('exp')
+    if exp is not None and (not isinstance(exp, (int, float)) or exp <= now):
+        raise TokenError('Signature has expired')
+    nbf = claims.get('nbf')
+    if nbf is not None and (not isinstance(nbf, (int, float)) or nbf > now):
+        raise TokenError('The token is not yet valid')
+
+
+class TokenCodec:
+    def encode(self, claims: Mapping[str, Any]) -> str:
+        raise NotImplementedError
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        raise NotImplementedError
+
+
+class HmacTokenCodec(TokenCodec):
+    def __init__(self, algorithm: str, signing_kid: str | None, secrets: Mapping[str | None, str]):
+        if algorithm not in HMAC_DIGESTS:
+            raise ValueError(f'Unsupported HMAC algorithm: {algorithm}')
+        self.algorithm = algorithm
+        self.signing_kid = signing_kid
+        digest = HMAC_DIGESTS[algorithm]
+        # keyed hmac objects are built once and copied per call instead of re-deriving the key
+        self._macs = {kid: hmac.new(secret.encode(), digestmod=digest) for kid, secret in secrets.items()}
+        header = {'alg': algorithm, 'typ': 'JWT'}
+        if signing_kid is not None:
+            header['kid'] = signing_kid
+        self._header_segment = _b64encode(json.dumps(header, separators=(',', ':')).encode())
+        self._signing_mac = self._macs[signing_kid]
+        self._known_headers: Dict[str, str | None] = {}
+
+    def encode(self, claims: Mapping[str, Any]) -> str:
+        payload = json.dumps(_numeric_dates(claims), separators=(',', ':')).encode()
+        signing_input = self._header_segment + b'.' + _b64encode(payload)
+        mac = self._signing_mac.copy()
+        mac.update(signing_input)
+        return (signing_input + b'.' + _b64encode(mac.digest())).decode()
+
+    def _kid_for(self, header_segment: str) -> str | None:
+        if header_segment in self._known_headers:
+            return self._known_headers[header_segment]
+        try:
+            header = json.loads(_b64decode(header_segment))
+        except (ValueError, binascii.Error) as exc:
+            raise TokenError('Invalid header') from exc
+        if not isinstance(header, dict) or header.get('alg') != self.algorithm:
+            raise TokenError('The specified alg value is not allowed')
+        # tokens issued before a key id was configured carry no kid and belong to the signing key
+        kid = header.get('kid', self.signing_kid)
+        # the header is not verified yet: anything but a string would fail the lookup with a TypeError
+        if not (kid is None or isinstance(kid, str)) or kid not in self._macs:
+            raise TokenError('Unknown key id')
+        if len(self._known_headers) < 64:
+            self._known_headers[header_segment] = kid
+        return kid
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        try:
+            header_segment, payload_segment, signature_segment = token.split('.')
+        except ValueError as exc:
+            raise TokenError('Not enough segments') from exc
+
+        mac = self._macs[self._kid_for(header_segment)].copy()
+        mac.update(f'{header_segment}.{payload_segment}'.encode())
+        try:
+            signature = _b64decode(signature_segment)
+        except (ValueError, binascii.Error) as exc:
+            raise TokenError('Invalid signature padding') from exc
+        if not hmac.compare_digest(mac.digest(), signature):
+            raise TokenError('Signature verification failed')
+
+        try:
+            claims = json.loads(_b64decode(payload_segment))
+        except (ValueError, binascii.Error) as exc:
+            raise TokenError('Invalid payload') from exc
+        if not isinstance(claims, dict):
+            raise TokenError('Invalid payload')
+        _check_time_claims(claims)
+        return claims
+
+
+class JoseTokenCodec(TokenCodec):
+    def __init__(
+        self,
+        algorithm: str,
+        signing_kid: str | None,
+        signing_key: Any,
+        verification_keys: Mapping[str | None, Any],
+    ):
+        self.algorithm = algorithm
+        self.signing_kid = signing_kid
+        self._signing_key = self._construct(signing_key)
+        self._verification_keys = {kid: self._construct(key) for kid, key in verification_keys.items()}
+        self._headers = {'kid': signing_kid} if signing_kid is not None else None
+
+    def _construct(self, key: Any) -> jwk.Key:
+        return key if isinstance(key, jwk.Key) else jwk.construct(key, self.algorithm)
+
+    def encode(self, claims: Mapping[str, Any]) -> str:
+        return jwt.encode(dict(claims), self._signing_key, algorithm=self.algorithm, headers=self._headers)
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        try:
+            kid = jwt.get_unverified_header(token).get('kid', self.signing_kid)
+            if not (kid is None or isinstance(kid, str)):
+                raise TokenError('Invalid key id')
+            key = self._verification_keys.get(kid)
+            if key is None:
+                raise TokenError('Unknown key id')
+            return jwt.decode(token, key, algorithms=[self.algorithm])
+        except JWTError as exc:
+            raise TokenError(str(exc)) from exc
+
+
+def _read_key(value: str) -> str:
+    # key settings accept inline PEM or a path to a PEM file
+    if value.lstrip().startswith('-----BEGIN'):
+        return value
+    return Path(value).read_text()
+
+
+def build_token_codec(config: Settings) -> TokenCodec:
+    algorithm = config.ALGORITHM
+    signing_kid = config.JWT_KEY_ID
+
+    if algorithm in HMAC_DIGESTS:
+        secrets: Dict[str | None, str] = {**config.JWT_VERIFICATION_KEYS, signing_kid: config.SECRET_KEY}
+        if config.JWT_BACKEND == 'native':
+            return HmacTokenCodec(algorithm, signing_kid, secrets)
+        return JoseTokenCodec(algorithm, signing_kid, config.SECRET_KEY, secrets)
+
+    if config.JWT_PRIVATE_KEY is None:
+        raise ValueError(f'{algorithm} requires JWT_PRIVATE_KEY')
+    private_key = _read_key(config.JWT_PRIVATE_KEY)
+    public_key = jwk.construct(private_key, algorithm).public_key()
+    verification_keys: Dict[str | None, Any] = {
+        kid: _read_key(key) for kid, key in config.JWT_VERIFICATION_KEYS.items()
+    }
+    verification_keys[signing_kid] = public_key
+    return JoseTokenCodec(algorithm, signing_kid, private_key, verification_keys)
@@ -0,0 +1,213 @@
+import bisect
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Iterable
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from backend.app.config import settings
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = '') -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, *labels: str) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> Iterable[str]:
+        yield f'# HELP {self.name} {self.documentation}'
+        yield f'# TYPE {self.name} counter'
+        for labels, value in sorted(self._values.items()):
+            yield f'{self.name}{_format_labels(self.labelnames, labels)} {value}'
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # per label set: non-cumulative bucket counts (last slot is +Inf), then sum
+        self._series: dict[tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self) -> Iterable[str]:
+        yield f'# HELP {self.name} {self.documentation}'
+        yield f'# TYPE {self.name} histogram'
+        for labels, (counts, total) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, '+Inf'), counts):
+                cumulative += count
+                le = f'le="{bound}"'
+                yield f'{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}'
+            yield f'{self.name}_sum{_format_labels(self.labelnames, labels)} {total}'
+            yield f'{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}'
+
+
+class MetricsRegistry:
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self._metrics: list[Counter | Histogram] = []
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry(enabled=settings.METRICS_ENABLED)
+
+http_request_duration = registry.histogram(
+    'http_request_duration_seconds', 'HTTP request latency by route.', ('method', 'route', 'status'),
+)
+db_statements_per_request = registry.histogram(
+    'db_statements_per_request', 'SQL statements executed per HTTP request.', ('route',), COUNT_BUCKETS,
+)
+db_time_per_request = registry.histogram(
+    'db_time_per_request_seconds', 'Time spent in SQL statements per HTTP request.', ('route',),
+)
+db_statement_duration = registry.histogram(
+    'db_statement_duration_seconds', 'Latency of individual SQL statements.',
+)
+password_hash_duration = registry.histogram(
+    'password_hash_duration_seconds', 'bcrypt hash/verify latency including pool queueing.', ('operation',),
+)
+jwt_duration = registry.histogram(
+    'jwt_duration_seconds', 'JWT encode/decode latency.', ('operation',),
+)
+
+
+@dataclass(slots=True)
+class RequestTimings:
+    db_statements: int = 0
+    db_seconds: float = 0.0
+    password_hash_seconds: float = 0.0
+    jwt_seconds: float = 0.0
+
+
+_current_timings: ContextVar[RequestTimings | None] = ContextVar('request_timings', default=None)
+
+
+def record_password_hash(operation: str, seconds: float) -> None:
+    password_hash_duration.observe(seconds, operation)
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.password_hash_seconds += seconds
+
+
+def record_jwt(operation: str, seconds: float) -> None:
+    jwt_duration.observe(seconds, operation)
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.jwt_seconds += seconds
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    context._metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    elapsed = time.perf_counter() - context._metrics_started
+    db_statement_duration.observe(elapsed)
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.db_statements += 1
+        timings.db_seconds += elapsed
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    sync_engine = engine.sync_engine
+    if not event.contains(sync_engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(sync_engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(sync_engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+def _server_timing(timings: RequestTimings, elapsed: float) -> bytes:
+    return (
+        f'app;dur={elapsed * 1000:.2f}, '
+        f'db;dur={timings.db_seconds * 1000:.2f};desc="{timings.db_statements} statements", '
+        f'bcrypt;dur={timings.password_hash_seconds * 1000:.2f}, '
+        f'jwt;dur={timings.jwt_seconds * 1000:.2f}'
+    ).encode('latin-1')
+
+
+class MetricsMiddleware:
+    def __init__(self, app, server_timing: bool = False):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _current_timings.set(timings)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+                if self.server_timing:
+                    headers = list(message.get('headers', []))
+                    headers.append((b'server-timing', _server_timing(timings, time.perf_counter() - started)))
+                    message = {**message, 'headers': headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            elapsed = time.perf_counter() - started
+            _current_timings.reset(token)
+            route = scope.get('route')
+            route_path = getattr(route, 'path', 'unmatched')
+            http_request_duration.observe(elapsed, scope['method'], route_path, str(status_code))
+            db_statements_per_request.observe(timings.db_statements, route_path)
+            db_time_per_request.observe(timings.db_seconds, route_path)
@@ -1,22 +1,156 @@
+import asyncio
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, Optional
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
 import uuid
 
 from fastapi import HTTPException, status
-from jose import JWTError, jwt
 from passlib.context import CryptContext
 
 from backend.app.config import settings
+from backend.app.core import metrics
+from backend.app.core.jwt_codec import TokenError, build_token_codec
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.PASSWORD_HASH_ROUNDS)
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+def _hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _hash_passwords(passwords: list[str]) -> list[str]:
+    return [pwd_context.hash(password) for password in passwords]
+
+
+def _verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+class PasswordHasher:
+    def __init__(self, workers: int, backend: str = "thread", max_queue: int = 0):
+        if backend not in ("thread", "process"):
+            raise ValueError(f"Unknown password hash backend: {backend}")
+        self.workers = workers
+        self.backend = backend
+        self.max_queue = max_queue
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._lock = threading.Lock()
+        self._executor: Executor | None = None
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.backend == "process":
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers,
+                        thread_name_prefix="password-hash",
+                    )
+            return self._executor
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        # shed load once workers and queue are full instead of piling up behind a burst
+        if not self._slots.acquire(blocking=False):
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many concurrent password operations",
+                headers={"Retry-After": "1"},
+            )
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    async def _run(self, operation: str, fn: Callable[..., Any], *args: Any) -> Any:
+        if not metrics.registry.enabled:
+            return await asyncio.wrap_future(self.submit(fn, *args))
+        started = time.perf_counter()
+        try:
+            return await asyncio.wrap_future(self.submit(fn, *args))
+        finally:
+            metrics.record_password_hash(operation, time.perf_counter() - started)
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", _hash_password, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run("verify", _verify_password, plain_password, hashed_password)
+
+    async def hash_many(self, passwords: list[str], chunk_size: int = 16) -> list[str]:
+        # bulk work bypasses admission control but keeps at most one small chunk per worker in flight,
+        # so interactive logins queue behind a chunk rather than behind the whole import
+        executor = self._get_executor()
+        in_flight = asyncio.Semaphore(self.workers)
+
+        async def run_chunk(chunk: list[str]) -> list[str]:
+            async with in_flight:
+                started = time.perf_counter()
+                hashed = await asyncio.wrap_future(executor.submit(_hash_passwords, chunk))
+                if metrics.registry.enabled:
+                    metrics.record_password_hash("hash_many", time.perf_counter() - started)
+                return hashed
+
+        chunks = [passwords[start:start + chunk_size] for start in range(0, len(passwords), chunk_size)]
+        results = await asyncio.gather(*(run_chunk(chunk) for chunk in chunks))
+        return [hashed for chunk in results for hashed in chunk]
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    backend=settings.PASSWORD_HASH_BACKEND,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+)
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await password_hasher.verify(plain_password, hashed_password)
+
+
+async def get_password_hash(password: str) -> str:
+    return await password_hasher.hash(password)
+
+
+token_codec = build_token_codec(settings)
+
+
+def _encode(payload: Dict[str, Any]) -> str:
+    if not metrics.registry.enabled:
+        return token_codec.encode(payload)
+    started = time.perf_counter()
+    try:
+        return token_codec.encode(payload)
+    finally:
+        metrics.record_jwt("encode", time.perf_counter() - started)
+
+
+def _decode(token: str) -> Dict[str, Any]:
+    if not metrics.registry.enabled:
+        return token_codec.decode(token)
+    started = time.perf_counter()
+    try:
+        return token_codec.decode(token)
+    finally:
+        metrics.record_jwt("decode", time.perf_counter() - started)
+
+
+def _invalid_token(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
 
 
 def create_access_token(subject: str, expires_delta: timedelta | None = None, jti: Optional[str] = None) -> str:
@@ -27,7 +161,7 @@ def create_access_token(subject: str, expires_delta: timedelta | None = None, jt
         "type": "access",
         "jti": jti or str(uuid.uuid4()),
     }
-    return jwt.encode(payload, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    return _encode(payload)
 
 
 def create_refresh_token(
@@ -44,36 +178,26 @@ def create_refresh_token(
         "jti": jti,
         "family_id": family_id,
     }
-    return jwt.encode(payload, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    return _encode(payload)
 
 
 def decode_access_token(token: str) -> Dict[str, Any]:
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-    except JWTError as exc:
-        raise credentials_exception from exc
+        payload = _decode(token)
+    except TokenError as exc:
+        raise _invalid_token("Could not validate credentials") from exc
 
     if payload.get("sub") is None or payload.get("type") != "access":
-        raise credentials_exception
+        raise _invalid_token("Could not validate credentials")
     return payload
 
 
 def decode_refresh_token(token: str) -> Dict[str, Any]:
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Invalid refresh token",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-    except JWTError as exc:
-        raise credentials_exception from exc
+        payload = _decode(token)
+    except TokenError as exc:
+        raise _invalid_token("Invalid refresh token") from exc
 
     if payload.get("sub") is None or payload.get("type") != "refresh":
-        raise credentials_exception
+        raise _invalid_token("Invalid refresh token")
     return payload
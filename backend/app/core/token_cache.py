@@ -0,0 +1,97 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from backend.app.config import settings
+from backend.app.model.user import User
+from backend.app.schemas.auth import TokenPayload
+
+
+@dataclass(frozen=True, slots=True)
+class UserSnapshot:
+    user_id: int
+    name: str
+    role: str
+    is_active: bool
+
+    @classmethod
+    def from_model(cls, model: User) -> "UserSnapshot":
+        role = model.role if isinstance(model.role, str) else model.role.value
+        return cls(user_id=model.user_id, name=model.name, role=role, is_active=model.is_active)
+
+
+@dataclass(frozen=True, slots=True)
+class CachedToken:
+    payload: TokenPayload
+    user: UserSnapshot
+    expires_at: float
+
+
+class TokenCache:
+    def __init__(self, maxsize: int, ttl_seconds: float):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        # keyed by the full encoded token so a hit implies the signature was already verified
+        self._entries: OrderedDict[str, CachedToken] = OrderedDict()
+        self._tokens_by_user: dict[int, set[str]] = {}
+        # bumped by every invalidation; each user keeps the generation of its latest one (one int per user)
+        self._generation = 0
+        self._invalidated: dict[int, int] = {}
+        self._cleared = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, token: str) -> CachedToken | None:
+        entry = self._entries.get(token)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.time():
+            self._discard(token)
+            return None
+        self._entries.move_to_end(token)
+        return entry
+
+    def generation(self) -> int:
+        # taken before the user is read, so put() can tell whether an invalidation landed in between
+        return self._generation
+
+    def put(self, token: str, payload: TokenPayload, user: UserSnapshot, token_exp: float, generation: int) -> None:
+        if self.maxsize <= 0:
+            return
+        if max(self._cleared, self._invalidated.get(user.user_id, 0)) > generation:
+            # the snapshot was read before the user changed; caching it would outlive the invalidation
+            return
+        expires_at = min(token_exp, time.time() + self.ttl_seconds)
+        self._discard(token)
+        self._entries[token] = CachedToken(payload=payload, user=user, expires_at=expires_at)
+        self._tokens_by_user.setdefault(user.user_id, set()).add(token)
+        while len(self._entries) > self.maxsize:
+            oldest = next(iter(self._entries))
+            self._discard(oldest)
+
+    def invalidate_user(self, user_id: int) -> None:
+        self._generation += 1
+        self._invalidated[user_id] = self._generation
+        for token in self._tokens_by_user.pop(user_id, ()):
+            self._entries.pop(token, None)
+
+    def clear(self) -> None:
+        self._generation += 1
+        self._cleared = self._generation
+        self._invalidated.clear()
+        self._entries.clear()
+        self._tokens_by_user.clear()
+
+    def _discard(self, token: str) -> None:
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return
+        tokens = self._tokens_by_user.get(entry.user.user_id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[entry.user.user_id]
+
+
+token_cache = TokenCache(maxsize=settings.TOKEN_CACHE_SIZE, ttl_seconds=settings.TOKEN_CACHE_TTL_SECONDS)
@@ -1,18 +1,89 @@
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
 
 from backend import base_path
+from backend.app.config import settings
+
+
+def _apply_sqlite_pragmas(dbapi_connection, _connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f'PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}')
+    cursor.execute(f'PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}')
+    cursor.execute(f'PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}')
+    cursor.execute(f'PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE}')
+    cursor.close()
+
+
+def build_engine(database_url: str) -> AsyncEngine:
+    parsed = make_url(database_url)
+    options = {'echo': settings.DB_ECHO}
 
-url = f'sqlite:///{base_path}/dev.db'
-engine = create_engine(url, echo=True, connect_args={"check_same_thread": False})
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    if parsed.get_backend_name() == 'sqlite':
+        if parsed.database in (None, '', ':memory:'):
+            return create_async_engine(database_url, **options)
+        sqlite_engine = create_async_engine(
+            database_url,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+            **options,
+        )
+        event.listen(sqlite_engine.sync_engine, 'connect', _apply_sqlite_pragmas)
+        return sqlite_engine
+
+    return create_async_engine(
+        database_url,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        **options,
+    )
+
+
+url = settings.DATABASE_URL or f'sqlite+aiosqlite:///{base_path}/dev.db'
+engine = build_engine(url)
+SessionLocal = async_sessionmaker(bind=engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
 
 
-def get_db():
-    db = SessionLocal()
+_current_session: ContextVar[AsyncSession | None] = ContextVar('current_session', default=None)
+
+
+def current_session() -> AsyncSession:
+    session = _current_session.get()
+    if session is None:
+        raise RuntimeError('No database session is bound to the current request')
+    return session
+
+
+@contextmanager
+def bind_session(session: AsyncSession) -> Iterator[AsyncSession]:
+    token = _current_session.set(session)
     try:
-        yield db
+        yield session
     finally:
-        db.close()
+        _current_session.reset(token)
+
+
+class SessionBound:
+    # process-wide repositories leave db unset and use whichever session the current request bound
+    def __init__(self, db: AsyncSession | None = None):
+        self._db = db
+
+    @property
+    def db(self) -> AsyncSession:
+        return self._db if self._db is not None else current_session()
+
+
+async def get_db():
+    async with SessionLocal() as db:
+        with bind_session(db):
+            yield db
@@ -0,0 +1,42 @@
+import asyncio
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from backend.app.db.base import Base, engine
+from backend.app.model import conversation, document, ingestion_job, refresh_token, user  # noqa: F401
+
+
+def _upgrade(conn: Connection) -> None:
+    Base.metadata.create_all(conn)
+    # create_all skips tables that already exist, so columns and indexes added later are applied one by one
+    inspector = inspect(conn)
+    preparer = conn.dialect.identifier_preparer
+    for table in Base.metadata.sorted_tables:
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            if not column.nullable:
+                raise RuntimeError(f'Cannot add NOT NULL column {table.name}.{column.name} to an existing table')
+            conn.execute(text(
+                f'ALTER TABLE {preparer.format_table(table)} '
+                f'ADD COLUMN {preparer.format_column(column)} {column.type.compile(dialect=conn.dialect)}'
+            ))
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+
+async def upgrade_schema(target: AsyncEngine) -> None:
+    async with target.begin() as conn:
+        await conn.run_sync(_upgrade)
+
+
+async def main() -> None:
+    await upgrade_schema(engine)
+    await engine.dispose()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
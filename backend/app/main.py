@@ -1,40 +1,85 @@
 from contextlib import asynccontextmanager
+from datetime import timedelta
 
 from fastapi import FastAPI
+from sqlalchemy import select
 import uvicorn
 
 from backend.app.config import settings
-from backend.app.core.security import get_password_hash
-from backend.app.db.base import Base, SessionLocal, engine
+from backend.app.core.container import container
+from backend.app.core.metrics import MetricsMiddleware, instrument_engine
+from backend.app.core.security import get_password_hash, password_hasher
+from backend.app.db.base import SessionLocal, bind_session, engine
+from backend.app.db.migrate import upgrade_schema
 from backend.app.model.user import User
-from backend.app.router import auth, user
+from backend.app.router import auth, chat, conversation, document, ingestion_job, metrics, user
+from backend.app.service.ingestion_worker import IngestionWorkerPool
+from backend.app.service.token_sweeper import RefreshTokenSweeper
 from backend.app.utils.enum import UserRole
 
 
 @asynccontextmanager
-async def lifespan(_: FastAPI):
-    Base.metadata.create_all(bind=engine)
+async def lifespan(application: FastAPI):
+    await upgrade_schema(engine)
 
     if settings.ADMIN_NAME and settings.ADMIN_PASSWORD:
-        with SessionLocal() as session:
-            existing_admin = session.query(User).filter(User.name == settings.ADMIN_NAME).first()
+        async with SessionLocal() as session:
+            existing_admin = (await session.scalars(select(User).where(User.name == settings.ADMIN_NAME))).first()
             if existing_admin is None:
                 admin_user = User(
                     name=settings.ADMIN_NAME,
-                    password=get_password_hash(settings.ADMIN_PASSWORD),
+                    password=await get_password_hash(settings.ADMIN_PASSWORD),
                     role=UserRole.ADMIN.value,
                     is_active=True,
                 )
                 session.add(admin_user)
-                session.commit()
+                await session.commit()
+
+    async with SessionLocal() as session:
+        with bind_session(session):
+            await container.document_service.open_index(settings.VECTOR_STORE_DIR)
+
+    token_sweeper = RefreshTokenSweeper(
+        SessionLocal,
+        interval_seconds=settings.TOKEN_SWEEP_INTERVAL_SECONDS,
+        batch_size=settings.TOKEN_SWEEP_BATCH_SIZE,
+        grace=timedelta(minutes=settings.TOKEN_SWEEP_GRACE_MINUTES),
+    )
+    token_sweeper.start()
+    application.state.token_sweeper = token_sweeper
+    container.embedding_batcher.start()
+    # started after the index is open: a job left running by a previous process resumes from its last batch
+    ingestion_workers = IngestionWorkerPool(
+        SessionLocal,
+        container.ingestion_job_service,
+        workers=settings.INGEST_JOB_WORKERS,
+        poll_seconds=settings.INGEST_JOB_POLL_SECONDS,
+    )
+    ingestion_workers.start()
+    application.state.ingestion_workers = ingestion_workers
 
     yield
 
+    await ingestion_workers.stop()
+    await container.embedding_batcher.stop()
+    await container.document_service.close_index()
+    await token_sweeper.stop()
+    password_hasher.shutdown()
+    await engine.dispose()
+
 
 def create_app() -> FastAPI:
     application = FastAPI(title=settings.NAME, lifespan=lifespan)
     application.include_router(auth.router)
     application.include_router(user.router)
+    application.include_router(document.router)
+    application.include_router(ingestion_job.router)
+    application.include_router(chat.router)
+    application.include_router(conversation.router)
+    if settings.METRICS_ENABLED:
+        instrument_engine(engine)
+        application.add_middleware(MetricsMiddleware, server_timing=settings.SERVER_TIMING_ENABLED)
+        application.include_router(metrics.router)
     return application
 
 
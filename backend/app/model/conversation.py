@@ -0,0 +1,48 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text
+from sqlalchemy.orm import relationship
+
+from backend.app.db.base import Base
+
+
+class Conversation(Base):
+    __tablename__ = 'CONVERSATION'
+    __table_args__ = (
+        Index('ix_conversation_user_updated', 'user_id', 'updated_at'),
+    )
+
+    conversation_id = Column(Integer, primary_key=True, nullable=False, autoincrement=True)
+    user_id = Column(Integer, ForeignKey('USER.user_id'), nullable=False)
+    title = Column(String(255), nullable=True)
+    message_count = Column(Integer, nullable=False, default=0)  # also the seq of the newest message
+    token_count = Column(Integer, nullable=False, default=0)
+    # older turns folded into the summary are never sent to the model again
+    summary = Column(Text, nullable=True)
+    summary_token_count = Column(Integer, nullable=False, default=0)
+    summarized_through = Column(Integer, nullable=False, default=0)  # seq of the last summarised message
+    summarized_token_count = Column(Integer, nullable=False, default=0)  # tokens of the summarised messages
+    created_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+
+    messages = relationship(
+        'ConversationMessage', back_populates='conversation', cascade='all, delete-orphan', passive_deletes=True,
+    )
+
+
+class ConversationMessage(Base):
+    __tablename__ = 'CONVERSATION_MESSAGE'
+    __table_args__ = (
+        # serves "last N turns" as a backwards range scan
+        Index('ux_conversation_message_conversation_seq', 'conversation_id', 'seq', unique=True),
+    )
+
+    message_id = Column(Integer, primary_key=True, nullable=False, autoincrement=True)
+    conversation_id = Column(Integer, ForeignKey('CONVERSATION.conversation_id', ondelete='CASCADE'), nullable=False)
+    seq = Column(Integer, nullable=False)
+    role = Column(String(16), nullable=False)
+    content = Column(Text, nullable=False)
+    token_count = Column(Integer, nullable=False)  # counted once on write so prompt assembly never re-tokenises
+    created_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+
+    conversation = relationship('Conversation', back_populates='messages')
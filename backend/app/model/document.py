@@ -0,0 +1,44 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text
+from sqlalchemy.orm import relationship
+
+from backend.app.db.base import Base
+
+
+class Document(Base):
+    __tablename__ = 'DOCUMENT'
+    __table_args__ = (
+        Index('ux_document_source', 'source', unique=True),
+    )
+
+    document_id = Column(Integer, primary_key=True, nullable=False, autoincrement=True)
+    source = Column(String(512), nullable=False)
+    content_type = Column(String(255), nullable=True)
+    content_hash = Column(String(64), nullable=False)
+    size_bytes = Column(Integer, nullable=False, default=0)
+    chunk_count = Column(Integer, nullable=False, default=0)
+    uploaded_by = Column(Integer, ForeignKey('USER.user_id'), nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+
+    chunks = relationship('DocumentChunk', back_populates='document', cascade='all, delete-orphan', passive_deletes=True)
+
+
+class DocumentChunk(Base):
+    __tablename__ = 'DOCUMENT_CHUNK'
+    __table_args__ = (
+        Index('ux_document_chunk_document_ordinal', 'document_id', 'ordinal', unique=True),
+        Index('ix_document_chunk_vector_row', 'vector_row'),
+    )
+
+    chunk_id = Column(Integer, primary_key=True, nullable=False, autoincrement=True)
+    document_id = Column(Integer, ForeignKey('DOCUMENT.document_id', ondelete='CASCADE'), nullable=False)
+    ordinal = Column(Integer, nullable=False)
+    content = Column(Text, nullable=False)
+    content_hash = Column(String(64), nullable=False)
+    start_offset = Column(Integer, nullable=False)
+    end_offset = Column(Integer, nullable=False)
+    vector_row = Column(Integer, nullable=True)  # row of this chunk's embedding in the vector store file
+
+    document = relationship('Document', back_populates='chunks')
@@ -0,0 +1,39 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, Integer, String, Text, text
+
+from backend.app.db.base import Base
+from backend.app.utils.enum import JobStatus
+
+
+class IngestionJob(Base):
+    __tablename__ = 'INGESTION_JOB'
+    __table_args__ = (
+        Index('ix_ingestion_job_status_job_id', 'status', 'job_id'),
+        # one running job per source: two jobs writing the same document would interleave their chunks
+        Index(
+            'ux_ingestion_job_running_source', 'source', unique=True,
+            sqlite_where=text("status = 'running'"), postgresql_where=text("status = 'running'"),
+        ),
+    )
+
+    job_id = Column(Integer, primary_key=True, nullable=False, autoincrement=True)
+    source = Column(String(512), nullable=False)
+    content_type = Column(String(255), nullable=True)
+    content_hash = Column(String(64), nullable=False)
+    size_bytes = Column(Integer, nullable=False, default=0)
+    file_path = Column(String(1024), nullable=True)  # spooled upload; NULL once dropped for a job that cannot be retried
+    status = Column(String(16), nullable=False, default=JobStatus.QUEUED.value)
+    outcome = Column(String(16), nullable=True)  # created, updated or unchanged once succeeded
+    document_id = Column(Integer, ForeignKey('DOCUMENT.document_id', ondelete='SET NULL'), nullable=True)
+    total_chunks = Column(Integer, nullable=True)
+    committed_chunks = Column(Integer, nullable=False, default=0)  # resume point, written with each chunk batch
+    attempts = Column(Integer, nullable=False, default=0)
+    cancel_requested = Column(Boolean, nullable=False, default=False)
+    error = Column(Text, nullable=True)
+    created_by = Column(Integer, ForeignKey('USER.user_id'), nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    # doubles as the heartbeat of a running job; a running job that stops beating is claimed again
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
@@ -1,6 +1,6 @@
-from datetime import datetime
+from datetime import datetime, timezone
 
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship
 
 from backend.app.db.base import Base
@@ -8,13 +8,19 @@ from backend.app.db.base import Base
 
 class RefreshToken(Base):
     __tablename__ = 'REFRESH_TOKEN'
+    __table_args__ = (
+        Index('ux_refresh_token_jti', 'jti', unique=True),
+        Index('ix_refresh_token_user_family_revoked', 'user_id', 'family_id', 'revoked'),
+        Index('ix_refresh_token_expires_at', 'expires_at'),
+    )
 
     refresh_token_id = Column(Integer, primary_key=True, nullable=False, autoincrement=True)
     user_id = Column(Integer, ForeignKey('USER.user_id'), nullable=False)
     jti = Column(String(255), nullable=False)
     family_id = Column(String(255), nullable=False)
-    issued_at = Column(DateTime, nullable=False, default=datetime.utcnow)
-    expires_at = Column(DateTime, nullable=False)
+    issued_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+    expires_at = Column(DateTime(timezone=True), nullable=False)
     revoked = Column(Boolean, nullable=False, default=False)
+    revoked_at = Column(DateTime(timezone=True), nullable=True)
 
     user = relationship('User', back_populates='refresh_tokens')
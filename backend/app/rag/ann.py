@@ -0,0 +1,172 @@
+import os
+from pathlib import Path
+from typing import Sequence
+
+import numpy as np
+
+from backend.app.rag.vector_store import SEARCH_BLOCK_ROWS, TOMBSTONE, MmapVectorStore, _top_k
+
+UNASSIGNED = -1
+
+
+def _nearest(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    assignments = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), SEARCH_BLOCK_ROWS):
+        block = np.asarray(vectors[start:start + SEARCH_BLOCK_ROWS])
+        assignments[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return assignments
+
+
+def train_centroids(sample: np.ndarray, nlist: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    # spherical k-means: rows are unit vectors, so centroids are re-normalised means
+    rng = np.random.default_rng(seed)
+    nlist = min(nlist, len(sample))
+    centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assignments = _nearest(sample, centroids)
+        order = np.argsort(assignments, kind='stable')
+        counts = np.bincount(assignments, minlength=nlist)
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        filled = counts > 0
+        sums = np.add.reduceat(sample[order], starts[filled], axis=0)
+        centroids[filled] = sums
+        # an empty list takes a random sample as its new seed instead of disappearing
+        centroids[~filled] = sample[rng.choice(len(sample), int((~filled).sum()), replace=False)]
+        centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+    return centroids.astype(np.float32)
+
+
+class IvfVectorStore(MmapVectorStore):
+    # inverted-file index over MmapVectorStore rows: a query only scores rows in its nprobe nearest lists.
+    # Row -> list assignments are memory-mapped next to the vectors, so inserts never rewrite the index.
+    def __init__(self, dimension: int, nlist: int, nprobe: int, train_min_rows: int, train_sample_rows: int = 100_000):
+        super().__init__(dimension)
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.train_min_rows = train_min_rows
+        self.train_sample_rows = train_sample_rows
+        self._centroids: np.ndarray | None = None
+        self._assignments = np.empty(0, dtype=np.int32)
+        self._lists: list[list[np.ndarray]] = []
+
+    @property
+    def trained(self) -> bool:
+        return self._centroids is not None
+
+    def open(self, directory: str | os.PathLike, rows: Sequence[int] = (), ids: Sequence[int] = ()) -> None:
+        self._centroids = None
+        self._assignments = np.empty(0, dtype=np.int32)
+        super().open(directory, rows, ids)
+        # rows past the committed ones are reused by the next append, so their old assignments are void
+        self._assignments[self._rows:] = UNASSIGNED
+        centroids_path = self.directory / 'ivf_centroids.npy'
+        if centroids_path.exists():
+            self._centroids = np.load(centroids_path)
+            self._rebuild_lists()
+        elif self._rows >= self.train_min_rows:
+            self.train()
+
+    @property
+    def _assignments_path(self) -> Path:
+        return Path(self.directory) / 'ivf_assignments.i32'
+
+    def _map(self, capacity: int) -> None:
+        super()._map(capacity)
+        path = self._assignments_path
+        path.touch(exist_ok=True)
+        if capacity * 4 > path.stat().st_size:
+            with open(path, 'r+b') as handle:
+                # new rows start unassigned (-1 is all 0xff bytes)
+                handle.seek(path.stat().st_size)
+                handle.write(b'\xff' * (capacity * 4 - path.stat().st_size))
+        self._assignments = (
+            np.memmap(path, dtype=np.int32, mode='r+', shape=(capacity,))
+            if capacity else np.empty(0, dtype=np.int32)
+        )
+
+    def _rebuild_lists(self) -> None:
+        assignments = np.asarray(self._assignments[:self._rows])
+        # ids past the centroids (assignments from a retrain with more lists) would fall outside every list
+        assignments[assignments >= len(self._centroids)] = UNASSIGNED
+        unassigned = np.flatnonzero(assignments == UNASSIGNED)
+        if len(unassigned):
+            assignments[unassigned] = _nearest(self._vectors[unassigned], self._centroids)
+            self._assignments[unassigned] = assignments[unassigned]
+        order = np.argsort(assignments, kind='stable').astype(np.int64)
+        bounds = np.searchsorted(assignments[order], np.arange(len(self._centroids) + 1))
+        self._lists = [[order[bounds[i]:bounds[i + 1]]] for i in range(len(self._centroids))]
+
+    def train(self, seed: int = 0) -> None:
+        with self._lock:
+            live_rows = np.flatnonzero(self._ids[:self._rows] != TOMBSTONE)
+            if not len(live_rows):
+                return
+            rng = np.random.default_rng(seed)
+            sample_rows = np.sort(rng.choice(live_rows, min(len(live_rows), self.train_sample_rows), replace=False))
+            centroids = train_centroids(np.asarray(self._vectors[sample_rows]), self.nlist, seed=seed)
+            assignments = np.full(len(self._assignments), UNASSIGNED, dtype=np.int32)
+            assignments[:self._rows] = _nearest(self._vectors[:self._rows], centroids)
+            # written beside the live files and renamed over them: a crash never leaves a half-written index,
+            # and a process that still maps the old file keeps writing to the old inode, not the new one
+            self._replace(self._assignments_path, assignments.tofile)
+            self._replace(self.directory / 'ivf_centroids.npy', lambda handle: np.save(handle, centroids))
+            self._centroids = centroids
+            self._map(len(assignments))
+            self._rebuild_lists()
+
+    @staticmethod
+    def _replace(path: Path, write) -> None:
+        temporary = path.with_name(path.name + '.tmp')
+        with open(temporary, 'wb') as handle:
+            write(handle)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temporary, path)
+
+    def append(self, vectors: np.ndarray) -> np.ndarray:
+        rows = super().append(vectors)
+        if self._centroids is not None:
+            assignments = _nearest(np.asarray(vectors, dtype=np.float32), self._centroids)
+            with self._lock:
+                self._assignments[rows] = assignments
+                for list_id in np.unique(assignments):
+                    self._lists[list_id].append(rows[assignments == list_id])
+        return rows
+
+    def flush(self) -> None:
+        super().flush()
+        if isinstance(self._assignments, np.memmap):
+            self._assignments.flush()
+
+    def _probe_rows(self, list_ids: np.ndarray) -> np.ndarray:
+        parts = []
+        for list_id in list_ids:
+            segments = self._lists[list_id]
+            if len(segments) > 1:
+                # fold incremental inserts into one array the first time the list is probed
+                segments[:] = [np.concatenate(segments)]
+            parts.append(segments[0])
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+    def search_many(self, queries: np.ndarray, k: int, nprobe: int | None = None) -> list[list[tuple[int, float]]]:
+        if self._centroids is None:
+            return super().search_many(queries, k)
+        queries = np.asarray(queries, dtype=np.float32)
+        nprobe = min(nprobe or self.nprobe, len(self._centroids))
+        with self._lock:
+            vectors, ids = self._vectors, self._ids
+            probes = np.argpartition(-(queries @ self._centroids.T), nprobe - 1, axis=1)[:, :nprobe]
+            candidates = [self._probe_rows(row_probes) for row_probes in probes]
+
+        results = []
+        for query, rows in zip(queries, candidates):
+            rows = rows[ids[rows] != TOMBSTONE]
+            if not len(rows) or k <= 0:
+                results.append([])
+                continue
+            # rows are gathered in file order so the mapped pages are read sequentially
+            rows.sort()
+            scores = (np.asarray(vectors[rows]) @ query)[None, :]
+            order, top_scores = _top_k(scores, k)
+            results.append([(int(ids[rows[i]]), float(score)) for i, score in zip(order[0], top_scores[0])])
+        return results
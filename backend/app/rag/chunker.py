@@ -0,0 +1,63 @@
+import codecs
+from dataclasses import dataclass
+from typing import BinaryIO, Iterable, Iterator
+
+
+@dataclass(slots=True)
+class TextChunk:
+    ordinal: int
+    text: str
+    start: int
+    end: int
+
+
+def iter_text(stream: BinaryIO, encoding: str = 'utf-8', block_size: int = 64 * 1024) -> Iterator[str]:
+    # incremental decoding so a multi-byte character split across blocks is not mangled
+    decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+    while True:
+        block = stream.read(block_size)
+        if not block:
+            break
+        text = decoder.decode(block)
+        if text:
+            yield text
+    tail = decoder.decode(b'', final=True)
+    if tail:
+        yield tail
+
+
+def _cut_point(buffer: str, size: int) -> int:
+    # prefer ending on whitespace in the second half of the window, otherwise cut hard
+    boundary = max(buffer.rfind(' ', size // 2, size), buffer.rfind('\n', size // 2, size))
+    return boundary + 1 if boundary != -1 else size
+
+
+def _overlap_start(buffer: str, cut: int, overlap: int) -> int:
+    start = max(cut - overlap, 1)
+    # start the overlap on a word boundary when there is one inside it
+    boundary = buffer.find(' ', start, cut)
+    return boundary + 1 if boundary != -1 and boundary + 1 < cut else start
+
+
+def iter_chunks(pieces: Iterable[str], size: int, overlap: int) -> Iterator[TextChunk]:
+    if size <= 0 or not 0 <= overlap < size:
+        raise ValueError('chunk size must be positive and overlap smaller than size')
+
+    buffer = ''
+    offset = 0
+    ordinal = 0
+    for piece in pieces:
+        buffer += piece
+        # only cut once more than a window is buffered, so the boundary search sees the full window
+        while len(buffer) > size:
+            cut = _cut_point(buffer, size)
+            text = buffer[:cut]
+            if text.strip():
+                yield TextChunk(ordinal, text, offset, offset + cut)
+                ordinal += 1
+            step = _overlap_start(buffer, cut, overlap) if overlap else cut
+            buffer = buffer[step:]
+            offset += step
+
+    if buffer.strip():
+        yield TextChunk(ordinal, buffer, offset, offset + len(buffer))
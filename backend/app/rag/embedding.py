@@ -0,0 +1,59 @@
+import hashlib
+import os
+import re
+from functools import lru_cache
+from typing import Sequence
+
+import numpy as np
+
+from backend.app.config import Settings
+
+_TOKEN = re.compile(r'\w+', re.UNICODE)
+
+
+class Embedder:
+    name: str
+    dimension: int
+
+    # called once at startup with the vector store directory, for embedders that keep files next to it
+    def open(self, directory: str | os.PathLike) -> None:
+        pass
+
+    # returns a (len(texts), dimension) float32 array of L2-normalised rows
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        raise NotImplementedError
+
+
+@lru_cache(maxsize=200_000)
+def _feature(token: str, dimension: int) -> tuple[int, float]:
+    digest = int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), 'little')
+    return digest % dimension, 1.0 if digest >> 63 else -1.0
+
+
+class HashingEmbedder(Embedder):
+    # deterministic, offline stand-in for a model: signed feature hashing of unigrams and bigrams
+    name = 'hashing'
+
+    def __init__(self, dimension: int):
+        self.dimension = dimension
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = _TOKEN.findall(text.lower())
+            features = tokens + [f'{left} {right}' for left, right in zip(tokens, tokens[1:])]
+            if not features:
+                continue
+            columns, signs = zip(*(_feature(token, self.dimension) for token in features))
+            vectors[row] = np.bincount(columns, weights=signs, minlength=self.dimension)
+        # sublinear term frequency keeps repeated boilerplate from dominating a chunk
+        vectors = np.sign(vectors) * np.log1p(np.abs(vectors))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors
+
+
+def build_embedder(config: Settings) -> Embedder:
+    if config.EMBEDDING_BACKEND == 'hashing':
+        return HashingEmbedder(config.EMBEDDING_DIMENSION)
+    raise ValueError(f'Unknown embedding backend: {config.EMBEDDING_BACKEND}')
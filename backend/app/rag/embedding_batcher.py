@@ -0,0 +1,141 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Sequence
+
+import numpy as np
+
+from backend.app.core.metrics import registry
+from backend.app.rag.embedding import Embedder
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+embedding_batch_size = registry.histogram(
+    'embedding_batch_size', 'Texts per embed call issued by the micro-batcher.', buckets=BATCH_SIZE_BUCKETS,
+)
+embedding_batch_requests = registry.histogram(
+    'embedding_batch_requests', 'Caller requests coalesced into one embed call.', buckets=BATCH_SIZE_BUCKETS,
+)
+embedding_queue_seconds = registry.histogram(
+    'embedding_queue_seconds', 'Time a request waited in the micro-batcher before its embed call started.',
+)
+
+
+@dataclass(slots=True)
+class _Request:
+    texts: Sequence[str]
+    future: asyncio.Future
+    queued_at: float
+
+
+class EmbeddingBatcher:
+    # coalesces concurrent embed requests into one call of up to max_items texts, waiting at most max_wait_ms
+    # for company under load; requests are never split, so an ingestion batch larger than max_items goes out alone
+    def __init__(self, embedder: Embedder, max_items: int, max_wait_ms: float):
+        self.embedder = embedder
+        self.max_items = max_items
+        self.max_wait = max_wait_ms / 1000
+        self.batches = 0
+        self.texts = 0
+        self._queue: asyncio.Queue[_Request] | None = None
+        self._pending: list[_Request] = []  # taken off the queue, not answered yet
+        self._last_requests = 0
+        self._task: asyncio.Task | None = None
+
+    def _owns_loop(self) -> bool:
+        return self._task is not None and self._task.get_loop() is asyncio.get_running_loop()
+
+    async def embed(self, texts: Sequence[str]) -> np.ndarray:
+        if not self._owns_loop():
+            # not started (CLI, scripts, batching disabled) or called from another event loop:
+            # embed directly off the loop
+            return await asyncio.to_thread(self.embedder.embed, texts)
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait(_Request(texts, future, time.perf_counter()))
+        return await future
+
+    async def _next_batch(self) -> list[_Request]:
+        batch = self._pending = [await self._queue.get()]
+        size = len(batch[0].texts)
+        # only wait for company when the last call actually had some; a lone caller goes out at once
+        deadline = time.perf_counter() + (self.max_wait if self._last_requests > 1 else 0)
+        while size < self.max_items:
+            # whatever queued up while the previous call ran is taken without waiting
+            if self._queue.empty():
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    request = await asyncio.wait_for(self._queue.get(), remaining)
+                except TimeoutError:
+                    break
+            else:
+                request = self._queue.get_nowait()
+            batch.append(request)
+            size += len(request.texts)
+        return batch
+
+    async def _run_batch(self, batch: list[_Request]) -> None:
+        # callers that gave up (client disconnects) are dropped before paying for their texts
+        batch = [request for request in batch if not request.future.done()]
+        if not batch:
+            return
+        self._last_requests = len(batch)
+        texts = [text for request in batch for text in request.texts]
+        started = time.perf_counter()
+        try:
+            vectors = await asyncio.to_thread(self.embedder.embed, texts)
+        except Exception as exc:
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_exception(exc)
+            return
+
+        offset = 0
+        for request in batch:
+            end = offset + len(request.texts)
+            if not request.future.done():
+                request.future.set_result(vectors[offset:end])
+            offset = end
+        self.batches += 1
+        self.texts += len(texts)
+        if registry.enabled:
+            embedding_batch_size.observe(len(texts))
+            embedding_batch_requests.observe(len(batch))
+            for request in batch:
+                embedding_queue_seconds.observe(started - request.queued_at)
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            try:
+                await self._run_batch(batch)
+            except Exception:
+                logger.exception("Embedding batch failed")
+            self._pending = []
+
+    def start(self) -> None:
+        if self.max_items > 0 and self._task is None:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run(), name="embedding-batcher")
+
+    async def stop(self) -> None:
+        if not self._owns_loop():
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        # requests caught mid-batch or still queued are answered directly rather than left hanging
+        leftovers = self._pending
+        while not self._queue.empty():
+            leftovers.append(self._queue.get_nowait())
+        self._pending, self._queue = [], None
+        for request in leftovers:
+            if not request.future.done():
+                request.future.set_result(await asyncio.to_thread(self.embedder.embed, request.texts))
@@ -0,0 +1,129 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Sequence
+
+import numpy as np
+
+from backend.app.core.metrics import registry
+from backend.app.rag.embedding import Embedder
+
+# rough per-entry cost of the key, the bytes object and the OrderedDict slot on top of the vector itself
+ENTRY_OVERHEAD_BYTES = 150
+SQLITE_MAX_PARAMS = 500
+
+embedding_cache_lookups = registry.counter(
+    'embedding_cache_lookups_total', 'Embedding cache lookups by the tier that answered.', ('result',),
+)
+
+
+class CachedEmbedder(Embedder):
+    # content-addressed cache in front of another embedder: an LRU of recent vectors in memory, backed by
+    # a SQLite file of raw float32 blobs, so unchanged text and repeated queries never reach the model
+    def __init__(self, inner: Embedder, memory_bytes: int, disk: bool = True):
+        self.inner = inner
+        self.name = inner.name
+        self.dimension = inner.dimension
+        self.memory_bytes = memory_bytes
+        self.disk = disk
+        self.hits = {'memory': 0, 'disk': 0}
+        self.misses = 0
+        self._memory: OrderedDict[bytes, bytes] = OrderedDict()
+        self._memory_used = 0
+        self._lock = threading.Lock()
+        self._db: sqlite3.Connection | None = None
+
+    def open(self, directory: str | os.PathLike) -> None:
+        self.inner.open(directory)
+        if not self.disk:
+            return
+        self.close()
+        # one file per model, so switching backends or dimensions never serves stale vectors
+        path = Path(directory) / f'embeddings-{self.name}-{self.dimension}.sqlite3'
+        path.parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        db.execute('PRAGMA journal_mode=WAL')
+        db.execute('PRAGMA synchronous=NORMAL')
+        db.execute('CREATE TABLE IF NOT EXISTS embedding (key BLOB PRIMARY KEY, vector BLOB NOT NULL) WITHOUT ROWID')
+        with self._lock:
+            self._db = db
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def _remember(self, key: bytes, blob: bytes) -> None:
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return
+        self._memory[key] = blob
+        self._memory_used += len(blob) + ENTRY_OVERHEAD_BYTES
+        while self._memory_used > self.memory_bytes and self._memory:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_used -= len(evicted) + ENTRY_OVERHEAD_BYTES
+
+    def _read_disk(self, keys: list[bytes]) -> dict[bytes, bytes]:
+        found: dict[bytes, bytes] = {}
+        for start in range(0, len(keys), SQLITE_MAX_PARAMS):
+            batch = keys[start:start + SQLITE_MAX_PARAMS]
+            placeholders = ','.join('?' * len(batch))
+            found.update(self._db.execute(f'SELECT key, vector FROM embedding WHERE key IN ({placeholders})', batch))
+        return found
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        if not self.memory_bytes and self._db is None:
+            return self.inner.embed(texts)
+
+        keys = [hashlib.sha256(text.encode()).digest() for text in texts]
+        unique = dict(zip(keys, texts))
+        found: dict[bytes, bytes] = {}
+        with self._lock:
+            for key in unique:
+                blob = self._memory.get(key)
+                if blob is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = blob
+            memory_hits = len(found)
+
+            if self._db is not None and len(found) < len(unique):
+                disk_found = self._read_disk([key for key in unique if key not in found])
+                for key, blob in disk_found.items():
+                    found[key] = blob
+                    if self.memory_bytes:
+                        self._remember(key, blob)
+        disk_hits = len(found) - memory_hits
+
+        missing = [key for key in unique if key not in found]
+        if missing:
+            # the model runs outside the lock so concurrent callers only serialise on the cheap parts
+            vectors = np.asarray(self.inner.embed([unique[key] for key in missing]), dtype=np.float32)
+            blobs = [row.tobytes() for row in vectors]
+            found.update(zip(missing, blobs))
+            with self._lock:
+                if self.memory_bytes:
+                    for key, blob in zip(missing, blobs):
+                        self._remember(key, blob)
+                if self._db is not None:
+                    # one transaction per batch; autocommit would pay a commit per row
+                    self._db.execute('BEGIN')
+                    self._db.executemany('INSERT OR IGNORE INTO embedding (key, vector) VALUES (?, ?)', zip(missing, blobs))
+                    self._db.execute('COMMIT')
+
+        with self._lock:
+            self.hits['memory'] += memory_hits
+            self.hits['disk'] += disk_hits
+            self.misses += len(missing)
+        if registry.enabled:
+            embedding_cache_lookups.inc(memory_hits, 'memory')
+            embedding_cache_lookups.inc(disk_hits, 'disk')
+            embedding_cache_lookups.inc(len(missing), 'miss')
+
+        result = np.empty((len(keys), self.dimension), dtype=np.float32)
+        for row, key in enumerate(keys):
+            result[row] = np.frombuffer(found[key], dtype=np.float32)
+        return result
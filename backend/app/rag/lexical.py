@@ -0,0 +1,194 @@
+import math
+import os
+import re
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Sequence
+
+import numpy as np
+
+from backend.app.rag.vector_store import TOMBSTONE, _top_k
+
+_TOKEN = re.compile(r'\w+', re.UNICODE)
+MAX_TF = np.iinfo(np.uint16).max
+
+
+def tokenize(text: str) -> list[str]:
+    # identifiers stay whole, so OAuth2PasswordRequestForm is one term that only matches itself
+    return _TOKEN.findall(text.lower())
+
+
+class Bm25Index:
+    # inverted index with one (doc slots int32, term frequencies uint16) postings pair per term. Slots follow
+    # the vector store's lifecycle: append before commit, activate with chunk ids after it, delete as tombstones.
+    # Snapshots go to bm25.npz with dead slots dropped; anything newer is reconciled from the database on open.
+    def __init__(self, k1: float = 1.2, b: float = 0.75, save_every: int = 10_000):
+        self.k1 = k1
+        self.b = b
+        self.save_every = save_every
+        self.directory: Path | None = None
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._terms: dict[str, int] = {}
+        self._docs: list[list[np.ndarray]] = []
+        self._tfs: list[list[np.ndarray]] = []
+        self._ids = np.empty(0, dtype=np.int64)
+        self._lengths = np.empty(0, dtype=np.int32)
+        self._slots = 0
+        self._slot_of: dict[int, int] = {}
+        self._live_length = 0
+        self.changes = 0
+
+    @property
+    def _path(self) -> Path:
+        return self.directory / 'bm25.npz'
+
+    def open(self, directory: str | os.PathLike) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            self._reset()
+            if not self._path.exists():
+                return
+            with np.load(self._path) as snapshot:
+                terms = snapshot['terms'].tobytes().decode().split('\n') if snapshot['terms'].size else []
+                offsets, docs, tfs = snapshot['offsets'], snapshot['docs'], snapshot['tfs']
+                self._ids, self._lengths = snapshot['ids'], snapshot['lengths']
+            self._terms = {term: index for index, term in enumerate(terms)}
+            self._docs = [[docs[offsets[i]:offsets[i + 1]]] for i in range(len(terms))]
+            self._tfs = [[tfs[offsets[i]:offsets[i + 1]]] for i in range(len(terms))]
+            self._slots = len(self._ids)
+            self._slot_of = {int(chunk_id): slot for slot, chunk_id in enumerate(self._ids)}
+            self._live_length = int(self._lengths.sum())
+
+    def ids(self) -> set[int]:
+        with self._lock:
+            return set(self._slot_of)
+
+    def _grow(self, needed: int) -> None:
+        capacity = max(needed, 2 * len(self._ids), 1_024)
+        ids = np.full(capacity, TOMBSTONE, dtype=np.int64)
+        ids[:self._slots] = self._ids[:self._slots]
+        lengths = np.zeros(capacity, dtype=np.int32)
+        lengths[:self._slots] = self._lengths[:self._slots]
+        self._ids, self._lengths = ids, lengths
+
+    # tokenises texts into fresh slots and returns them; the slots match nothing until activated
+    def append(self, texts: Sequence[str]) -> np.ndarray:
+        counts = [Counter(tokenize(text)) for text in texts]
+        with self._lock:
+            start = self._slots
+            if start + len(texts) > len(self._ids):
+                self._grow(start + len(texts))
+            postings: dict[int, tuple[list[int], list[int]]] = {}
+            for slot, terms in enumerate(counts, start):
+                self._lengths[slot] = sum(terms.values())
+                for term, tf in terms.items():
+                    term_id = self._terms.setdefault(term, len(self._terms))
+                    docs, tfs = postings.setdefault(term_id, ([], []))
+                    docs.append(slot)
+                    tfs.append(min(tf, MAX_TF))
+            # one array segment per term per batch; segments are merged the first time a query reads them
+            for term_id, (docs, tfs) in postings.items():
+                if term_id == len(self._docs):
+                    self._docs.append([])
+                    self._tfs.append([])
+                self._docs[term_id].append(np.array(docs, dtype=np.int32))
+                self._tfs[term_id].append(np.array(tfs, dtype=np.uint16))
+            self._slots = start + len(texts)
+        return np.arange(start, start + len(texts), dtype=np.int64)
+
+    def activate(self, slots: Sequence[int], ids: Sequence[int]) -> None:
+        slots = np.asarray(slots, dtype=np.int64)
+        with self._lock:
+            self._ids[slots] = np.asarray(ids, dtype=np.int64)
+            self._slot_of.update(zip(map(int, ids), map(int, slots)))
+            self._live_length += int(self._lengths[slots].sum())
+            self.changes += len(slots)
+        self._maybe_save()
+
+    def delete(self, ids: Sequence[int]) -> None:
+        with self._lock:
+            slots = [self._slot_of.pop(chunk_id) for chunk_id in map(int, ids) if chunk_id in self._slot_of]
+            self._ids[slots] = TOMBSTONE
+            self._live_length -= int(self._lengths[slots].sum())
+            self.changes += len(slots)
+        self._maybe_save()
+
+    def _maybe_save(self) -> None:
+        if self.changes >= self.save_every and self.directory is not None and not self._save_lock.locked():
+            threading.Thread(target=self.save, name='bm25-snapshot', daemon=True).start()
+
+    def _postings(self, term_id: int) -> tuple[np.ndarray, np.ndarray]:
+        docs, tfs = self._docs[term_id], self._tfs[term_id]
+        if len(docs) > 1:
+            docs[:] = [np.concatenate(docs)]
+            tfs[:] = [np.concatenate(tfs)]
+        return docs[0], tfs[0]
+
+    def search(self, query: str, k: int) -> list[tuple[int, float]]:
+        with self._lock:
+            ids, lengths, live = self._ids, self._lengths, len(self._slot_of)
+            postings = [self._postings(self._terms[term]) for term in set(tokenize(query)) if term in self._terms]
+            average_length = self._live_length / live if live else 0.0
+        if not postings or not live or k <= 0:
+            return []
+
+        scores = np.zeros(len(ids), dtype=np.float32)
+        for docs, tfs in postings:
+            alive = ids[docs] != TOMBSTONE
+            docs, tfs = docs[alive], tfs[alive].astype(np.float32)
+            if not len(docs):
+                continue
+            idf = math.log(1 + (live - len(docs) + 0.5) / (len(docs) + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * lengths[docs] / average_length)
+            scores[docs] += idf * tfs * (self.k1 + 1) / (tfs + norm)
+
+        candidates = np.flatnonzero(scores)
+        if not len(candidates):
+            return []
+        order, top_scores = _top_k(scores[candidates][None, :], k)
+        return [(int(ids[candidates[i]]), float(score)) for i, score in zip(order[0], top_scores[0])]
+
+    def save(self) -> None:
+        if self.directory is None:
+            return
+        with self._save_lock:
+            with self._lock:
+                live = self._ids[:self._slots] != TOMBSTONE
+                # snapshots keep only live slots, renumbered densely; the in-memory slots stay as they are
+                # because ingests in flight still hold theirs
+                remap = np.full(self._slots, -1, dtype=np.int64)
+                remap[live] = np.arange(int(live.sum()))
+                terms, docs, tfs, sizes = [], [], [], []
+                for term, term_id in self._terms.items():
+                    term_docs, term_tfs = self._postings(term_id)
+                    keep = live[term_docs]
+                    if keep.any():
+                        terms.append(term)
+                        docs.append(remap[term_docs[keep]].astype(np.int32))
+                        tfs.append(term_tfs[keep])
+                        sizes.append(int(keep.sum()))
+                ids, lengths = self._ids[:self._slots][live], self._lengths[:self._slots][live]
+                self.changes = 0
+
+            offsets = np.zeros(len(sizes) + 1, dtype=np.int64)
+            np.cumsum(sizes, out=offsets[1:])
+            temporary = self._path.with_suffix('.tmp.npz')
+            np.savez(
+                temporary,
+                terms=np.frombuffer('\n'.join(terms).encode(), dtype=np.uint8),
+                offsets=offsets,
+                docs=np.concatenate(docs) if docs else np.empty(0, dtype=np.int32),
+                tfs=np.concatenate(tfs) if tfs else np.empty(0, dtype=np.uint16),
+                ids=ids,
+                lengths=lengths,
+            )
+            os.replace(temporary, self._path)
+
+    def __len__(self) -> int:
+        return len(self._slot_of)
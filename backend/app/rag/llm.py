@@ -0,0 +1,63 @@
+import asyncio
+import re
+from typing import AsyncIterator, Sequence
+
+from backend.app.config import Settings
+
+_WORD = re.compile(r'\S+\s*')
+_TOKEN = re.compile(r'\w+|[^\w\s]', re.UNICODE)
+_SENTENCE = re.compile(r'(?<=[.!?])\s')
+
+
+def count_tokens(text: str) -> int:
+    # words and punctuation marks; close enough to a BPE count for budgeting when the model has no tokenizer
+    return len(_TOKEN.findall(text))
+
+
+class ChatGenerator:
+    # yields answer text piece by piece; closing the iterator must stop upstream generation
+    def stream(self, prompt: str, max_tokens: int) -> AsyncIterator[str]:
+        raise NotImplementedError
+
+    def count_tokens(self, text: str) -> int:
+        return count_tokens(text)
+
+
+class FakeChatGenerator(ChatGenerator):
+    # offline stand-in for a model: replays the retrieved context word by word at a fixed pace
+    def __init__(self, tokens_per_second: float):
+        self.delay = 1 / tokens_per_second if tokens_per_second > 0 else 0.0
+
+    async def stream(self, prompt: str, max_tokens: int) -> AsyncIterator[str]:
+        _, _, context = prompt.partition('Context:\n')
+        words = _WORD.findall(context.partition('\n\nQuestion:')[0]) or ["I", " don't", " know."]
+        for word in words[:max_tokens]:
+            # sleeping even at zero delay yields to the loop like a network read would
+            await asyncio.sleep(self.delay)
+            yield word
+
+
+class Summarizer:
+    # folds conversation turns that fell out of the context window into the running summary
+    async def summarize(self, summary: str | None, turns: Sequence[tuple[str, str]], max_tokens: int) -> str:
+        raise NotImplementedError
+
+
+class ExtractiveSummarizer(Summarizer):
+    # offline stand-in for a model: keeps the first sentence of each turn, dropping the oldest lines past max_tokens
+    async def summarize(self, summary: str | None, turns: Sequence[tuple[str, str]], max_tokens: int) -> str:
+        lines = summary.split('\n') if summary else []
+        lines += [f"{role}: {_SENTENCE.split(content.strip(), 1)[0]}" for role, content in turns]
+        kept, tokens = [], 0
+        for line in reversed(lines):
+            tokens += count_tokens(line)
+            if tokens > max_tokens:
+                break
+            kept.append(line)
+        return '\n'.join(reversed(kept))
+
+
+def build_generator(config: Settings) -> ChatGenerator:
+    if config.LLM_BACKEND == 'fake':
+        return FakeChatGenerator(config.LLM_FAKE_TOKENS_PER_SECOND)
+    raise ValueError(f'Unknown LLM backend: {config.LLM_BACKEND}')
@@ -0,0 +1,118 @@
+import hashlib
+import io
+import mimetypes
+import os
+import re
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from typing import BinaryIO, Iterator
+
+from pypdf import PdfReader
+
+from backend.app.rag.chunker import TextChunk, iter_chunks, iter_text
+
+HTML_SUFFIXES = ('.html', '.htm')
+TEXT_SUFFIXES = ('.md', '.markdown', '.mdx', '.rst', '.txt')
+SUPPORTED_SUFFIXES = TEXT_SUFFIXES + HTML_SUFFIXES + ('.pdf',)
+
+_BLANK_LINES = re.compile(r'\n\s*\n\s*')
+
+
+class _TextExtractor(HTMLParser):
+    # visible text only; block-level tags become line breaks so chunk boundaries can still find them
+    SKIPPED = {'script', 'style', 'template', 'noscript', 'head'}
+    BLOCKS = {'p', 'div', 'br', 'li', 'tr', 'section', 'article', 'pre', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: list[str] = []
+        self._skipping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIPPED:
+            self._skipping += 1
+        elif tag in self.BLOCKS:
+            self.parts.append('\n')
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIPPED:
+            self._skipping = max(0, self._skipping - 1)
+        elif tag in self.BLOCKS:
+            self.parts.append('\n')
+
+    def handle_data(self, data):
+        if not self._skipping:
+            self.parts.append(data)
+
+
+def _html_text(data: bytes) -> str:
+    extractor = _TextExtractor()
+    extractor.feed(data.decode('utf-8', errors='replace'))
+    extractor.close()
+    return _BLANK_LINES.sub('\n\n', ''.join(extractor.parts)).strip()
+
+
+def _pdf_text(data: bytes) -> str:
+    return '\n\n'.join(page.extract_text() or '' for page in PdfReader(io.BytesIO(data)).pages)
+
+
+def extract_text(data: bytes, suffix: str) -> str:
+    suffix = suffix.lower()
+    if suffix in HTML_SUFFIXES:
+        return _html_text(data)
+    if suffix == '.pdf':
+        return _pdf_text(data)
+    return data.decode('utf-8', errors='replace')
+
+
+def iter_file_text(stream: BinaryIO, suffix: str) -> Iterator[str]:
+    # plain text is decoded a block at a time; HTML and PDF need the whole file to extract from
+    if suffix.lower() in HTML_SUFFIXES + ('.pdf',):
+        yield extract_text(stream.read(), suffix)
+    else:
+        yield from iter_text(stream)
+
+
+@dataclass(slots=True)
+class ParsedFile:
+    source: str
+    content_type: str | None
+    digest: str
+    size: int
+    chunks: list[TextChunk] | None = None  # None when unchanged or failed
+    error: str | None = None
+
+
+def parse_file(
+    path: str, source: str, known_hash: str | None, chunk_size: int, overlap: int, max_bytes: int,
+) -> ParsedFile:
+    # runs in a worker process: reading, hashing, text extraction and chunking all happen here,
+    # and only the chunks travel back to the event loop
+    content_type = mimetypes.guess_type(path)[0]
+    try:
+        size = os.path.getsize(path)
+        if size > max_bytes:
+            return ParsedFile(source, content_type, '', size, error='Document is too large')
+        with open(path, 'rb') as handle:
+            data = handle.read()
+    except OSError as exc:
+        # deleted or unreadable since the directory was listed
+        return ParsedFile(source, content_type, '', 0, error=str(exc))
+    digest = hashlib.sha256(data).hexdigest()
+    if digest == known_hash:
+        return ParsedFile(source, content_type, digest, size)
+    try:
+        text = extract_text(data, os.path.splitext(path)[1])
+    except Exception as exc:
+        return ParsedFile(source, content_type, digest, size, error=str(exc) or type(exc).__name__)
+    return ParsedFile(source, content_type, digest, size, list(iter_chunks([text], chunk_size, overlap)))
+
+
+def iter_source_files(root: str) -> Iterator[tuple[str, str]]:
+    # (path, source) pairs in a stable order; the source is the path relative to root with forward slashes
+    for directory, subdirectories, files in os.walk(root):
+        subdirectories[:] = sorted(name for name in subdirectories if not name.startswith('.'))
+        for name in sorted(files):
+            if name.lower().endswith(SUPPORTED_SUFFIXES):
+                path = os.path.join(directory, name)
+                yield path, os.path.relpath(path, root).replace(os.sep, '/')
@@ -0,0 +1,142 @@
+import hashlib
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Hashable
+
+import numpy as np
+
+from backend.app.core.metrics import registry
+
+_WORD = re.compile(r'\w+', re.UNICODE)
+
+response_cache_lookups = registry.counter(
+    'chat_response_cache_lookups_total', 'Chat response cache lookups by how they were answered.', ('result',),
+)
+
+
+def normalize_question(question: str) -> str:
+    # case, spacing and punctuation never change what is being asked
+    return ' '.join(_WORD.findall(question.lower()))
+
+
+@dataclass(slots=True)
+class CachedResponse:
+    hits: list[dict]  # the retrieval frame, replayed as it was first sent
+    pieces: list[str]
+
+
+@dataclass(slots=True)
+class _Entry:
+    response: CachedResponse
+    scope: Hashable
+    slot: int
+    expires_at: float
+
+
+class ResponseCache:
+    # finished chat answers keyed by the normalised question, with one embedding per entry so paraphrases
+    # above the similarity threshold hit too. Entries belong to one corpus version: any committed change to
+    # the indexed chunks bumps it and empties the cache. LRU past max_entries, and nothing outlives ttl.
+    def __init__(self, dimension: int, max_entries: int, ttl_seconds: float, threshold: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.threshold = threshold
+        self.version = 0
+        self.hits = {'exact': 0, 'semantic': 0}
+        self.misses = 0
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._vectors = np.zeros((max_entries, dimension), dtype=np.float32)
+        self._keys: list[str | None] = [None] * max_entries
+        self._free = list(range(max_entries - 1, -1, -1))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _key(question: str, scope: Hashable) -> str:
+        return hashlib.sha256(f'{scope!r}\0{normalize_question(question)}'.encode()).hexdigest()
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._vectors[:] = 0
+        self._keys = [None] * self.max_entries
+        self._free = list(range(self.max_entries - 1, -1, -1))
+
+    def _sync(self, version: int) -> None:
+        if version > self.version:
+            self.clear()
+            self.version = version
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._vectors[entry.slot] = 0
+        self._keys[entry.slot] = None
+        self._free.append(entry.slot)
+
+    def _record(self, result: str) -> None:
+        if result == 'miss':
+            self.misses += 1
+        else:
+            self.hits[result] += 1
+        if registry.enabled:
+            response_cache_lookups.inc(1, result)
+
+    def _live(self, key: str, now: float) -> _Entry | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= now:
+            self._drop(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def get(self, question: str, scope: Hashable, version: int) -> CachedResponse | None:
+        # the cheap lookup: no embedding needed. A miss here is only counted once similar() has had its turn.
+        if self.max_entries <= 0:
+            return None
+        self._sync(version)
+        entry = self._live(self._key(question, scope), time.monotonic())
+        if entry is not None:
+            self._record('exact')
+            return entry.response
+        return None
+
+    def similar(self, vector: np.ndarray, scope: Hashable, version: int) -> CachedResponse | None:
+        if self.max_entries <= 0:
+            return None
+        self._sync(version)
+        if self.threshold <= 1 and self._entries:
+            # free slots are zero vectors and never reach a positive threshold
+            scores = self._vectors @ vector
+            candidates = np.flatnonzero(scores >= self.threshold)
+            now = time.monotonic()
+            for slot in candidates[np.argsort(-scores[candidates])]:
+                key = self._keys[slot]
+                entry = self._live(key, now) if key is not None else None
+                if entry is not None and entry.scope == scope:
+                    self._record('semantic')
+                    return entry.response
+        self._record('miss')
+        return None
+
+    def put(
+        self, question: str, vector: np.ndarray, scope: Hashable, version: int, response: CachedResponse,
+    ) -> None:
+        if self.max_entries <= 0:
+            return
+        self._sync(version)
+        if version < self.version:
+            # generated against a corpus that has changed since
+            return
+        key = self._key(question, scope)
+        if key in self._entries:
+            self._drop(key)
+        elif len(self._entries) >= self.max_entries:
+            self._drop(next(iter(self._entries)))
+        slot = self._free.pop()
+        self._vectors[slot] = vector
+        self._keys[slot] = key
+        self._entries[key] = _Entry(response, scope, slot, time.monotonic() + self.ttl_seconds)
@@ -0,0 +1,180 @@
+import fcntl
+import json
+import os
+import threading
+from pathlib import Path
+from typing import BinaryIO, Sequence
+
+import numpy as np
+
+TOMBSTONE = -1
+SEARCH_BLOCK_ROWS = 65_536
+
+
+class VectorStore:
+    dimension: int
+
+    # writes vectors to free rows and returns the row numbers; rows stay invisible until activated
+    def append(self, vectors: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+    def activate(self, rows: Sequence[int], ids: Sequence[int]) -> None:
+        raise NotImplementedError
+
+    def delete(self, ids: Sequence[int]) -> None:
+        raise NotImplementedError
+
+    def search_many(self, queries: np.ndarray, k: int) -> list[list[tuple[int, float]]]:
+        raise NotImplementedError
+
+    def search(self, query: np.ndarray, k: int) -> list[tuple[int, float]]:
+        return self.search_many(np.asarray(query, dtype=np.float32)[None, :], k)[0]
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+
+def _top_k(scores: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    # argpartition per query row, then sort only the k survivors
+    k = min(k, scores.shape[1])
+    candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+    order = np.argsort(-candidate_scores, axis=1)
+    return np.take_along_axis(candidates, order, axis=1), np.take_along_axis(candidate_scores, order, axis=1)
+
+
+def _lock_directory(directory: Path) -> BinaryIO:
+    # rows are handed out from an in-memory counter, so a second writer on the same files would overwrite
+    # this one's vectors; it fails here instead. The lock goes away with the process, even after a crash.
+    handle = open(directory / 'vectors.lock', 'a+b')
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        handle.close()
+        raise RuntimeError(f'{directory} is already open in another vector store; run one app process per directory')
+    return handle
+
+
+class MmapVectorStore(VectorStore):
+    # normalised float32 rows in one contiguous memory-mapped file; the row -> chunk mapping lives in
+    # DOCUMENT_CHUNK.vector_row, so deletes are tombstones in memory and never rewrite the file
+    def __init__(self, dimension: int):
+        self.dimension = dimension
+        self.directory: Path | None = None
+        self._lock = threading.Lock()
+        self._vectors = np.zeros((0, dimension), dtype=np.float32)
+        self._ids = np.empty(0, dtype=np.int64)
+        self._rows = 0
+        self._live = 0
+        self._directory_lock: BinaryIO | None = None
+
+    @property
+    def _path(self) -> Path:
+        return self.directory / 'vectors.f32'
+
+    def open(self, directory: str | os.PathLike, rows: Sequence[int] = (), ids: Sequence[int] = ()) -> None:
+        self.close()
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._directory_lock = _lock_directory(self.directory)
+        meta_path = self.directory / 'meta.json'
+        if meta_path.exists():
+            dimension = json.loads(meta_path.read_text())['dimension']
+            if dimension != self.dimension:
+                raise ValueError(f'{self._path} holds {dimension}-d vectors, expected {self.dimension}')
+        else:
+            meta_path.write_text(json.dumps({'dimension': self.dimension}))
+        self._path.touch(exist_ok=True)
+
+        rows = np.asarray(rows, dtype=np.int64)
+        with self._lock:
+            # rows written by a transaction that never committed have no mapping and stay tombstoned
+            self._rows = int(rows.max()) + 1 if len(rows) else 0
+            self._ids = np.empty(0, dtype=np.int64)
+            self._map(max(self._rows, self._path.stat().st_size // (4 * self.dimension)))
+            self._ids[rows] = np.asarray(ids, dtype=np.int64)
+            self._live = len(rows)
+
+    def _map(self, capacity: int) -> None:
+        if capacity * 4 * self.dimension > self._path.stat().st_size:
+            with open(self._path, 'r+b') as handle:
+                handle.truncate(capacity * 4 * self.dimension)
+        self._vectors = (
+            np.memmap(self._path, dtype=np.float32, mode='r+', shape=(capacity, self.dimension))
+            if capacity else np.zeros((0, self.dimension), dtype=np.float32)
+        )
+        ids = np.full(capacity, TOMBSTONE, dtype=np.int64)
+        ids[:len(self._ids)] = self._ids[:capacity]
+        self._ids = ids
+
+    def append(self, vectors: np.ndarray) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim != 2 or vectors.shape[1] != self.dimension:
+            raise ValueError(f'expected an (n, {self.dimension}) array')
+        if self.directory is None:
+            raise RuntimeError('vector store is not open')
+        with self._lock:
+            start = self._rows
+            end = start + len(vectors)
+            if end > len(self._vectors):
+                # grow geometrically; extending the file leaves existing pages untouched
+                self._map(max(end, 2 * len(self._vectors), 1_024))
+            self._vectors[start:end] = vectors
+            self._rows = end
+        return np.arange(start, end, dtype=np.int64)
+
+    def activate(self, rows: Sequence[int], ids: Sequence[int]) -> None:
+        with self._lock:
+            self._ids[np.asarray(rows, dtype=np.int64)] = np.asarray(ids, dtype=np.int64)
+            self._live += len(rows)
+
+    def delete(self, ids: Sequence[int]) -> None:
+        with self._lock:
+            doomed = np.flatnonzero(np.isin(self._ids[:self._rows], np.asarray(ids, dtype=np.int64)))
+            self._ids[doomed] = TOMBSTONE
+            self._live -= len(doomed)
+
+    def flush(self) -> None:
+        if isinstance(self._vectors, np.memmap):
+            self._vectors.flush()
+
+    def close(self) -> None:
+        if self._directory_lock is not None:
+            self.flush()
+            self._directory_lock.close()
+            self._directory_lock = None
+
+    def search_many(self, queries: np.ndarray, k: int) -> list[list[tuple[int, float]]]:
+        queries = np.asarray(queries, dtype=np.float32)
+        with self._lock:
+            vectors, ids, rows = self._vectors, self._ids, self._rows
+        if not rows or k <= 0:
+            return [[] for _ in range(len(queries))]
+
+        best_rows = np.empty((len(queries), 0), dtype=np.int64)
+        best_scores = np.empty((len(queries), 0), dtype=np.float32)
+        # block-wise matmul keeps the score matrix bounded regardless of corpus size
+        for start in range(0, rows, SEARCH_BLOCK_ROWS):
+            end = min(rows, start + SEARCH_BLOCK_ROWS)
+            scores = queries @ vectors[start:end].T
+            scores[:, ids[start:end] == TOMBSTONE] = -np.inf
+            block_rows, block_scores = _top_k(scores, k)
+            best_rows = np.concatenate([best_rows, block_rows + start], axis=1)
+            best_scores = np.concatenate([best_scores, block_scores], axis=1)
+            if best_rows.shape[1] > k:
+                order, best_scores = _top_k(best_scores, k)
+                best_rows = np.take_along_axis(best_rows, order, axis=1)
+
+        return [
+            [(int(ids[row]), float(score)) for row, score in zip(row_list, score_list) if np.isfinite(score)]
+            for row_list, score_list in zip(best_rows, best_scores)
+        ]
+
+    def __len__(self) -> int:
+        return self._live
@@ -1,75 +1,104 @@
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Optional
 
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, delete, func, or_, select, update
 
+from backend.app.db.base import SessionBound
 from backend.app.model.refresh_token import RefreshToken
 from backend.app.model.user import User
 
 
-class AuthRepository:
-    def __init__(self, db: Session):
-        self.db = db
+class AuthRepository(SessionBound):
+    async def get_by_username(self, username: str) -> Optional[User]:
+        result = await self.db.scalars(select(User).where(User.name == username))
+        return result.first()
 
-    def get_by_username(self, username: str) -> Optional[User]:
-        return self.db.query(User).filter(User.name == username).first()
-
-    def get_active_user_by_username(self, username: str) -> Optional[User]:
-        return (
-            self.db.query(User)
-            .filter(User.name == username, User.is_active.is_(True))
-            .first()
+    async def get_active_user_by_username(self, username: str) -> Optional[User]:
+        result = await self.db.scalars(
+            select(User).where(User.name == username, User.is_active.is_(True))
         )
+        return result.first()
+
+    async def release_connection(self) -> None:
+        # ends the implicit read transaction so the pooled connection is not held across slow work
+        await self.db.commit()
 
-    def get_by_id(self, user_id: int) -> Optional[User]:
-        return self.db.get(User, user_id)
+    async def get_by_id(self, user_id: int) -> Optional[User]:
+        return await self.db.get(User, user_id)
 
-    def create_refresh_token(self, token: RefreshToken) -> RefreshToken:
+    async def create_refresh_token(self, token: RefreshToken) -> RefreshToken:
         self.db.add(token)
-        self.db.commit()
-        self.db.refresh(token)
+        await self.db.commit()
+        await self.db.refresh(token)
         return token
 
-    def find_tokens_by_session(self, user_id: int, family_id: str) -> list[RefreshToken]:
-        return (
-            self.db.query(RefreshToken)
-            .filter(RefreshToken.user_id == user_id, RefreshToken.family_id == family_id, RefreshToken.revoked.is_(False))
-            .all()
+    async def revoke_family(self, user_id: int, family_id: str) -> int:
+        result = await self.db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.user_id == user_id, RefreshToken.family_id == family_id, RefreshToken.revoked.is_(False))
+            .values(revoked=True, revoked_at=datetime.now(timezone.utc))
+            .execution_options(synchronize_session=False)
         )
+        await self.db.commit()
+        return result.rowcount
 
-    def find_tokens_by_user(self, user_id: int) -> list[RefreshToken]:
-        return (
-            self.db.query(RefreshToken)
-            .filter(RefreshToken.user_id == user_id, RefreshToken.revoked.is_(False))
-            .all()
+    async def revoke_all_for_user(self, user_id: int) -> int:
+        result = await self.db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.user_id == user_id, RefreshToken.revoked.is_(False))
+            .values(revoked=True, revoked_at=datetime.now(timezone.utc))
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.commit()
+        return result.rowcount
+
+    async def delete_stale_tokens(self, cutoff: datetime, limit: int) -> int:
+        stale_ids = (
+            select(RefreshToken.refresh_token_id)
+            .where(
+                or_(
+                    RefreshToken.expires_at < cutoff,
+                    and_(
+                        RefreshToken.revoked.is_(True),
+                        func.coalesce(RefreshToken.revoked_at, RefreshToken.issued_at) < cutoff,
+                    ),
+                )
+            )
+            .limit(limit)
         )
+        result = await self.db.execute(
+            delete(RefreshToken)
+            .where(RefreshToken.refresh_token_id.in_(stale_ids))
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.commit()
+        return result.rowcount
 
-    def find_token(self, user_id: int, jti: str, family_id: str) -> Optional[RefreshToken]:
-        return (
-            self.db.query(RefreshToken)
-            .filter(
+    async def rotate_refresh_token(
+        self,
+        user_id: int,
+        jti: str,
+        family_id: str,
+        new_token: RefreshToken,
+    ) -> Optional[User]:
+        # the conditional UPDATE both validates and revokes, so only one concurrent refresh can win
+        result = await self.db.execute(
+            update(RefreshToken)
+            .where(
                 RefreshToken.user_id == user_id,
                 RefreshToken.jti == jti,
                 RefreshToken.family_id == family_id,
+                RefreshToken.revoked.is_(False),
+                RefreshToken.expires_at > datetime.now(timezone.utc),
             )
-            .first()
-        )
-
-    def is_refresh_token_valid(self, user_id: int, jti: str, family_id: str) -> bool:
-        token = self.find_token(user_id, jti, family_id)
-        if token is None or token.revoked:
-            return False
-        current_time = (
-            datetime.now(token.expires_at.tzinfo)
-            if token.expires_at.tzinfo
-            else datetime.utcnow()
+            .values(revoked=True, revoked_at=datetime.now(timezone.utc))
+            .execution_options(synchronize_session=False)
         )
-        if token.expires_at <= current_time:
-            return False
-        return True
+        user = await self.db.get(User, user_id) if result.rowcount == 1 else None
+        if user is None:
+            await self.db.rollback()
+            return None
 
-    def update_refresh_token(self, token: RefreshToken) -> RefreshToken:
-        self.db.add(token)
-        self.db.commit()
-        self.db.refresh(token)
-        return token
+        self.db.add(new_token)
+        await self.db.commit()
+        return user
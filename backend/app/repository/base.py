@@ -1,65 +1,96 @@
 import functools
-from typing import Generic, TypeVar, Type
+from typing import Callable, Generic, TypeVar, Type
 
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.app.db.base import SessionBound
 
 T = TypeVar("T")
 
 
-class BaseRepository(Generic[T]):
-    def __init__(self, model: Type[T], db: Session):
+class BaseRepository(SessionBound, Generic[T]):
+    def __init__(self, model: Type[T], db: AsyncSession | None = None):
+        super().__init__(db)
         self.model = model
-        self.db = db
 
-    def add(self, obj: T) -> T:
+    async def add(self, obj: T) -> T:
         self.db.add(obj)
-        self.db.flush()
-        self.db.refresh(obj)
+        await self.db.flush()
+        await self.db.refresh(obj)
         return obj
 
-    def update(self, obj: T) -> T:
-        self.db.merge(obj)
+    async def update(self, obj: T) -> T:
+        await self.db.merge(obj)
         return obj
 
-    def get(self, id_: int) -> T | None:
-        return self.db.get(self.model, id_)
+    async def get(self, id_: int) -> T | None:
+        return await self.db.get(self.model, id_)
 
-    def get_all(self) -> list[T]:
-        return self.db.query(self.model).all()
+    async def get_all(self) -> list[T]:
+        result = await self.db.scalars(select(self.model))
+        return list(result.all())
 
-    def delete(self, obj: T) -> None:
-        self.db.delete(obj)
+    async def delete(self, obj: T) -> None:
+        await self.db.delete(obj)
 
-    def merge(self, obj: T) -> T:
-        merged = self.db.merge(obj)
-        self.db.flush()
+    async def merge(self, obj: T) -> T:
+        merged = await self.db.merge(obj)
+        await self.db.flush()
         return merged
 
 
-def transactional(func):
-    @functools.wraps(func)
-    def wrapper(self, *args, **kwargs):
-        repository = None
-
-        for attr_name in dir(self):
-            attr = getattr(self, attr_name)
-            if isinstance(attr, BaseRepository):
-                repository = attr
-                break
+class UnitOfWork(SessionBound):
+    def _hook_stack(self) -> list[list[Callable[[], None]]]:
+        # one list of pending hooks per open transaction level, kept on the session so a shared
+        # UnitOfWork never mixes requests; a rolled-back savepoint drops its own hooks
+        return self.db.info.setdefault('after_commit_hooks', [])
+
+    def after_commit(self, hook: Callable[[], None]) -> None:
+        hook_stack = self._hook_stack()
+        if not hook_stack:
+            raise RuntimeError('after_commit called outside of a transaction')
+        hook_stack[-1].append(hook)
+
+    async def __aenter__(self) -> "UnitOfWork":
+        hook_stack = self._hook_stack()
+        if hook_stack:
+            await self.db.begin_nested()
+        hook_stack.append([])
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        hook_stack = self._hook_stack()
+        hooks = hook_stack.pop()
+        nested = bool(hook_stack)
+        transaction = self.db.get_nested_transaction() if nested else None
+
+        if exc_type is not None:
+            if transaction is not None:
+                await transaction.rollback()
+            else:
+                await self.db.rollback()
+            return
+
+        if nested:
+            await transaction.commit()
+            hook_stack[-1].extend(hooks)
+            return
 
-        if repository is None:
-            raise AttributeError(f'Cannot find repository in service class: {self.__class__.__name__}')
+        try:
+            await self.db.commit()
+        except BaseException:
+            await self.db.rollback()
+            raise
+        for hook in hooks:
+            hook()
 
-        db = getattr(repository, 'db', None)
-        if db is None or not isinstance(db, Session):
-            raise AttributeError('Repository instance does not expose a valid Session')
 
-        try:
-            result = func(self, *args, **kwargs)
-            db.commit()
-            return result
-        except Exception as exc:
-            db.rollback()
-            raise exc
+def transactional(func):
+    # services resolve their UnitOfWork once in __init__, so entering it is a plain attribute lookup
+    @functools.wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        async with self.uow:
+            return await func(self, *args, **kwargs)
 
     return wrapper
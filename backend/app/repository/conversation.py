@@ -0,0 +1,108 @@
+from datetime import datetime, timezone
+from typing import Sequence
+
+from sqlalchemy import Row, delete, insert, select, update
+
+from backend.app.model.conversation import Conversation, ConversationMessage
+from backend.app.repository.base import BaseRepository
+
+
+class ConversationRepository(BaseRepository):
+    def __init__(self, db=None):
+        super().__init__(Conversation, db)
+
+    async def get_owned(self, conversation_id: int, user_id: int) -> Conversation | None:
+        # counters are bumped with plain UPDATEs, so a row already in the identity map is refreshed
+        result = await self.db.scalars(
+            select(Conversation)
+            .where(Conversation.conversation_id == conversation_id, Conversation.user_id == user_id)
+            .execution_options(populate_existing=True)
+        )
+        return result.first()
+
+    async def list_for_user(self, user_id: int, limit: int) -> list[Conversation]:
+        result = await self.db.scalars(
+            select(Conversation)
+            .where(Conversation.user_id == user_id)
+            .order_by(Conversation.updated_at.desc())
+            .limit(limit)
+        )
+        return list(result.all())
+
+    async def reserve(self, conversation_id: int, user_id: int, count: int, tokens: int) -> int | None:
+        # one statement claims the next seqs and bumps the totals; the row lock it takes orders
+        # concurrent appends to the same conversation until commit
+        result = await self.db.scalars(
+            update(Conversation)
+            .where(Conversation.conversation_id == conversation_id, Conversation.user_id == user_id)
+            .values(
+                message_count=Conversation.message_count + count,
+                token_count=Conversation.token_count + tokens,
+                updated_at=datetime.now(timezone.utc),
+            )
+            .returning(Conversation.message_count)
+        )
+        return result.first()
+
+    async def insert_messages(
+        self, conversation_id: int, first_seq: int, messages: Sequence[tuple[str, str, int]],
+    ) -> None:
+        await self.db.execute(
+            insert(ConversationMessage),
+            [
+                {
+                    'conversation_id': conversation_id,
+                    'seq': seq,
+                    'role': role,
+                    'content': content,
+                    'token_count': token_count,
+                }
+                for seq, (role, content, token_count) in enumerate(messages, start=first_seq)
+            ],
+        )
+
+    async def last_messages(
+        self, conversation_id: int, limit: int, after_seq: int = 0, before_seq: int | None = None,
+    ) -> list[Row]:
+        # newest first; a backwards range scan of the (conversation_id, seq) index that stops after limit rows
+        query = select(
+            ConversationMessage.seq,
+            ConversationMessage.role,
+            ConversationMessage.content,
+            ConversationMessage.token_count,
+            ConversationMessage.created_at,
+        ).where(ConversationMessage.conversation_id == conversation_id, ConversationMessage.seq > after_seq)
+        if before_seq is not None:
+            query = query.where(ConversationMessage.seq < before_seq)
+        result = await self.db.execute(query.order_by(ConversationMessage.seq.desc()).limit(limit))
+        return list(result.all())
+
+    async def fold_summary(
+        self,
+        conversation_id: int,
+        expected_through: int,
+        through: int,
+        summary: str,
+        summary_tokens: int,
+        kept_tokens: int,
+    ) -> bool:
+        # compare-and-set on summarized_through, so two concurrent folds never summarise the same turns twice
+        result = await self.db.execute(
+            update(Conversation)
+            .where(
+                Conversation.conversation_id == conversation_id,
+                Conversation.summarized_through == expected_through,
+            )
+            .values(
+                summary=summary,
+                summary_token_count=summary_tokens,
+                summarized_through=through,
+                # everything but the turns kept verbatim now counts as summarised, including any
+                # turns too old to have been scanned
+                summarized_token_count=Conversation.token_count - kept_tokens,
+            )
+        )
+        return result.rowcount == 1
+
+    async def delete_messages(self, conversation_id: int) -> None:
+        await self.db.execute(delete(ConversationMessage).where(ConversationMessage.conversation_id == conversation_id))
@@ -0,0 +1,101 @@
+from typing import Sequence
+
+from sqlalchemy import Row, delete, insert, select, update
+
+from backend.app.model.document import Document, DocumentChunk
+from backend.app.rag.chunker import TextChunk
+from backend.app.repository.base import BaseRepository
+
+
+class DocumentRepository(BaseRepository):
+    def __init__(self, db=None):
+        super().__init__(Document, db)
+
+    async def find_by_source(self, source: str) -> Document | None:
+        result = await self.db.scalars(select(Document).where(Document.source == source))
+        return result.first()
+
+    async def find_by_sources(self, sources: Sequence[str]) -> dict[str, Document]:
+        result = await self.db.scalars(select(Document).where(Document.source.in_(sources)))
+        return {document.source: document for document in result.all()}
+
+    async def content_hashes(self) -> dict[str, str]:
+        result = await self.db.execute(select(Document.source, Document.content_hash))
+        return dict(result.all())
+
+    async def list_documents(self) -> list[Document]:
+        result = await self.db.scalars(select(Document).order_by(Document.document_id))
+        return list(result.all())
+
+    async def delete_chunks(self, document_id: int | Sequence[int]) -> list[int]:
+        document_ids = [document_id] if isinstance(document_id, int) else list(document_id)
+        result = await self.db.scalars(
+            delete(DocumentChunk).where(DocumentChunk.document_id.in_(document_ids)).returning(DocumentChunk.chunk_id)
+        )
+        return list(result.all())
+
+    async def add_chunk_count(self, document_id: int, count: int) -> None:
+        await self.db.execute(
+            update(Document).where(Document.document_id == document_id).values(chunk_count=Document.chunk_count + count)
+        )
+
+    async def insert_chunks(
+        self,
+        document_id: int,
+        chunks: Sequence[TextChunk],
+        hashes: Sequence[str],
+        vector_rows: Sequence[int],
+    ) -> list[int]:
+        return await self.insert_chunk_rows([document_id] * len(chunks), chunks, hashes, vector_rows)
+
+    async def insert_chunk_rows(
+        self,
+        document_ids: Sequence[int],
+        chunks: Sequence[TextChunk],
+        hashes: Sequence[str],
+        vector_rows: Sequence[int],
+    ) -> list[int]:
+        # one statement for chunks of any number of documents
+        result = await self.db.scalars(
+            insert(DocumentChunk).returning(DocumentChunk.chunk_id, sort_by_parameter_order=True),
+            [
+                {
+                    'document_id': document_id,
+                    'ordinal': chunk.ordinal,
+                    'content': chunk.text,
+                    'content_hash': content_hash,
+                    'start_offset': chunk.start,
+                    'end_offset': chunk.end,
+                    'vector_row': int(vector_row),
+                }
+                for document_id, chunk, content_hash, vector_row in zip(document_ids, chunks, hashes, vector_rows)
+            ],
+        )
+        return list(result.all())
+
+    async def insert_documents(self, rows: Sequence[dict]) -> list[int]:
+        result = await self.db.scalars(
+            insert(Document).returning(Document.document_id, sort_by_parameter_order=True), list(rows),
+        )
+        return list(result.all())
+
+    async def vector_rows(self) -> tuple[list[int], list[int]]:
+        result = await self.db.execute(
+            select(DocumentChunk.vector_row, DocumentChunk.chunk_id).where(DocumentChunk.vector_row.is_not(None))
+        )
+        rows = result.all()
+        return [row.vector_row for row in rows], [row.chunk_id for row in rows]
+
+    async def get_chunks(self, chunk_ids: Sequence[int]) -> list[Row]:
+        result = await self.db.execute(
+            select(
+                DocumentChunk.chunk_id,
+                DocumentChunk.document_id,
+                DocumentChunk.ordinal,
+                DocumentChunk.content,
+                Document.source,
+            )
+            .join(Document, Document.document_id == DocumentChunk.document_id)
+            .where(DocumentChunk.chunk_id.in_(chunk_ids))
+        )
+        return list(result.all())
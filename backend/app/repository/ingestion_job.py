@@ -0,0 +1,126 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import and_, exists, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased
+
+from backend.app.model.ingestion_job import IngestionJob
+from backend.app.repository.base import BaseRepository
+from backend.app.utils.enum import JobStatus
+
+
+def _claimable(stale_before: datetime):
+    # queued jobs whose source has no job running yet, and running jobs whose worker stopped sending
+    # heartbeats (crash, kill, restart)
+    running = aliased(IngestionJob)
+    source_busy = exists().where(running.source == IngestionJob.source, running.status == JobStatus.RUNNING.value)
+    return or_(
+        and_(IngestionJob.status == JobStatus.QUEUED.value, ~source_busy),
+        and_(IngestionJob.status == JobStatus.RUNNING.value, IngestionJob.updated_at < stale_before),
+    )
+
+
+def _discardable(finished_before: datetime):
+    return and_(
+        IngestionJob.status.in_((JobStatus.FAILED.value, JobStatus.CANCELLED.value)),
+        IngestionJob.file_path.is_not(None),
+        IngestionJob.finished_at < finished_before,
+    )
+
+
+class IngestionJobRepository(BaseRepository):
+    def __init__(self, db=None):
+        super().__init__(IngestionJob, db)
+
+    async def get_fresh(self, job_id: int) -> IngestionJob | None:
+        # workers and endpoints change jobs with plain UPDATEs, so a row already in the identity map is refreshed
+        result = await self.db.scalars(
+            select(IngestionJob).where(IngestionJob.job_id == job_id).execution_options(populate_existing=True)
+        )
+        return result.first()
+
+    async def list_jobs(self, status: str | None, limit: int) -> list[IngestionJob]:
+        query = select(IngestionJob)
+        if status is not None:
+            query = query.where(IngestionJob.status == status)
+        result = await self.db.scalars(query.order_by(IngestionJob.job_id.desc()).limit(limit))
+        return list(result.all())
+
+    async def claim_next(self, stale_before: datetime) -> tuple[int, int] | None:
+        # compare-and-set on the same condition, so two workers never claim one job.
+        # Returns the job and its attempt number, which fences every later write by this worker.
+        while True:
+            row = (await self.db.execute(
+                select(IngestionJob.job_id, IngestionJob.attempts)
+                .where(_claimable(stale_before))
+                .order_by(IngestionJob.job_id)
+                .limit(1)
+            )).first()
+            if row is None:
+                return None
+            now = datetime.now(timezone.utc)
+            try:
+                async with self.db.begin_nested():
+                    result = await self.db.execute(
+                        update(IngestionJob)
+                        .where(IngestionJob.job_id == row.job_id, IngestionJob.attempts == row.attempts, _claimable(stale_before))
+                        .values(
+                            status=JobStatus.RUNNING.value,
+                            attempts=row.attempts + 1,
+                            started_at=now,
+                            updated_at=now,
+                        )
+                    )
+            except IntegrityError:
+                # another transaction started a job for the same source since the select; the next select skips it
+                continue
+            if result.rowcount == 1:
+                return row.job_id, row.attempts + 1
+
+    async def is_cancel_requested(self, job_id: int) -> bool:
+        return bool(await self.db.scalar(select(IngestionJob.cancel_requested).where(IngestionJob.job_id == job_id)))
+
+    async def set_values(self, job_id: int, **values) -> None:
+        values.setdefault('updated_at', datetime.now(timezone.utc))
+        await self.db.execute(update(IngestionJob).where(IngestionJob.job_id == job_id).values(**values))
+
+    async def set_owned(self, job_id: int, attempt: int, **values) -> bool:
+        # only the worker holding the current attempt may write; a worker whose job was taken over matches no row
+        values.setdefault('updated_at', datetime.now(timezone.utc))
+        result = await self.db.execute(
+            update(IngestionJob)
+            .where(
+                IngestionJob.job_id == job_id,
+                IngestionJob.status == JobStatus.RUNNING.value,
+                IngestionJob.attempts == attempt,
+            )
+            .values(**values)
+        )
+        return result.rowcount == 1
+
+    async def transition(self, job_id: int, from_statuses: tuple[str, ...], *conditions, **values) -> bool:
+        values.setdefault('updated_at', datetime.now(timezone.utc))
+        result = await self.db.execute(
+            update(IngestionJob)
+            .where(IngestionJob.job_id == job_id, IngestionJob.status.in_(from_statuses), *conditions)
+            .values(**values)
+        )
+        return result.rowcount == 1
+
+    async def discard_uploads(self, finished_before: datetime, limit: int) -> list[str]:
+        # the update checks the same condition again, so a job retried since the select keeps its upload
+        candidates = dict((await self.db.execute(
+            select(IngestionJob.job_id, IngestionJob.file_path)
+            .where(_discardable(finished_before))
+            .order_by(IngestionJob.job_id)
+            .limit(limit)
+        )).all())
+        if not candidates:
+            return []
+        discarded = await self.db.scalars(
+            update(IngestionJob)
+            .where(IngestionJob.job_id.in_(candidates), _discardable(finished_before))
+            .values(file_path=None, updated_at=datetime.now(timezone.utc))
+            .returning(IngestionJob.job_id)
+        )
+        return [candidates[job_id] for job_id in discarded]
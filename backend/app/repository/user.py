@@ -1,20 +1,91 @@
+from typing import AsyncIterator, Iterable
+
+from sqlalchemy import Row, Select, insert, select
+from sqlalchemy.exc import IntegrityError
+
 from backend.app.model.user import User
 from backend.app.repository.base import BaseRepository
 
 
 class UserRepository(BaseRepository):
-    def __init__(self, db):
+    def __init__(self, db=None):
         super().__init__(User, db)
 
-    def find_by_username(self, name: str) -> User:
-        return self.db.query(User).filter(User.name == name).first()
+    async def find_by_username(self, name: str) -> User:
+        result = await self.db.scalars(select(User).where(User.name == name))
+        return result.first()
 
-    def activate(self, obj: User) -> User:
+    async def activate(self, obj: User) -> User:
         obj.is_active = True
-        self.db.merge(obj)
+        await self.db.merge(obj)
         return obj
 
-    def deactivate(self, obj: User) -> User:
+    async def deactivate(self, obj: User) -> User:
         obj.is_active = False
-        self.db.merge(obj)
+        await self.db.merge(obj)
         return obj
+
+    async def find_existing_names(self, names: Iterable[str], chunk_size: int = 5_000) -> set[str]:
+        # chunked to stay under the bind-parameter limits of SQLite and asyncpg
+        names = list(names)
+        existing: set[str] = set()
+        for start in range(0, len(names), chunk_size):
+            result = await self.db.scalars(select(User.name).where(User.name.in_(names[start:start + chunk_size])))
+            existing.update(result.all())
+        return existing
+
+    async def insert_many(self, rows: list[dict]) -> list[Row]:
+        # a single executemany INSERT ... RETURNING, committed as one batch
+        try:
+            result = await self.db.execute(
+                insert(User).returning(User.user_id, User.name, sort_by_parameter_order=True),
+                rows,
+            )
+        except IntegrityError:
+            await self.db.rollback()
+            raise
+        inserted = list(result.all())
+        await self.db.commit()
+        return inserted
+
+    def _page_query(
+        self,
+        after_id: int | None,
+        role: str | None,
+        is_active: bool | None,
+        name_prefix: str | None,
+    ) -> Select:
+        # column-only select: rows skip ORM instantiation and the identity map
+        query = select(User.user_id, User.name, User.role).order_by(User.user_id)
+        if after_id is not None:
+            query = query.where(User.user_id > after_id)
+        if role is not None:
+            query = query.where(User.role == role)
+        if is_active is not None:
+            query = query.where(User.is_active.is_(is_active))
+        if name_prefix:
+            query = query.where(User.name.startswith(name_prefix, autoescape=True))
+        return query
+
+    async def find_page(
+        self,
+        after_id: int | None,
+        limit: int | None,
+        role: str | None = None,
+        is_active: bool | None = None,
+        name_prefix: str | None = None,
+    ) -> list[Row]:
+        result = await self.db.execute(self._page_query(after_id, role, is_active, name_prefix).limit(limit))
+        return list(result.all())
+
+    async def stream_rows(
+        self,
+        role: str | None = None,
+        is_active: bool | None = None,
+        name_prefix: str | None = None,
+        batch_size: int = 1_000,
+    ) -> AsyncIterator[Row]:
+        query = self._page_query(None, role, is_active, name_prefix).execution_options(yield_per=batch_size)
+        result = await self.db.stream(query)
+        async for row in result:
+            yield row
@@ -16,25 +16,25 @@ class AuthRouter:
         self.auth_service = auth_service
 
     @router.post("/token", response_model=Token)
-    def login(self, response: Response, form_data: OAuth2PasswordRequestForm = Depends()) -> Token:
-        return self.auth_service.login(form_data, response)
+    async def login(self, response: Response, form_data: OAuth2PasswordRequestForm = Depends()) -> Token:
+        return await self.auth_service.login(form_data, response)
 
     @router.post("/logout")
-    def logout_current_session(self, response: Response, refresh_token: str | None = Cookie(None)) -> dict:
-        self.auth_service.logout_current_session(refresh_token)
+    async def logout_current_session(self, response: Response, refresh_token: str | None = Cookie(None)) -> dict:
+        await self.auth_service.logout_current_session(refresh_token)
         response.delete_cookie(key="refresh_token", path="/")
         return {"success": True}
 
     @router.post("/logout/all")
-    def logout_all_sessions(self, response: Response, refresh_token: str | None = Cookie(None)) -> dict:
-        self.auth_service.logout_all_sessions(refresh_token)
+    async def logout_all_sessions(self, response: Response, refresh_token: str | None = Cookie(None)) -> dict:
+        await self.auth_service.logout_all_sessions(refresh_token)
         response.delete_cookie(key="refresh_token", path="/")
         return {"success": True}
 
     @router.post("/refresh", response_model=Token)
-    def refresh_token(self, response: Response, refresh_token: str | None = Cookie(None)) -> Token:
-        return self.auth_service.refresh_token(refresh_token, response)
+    async def refresh_token(self, response: Response, refresh_token: str | None = Cookie(None)) -> Token:
+        return await self.auth_service.refresh_token(refresh_token, response)
 
     @router.get("/me", response_model=UserOut)
-    def read_me(self, current_user: CurrentUser) -> UserOut:
+    async def read_me(self, current_user: CurrentUser) -> UserOut:
         return UserOut.from_model(current_user)
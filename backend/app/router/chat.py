@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from fastapi_utils.cbv import cbv
+
+from backend.app.config import settings
+from backend.app.core.deps import CurrentUser, get_chat_service
+from backend.app.schemas.chat import ChatRequest
+from backend.app.service.chat import ChatService
+
+router = APIRouter(tags=["Chat API"], prefix="/api/chat")
+
+# proxies such as nginx buffer responses unless told not to, which would hold back the first token
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+@cbv(router)
+class ChatRouter:
+    def __init__(self, chat_service: ChatService = Depends(get_chat_service)):
+        self.chat_service = chat_service
+
+    @router.post("/", response_class=StreamingResponse)
+    async def chat(self, request: ChatRequest, current_user: CurrentUser):
+        history = None
+        if request.conversation_id is not None:
+            history = await self.chat_service.load_history(request.conversation_id, current_user.user_id)
+        return StreamingResponse(
+            self.chat_service.stream(
+                request.question,
+                request.k or settings.CHAT_CONTEXT_CHUNKS,
+                request.max_tokens or settings.CHAT_MAX_TOKENS,
+                history,
+                current_user.user_id,
+            ),
+            media_type="text/event-stream",
+            headers=SSE_HEADERS,
+        )
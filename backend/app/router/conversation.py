@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends, Query
+from fastapi_utils.cbv import cbv
+
+from backend.app.core.deps import CurrentUser, get_conversation_service
+from backend.app.schemas.conversation import ConversationCreate, ConversationOut, MessageOut
+from backend.app.service.conversation import ConversationService
+
+router = APIRouter(tags=["Conversation API"], prefix="/api/conversations")
+
+
+@cbv(router)
+class ConversationRouter:
+    def __init__(self, conversation_service: ConversationService = Depends(get_conversation_service)):
+        self.conversation_service = conversation_service
+
+    @router.post("/", response_model=ConversationOut)
+    async def create_conversation(self, request: ConversationCreate, current_user: CurrentUser):
+        return await self.conversation_service.create_conversation(current_user.user_id, request.title)
+
+    @router.get("/", response_model=list[ConversationOut])
+    async def list_conversations(self, current_user: CurrentUser, limit: int = Query(default=50, ge=1, le=200)):
+        return await self.conversation_service.list_conversations(current_user.user_id, limit)
+
+    @router.get("/{conversation_id}/messages", response_model=list[MessageOut])
+    async def get_messages(
+        self,
+        conversation_id: int,
+        current_user: CurrentUser,
+        limit: int = Query(default=50, ge=1, le=500),
+        before: int | None = Query(default=None, ge=1),
+    ):
+        return await self.conversation_service.get_messages(conversation_id, current_user.user_id, limit, before)
+
+    @router.delete("/{conversation_id}", response_model=bool)
+    async def delete_conversation(self, conversation_id: int, current_user: CurrentUser):
+        return await self.conversation_service.delete_conversation(conversation_id, current_user.user_id)
@@ -0,0 +1,48 @@
+from typing import Literal
+
+from fastapi import APIRouter, Depends, File, Query, UploadFile
+from fastapi_utils.cbv import cbv
+
+from backend.app.core.deps import CurrentUser, get_current_active_admin, get_document_service
+from backend.app.core.token_cache import UserSnapshot
+from backend.app.schemas.document import DocumentIngestResult, DocumentOut, DocumentSearchHit
+from backend.app.service.document import DocumentService
+
+router = APIRouter(tags=["Document API"], prefix="/api/documents")
+
+
+@cbv(router)
+class DocumentRouter:
+    def __init__(self, document_service: DocumentService = Depends(get_document_service)):
+        self.document_service = document_service
+
+    @router.post("/", response_model=DocumentIngestResult)
+    async def upload_document(
+        self,
+        file: UploadFile = File(...),
+        current_admin: UserSnapshot = Depends(get_current_active_admin),
+    ):
+        return await self.document_service.ingest(
+            file.filename or "upload",
+            file.file,
+            content_type=file.content_type,
+            uploaded_by=current_admin.user_id,
+        )
+
+    @router.get("/", response_model=list[DocumentOut])
+    async def list_documents(self, current_admin: UserSnapshot = Depends(get_current_active_admin)):
+        return await self.document_service.list_documents()
+
+    @router.get("/search", response_model=list[DocumentSearchHit])
+    async def search_documents(
+        self,
+        current_user: CurrentUser,
+        q: str = Query(..., min_length=1),
+        k: int = Query(default=5, ge=1, le=50),
+        mode: Literal["vector", "lexical", "hybrid"] | None = Query(default=None),
+    ):
+        return await self.document_service.search(q, k, mode)
+
+    @router.delete("/{document_id}", response_model=bool)
+    async def delete_document(self, document_id: int, current_admin: UserSnapshot = Depends(get_current_active_admin)):
+        return await self.document_service.delete_document(document_id)
@@ -0,0 +1,50 @@
+from fastapi import APIRouter, Depends, File, Query, UploadFile
+from fastapi_utils.cbv import cbv
+
+from backend.app.core.deps import get_current_active_admin, get_ingestion_job_service
+from backend.app.core.token_cache import UserSnapshot
+from backend.app.schemas.ingestion_job import IngestionJobOut
+from backend.app.service.ingestion_job import IngestionJobService
+from backend.app.utils.enum import JobStatus
+
+router = APIRouter(tags=["Ingestion Job API"], prefix="/api/ingestion-jobs")
+
+
+@cbv(router)
+class IngestionJobRouter:
+    def __init__(self, job_service: IngestionJobService = Depends(get_ingestion_job_service)):
+        self.job_service = job_service
+
+    @router.post("/", response_model=IngestionJobOut)
+    async def enqueue_job(
+        self,
+        file: UploadFile = File(...),
+        current_admin: UserSnapshot = Depends(get_current_active_admin),
+    ):
+        return await self.job_service.enqueue(
+            file.filename or "upload",
+            file.file,
+            content_type=file.content_type,
+            created_by=current_admin.user_id,
+        )
+
+    @router.get("/", response_model=list[IngestionJobOut])
+    async def list_jobs(
+        self,
+        current_admin: UserSnapshot = Depends(get_current_active_admin),
+        status: JobStatus | None = Query(default=None),
+        limit: int = Query(default=50, ge=1, le=500),
+    ):
+        return await self.job_service.list_jobs(status, limit)
+
+    @router.get("/{job_id}", response_model=IngestionJobOut)
+    async def get_job(self, job_id: int, current_admin: UserSnapshot = Depends(get_current_active_admin)):
+        return await self.job_service.get_job(job_id)
+
+    @router.post("/{job_id}/cancel", response_model=IngestionJobOut)
+    async def cancel_job(self, job_id: int, current_admin: UserSnapshot = Depends(get_current_active_admin)):
+        return await self.job_service.cancel(job_id)
+
+    @router.post("/{job_id}/retry", response_model=IngestionJobOut)
+    async def retry_job(self, job_id: int, current_admin: UserSnapshot = Depends(get_current_active_admin)):
+        return await self.job_service.retry(job_id)
@@ -1,16 +1,24 @@
-from fastapi import APIRouter, Depends
+import csv
+import io
+from typing import Any, Literal
+
+from fastapi import APIRouter, Body, Depends, File, HTTPException, Query, Response, UploadFile
+from fastapi.responses import StreamingResponse
 from fastapi_utils.cbv import cbv
 
 from backend.app.core.deps import (
     get_current_active_admin,
     get_user_service,
 )
-from backend.app.model.user import User
-from backend.app.schemas.user import UserCreate, UserUpdate, UserOut
+from backend.app.core.token_cache import UserSnapshot
+from backend.app.schemas.user import UserCreate, UserImportReport, UserUpdate, UserOut
 from backend.app.service.user import UserService
+from backend.app.utils.enum import UserRole
 
 router = APIRouter(tags=["User API"], prefix="/api/users")
 
+USER_PAGE_SIZE = 100
+
 
 @cbv(router)
 class UserRouter:
@@ -18,25 +26,71 @@ class UserRouter:
         self.user_service = user_service
 
     @router.post("/", response_model=UserOut)
-    def create_user(self, request: UserCreate, current_admin: User = Depends(get_current_active_admin)):
-        return self.user_service.create_user(request)
+    async def create_user(self, request: UserCreate, current_admin: UserSnapshot = Depends(get_current_active_admin)):
+        return await self.user_service.create_user(request)
+
+    @router.post("/import", response_model=UserImportReport)
+    async def import_users(
+        self,
+        rows: list[dict[str, Any]] = Body(...),
+        current_admin: UserSnapshot = Depends(get_current_active_admin),
+    ):
+        return await self.user_service.import_users(rows)
+
+    @router.post("/import/csv", response_model=UserImportReport)
+    async def import_users_csv(
+        self,
+        file: UploadFile = File(...),
+        current_admin: UserSnapshot = Depends(get_current_active_admin),
+    ):
+        try:
+            text = (await file.read()).decode("utf-8-sig")
+        except UnicodeDecodeError:
+            raise HTTPException(status_code=400, detail="CSV must be UTF-8 encoded")
+        # expects a header row of name,password,userRole
+        return await self.user_service.import_users(list(csv.DictReader(io.StringIO(text))))
 
     @router.get("/", response_model=list[UserOut])
-    def get_all_users(self, current_admin: User = Depends(get_current_active_admin)):
-        return self.user_service.get_all_users()
+    async def get_all_users(
+        self,
+        response: Response,
+        cursor: int | None = Query(default=None, description="userId of the last row of the previous page"),
+        limit: int | None = Query(
+            default=None, ge=1, le=1000, description=f"page size, {USER_PAGE_SIZE} with a cursor; without either, all users",
+        ),
+        role: UserRole | None = Query(default=None, alias="userRole"),
+        is_active: bool | None = Query(default=None, alias="isActive"),
+        name_prefix: str | None = Query(default=None, alias="namePrefix"),
+        format: Literal["json", "ndjson"] = "json",
+        current_admin: UserSnapshot = Depends(get_current_active_admin),
+    ):
+        role_value = role.value if role is not None else None
+        if format == "ndjson":
+            return StreamingResponse(
+                self.user_service.export_users(role_value, is_active, name_prefix),
+                media_type="application/x-ndjson",
+            )
+
+        # existing clients call this without paging parameters and expect the full list
+        if cursor is not None and limit is None:
+            limit = USER_PAGE_SIZE
+        users, next_cursor = await self.user_service.list_users(cursor, limit, role_value, is_active, name_prefix)
+        if next_cursor is not None:
+            response.headers["X-Next-Cursor"] = str(next_cursor)
+        return users
 
     @router.get("/{user_id}", response_model=UserOut)
-    def get_user(self, user_id: int, current_admin: User = Depends(get_current_active_admin)):
-        return self.user_service.get_user(user_id)
+    async def get_user(self, user_id: int, current_admin: UserSnapshot = Depends(get_current_active_admin)):
+        return await self.user_service.get_user(user_id)
 
     @router.patch("/{user_id}", response_model=UserOut)
-    def update_user(self, user_id: int, request: UserUpdate, current_admin: User = Depends(get_current_active_admin)):
-        return self.user_service.update_user(user_id, request)
+    async def update_user(self, user_id: int, request: UserUpdate, current_admin: UserSnapshot = Depends(get_current_active_admin)):
+        return await self.user_service.update_user(user_id, request)
 
     @router.patch("/{user_id}/activate", response_model=bool)
-    def activate_user(self, user_id: int, current_admin: User = Depends(get_current_active_admin)):
-        return self.user_service.activate_user(user_id)
+    async def activate_user(self, user_id: int, current_admin: UserSnapshot = Depends(get_current_active_admin)):
+        return await self.user_service.activate_user(user_id)
 
     @router.delete("/{user_id}", response_model=bool)
-    def deactivate_user(self, user_id: int, current_admin: User = Depends(get_current_active_admin)):
-        return self.user_service.deactivate_user(user_id)
+    async def deactivate_user(self, user_id: int, current_admin: UserSnapshot = Depends(get_current_active_admin)):
+        return await self.user_service.deactivate_user(user_id)
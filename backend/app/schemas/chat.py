@@ -0,0 +1,8 @@
+from pydantic import BaseModel, Field
+
+
+class ChatRequest(BaseModel):
+    question: str = Field(alias="question", min_length=1, max_length=4_000)
+    k: int | None = Field(default=None, alias="k", ge=1, le=50)
+    max_tokens: int | None = Field(default=None, alias="maxTokens", ge=1, le=4_096)
+    conversation_id: int | None = Field(default=None, alias="conversationId")
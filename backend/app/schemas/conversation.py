@@ -0,0 +1,55 @@
+from datetime import datetime, timezone
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+from backend.app.model.conversation import Conversation
+
+
+def _utc(value: datetime) -> datetime:
+    # SQLite hands timestamps back naive; they are always stored as UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+class ConversationCreate(BaseModel):
+    title: str | None = Field(default=None, alias="title", max_length=255)
+
+
+class ConversationOut(BaseModel):
+    id: int = Field(alias="conversationId")
+    title: str | None = Field(default=None, alias="title")
+    message_count: int = Field(alias="messageCount")
+    token_count: int = Field(alias="tokenCount")
+    updated_at: datetime = Field(alias="updatedAt")
+
+    @classmethod
+    def from_model(cls, model: Conversation) -> "ConversationOut":
+        return cls.model_validate(
+            {
+                "conversationId": model.conversation_id,
+                "title": model.title,
+                "messageCount": model.message_count,
+                "tokenCount": model.token_count,
+                "updatedAt": _utc(model.updated_at),
+            }
+        )
+
+
+class MessageOut(BaseModel):
+    seq: int = Field(alias="seq")
+    role: Literal["user", "assistant"] = Field(alias="role")
+    content: str = Field(alias="content")
+    token_count: int = Field(alias="tokenCount")
+    created_at: datetime = Field(alias="createdAt")
+
+    @classmethod
+    def from_row(cls, row) -> "MessageOut":
+        return cls.model_validate(
+            {
+                "seq": row.seq,
+                "role": row.role,
+                "content": row.content,
+                "tokenCount": row.token_count,
+                "createdAt": _utc(row.created_at),
+            }
+        )
@@ -0,0 +1,48 @@
+from datetime import datetime, timezone
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+from backend.app.model.document import Document
+
+
+class DocumentOut(BaseModel):
+    id: int = Field(alias="documentId")
+    source: str = Field(alias="source")
+    content_type: str | None = Field(default=None, alias="contentType")
+    content_hash: str = Field(alias="contentHash")
+    size_bytes: int = Field(alias="sizeBytes")
+    chunk_count: int = Field(alias="chunkCount")
+    updated_at: datetime = Field(alias="updatedAt")
+
+    @classmethod
+    def from_model(cls, model: Document) -> "DocumentOut":
+        updated_at = model.updated_at
+        # SQLite hands timestamps back naive; they are always stored as UTC
+        if updated_at.tzinfo is None:
+            updated_at = updated_at.replace(tzinfo=timezone.utc)
+        return cls.model_validate(
+            {
+                "documentId": model.document_id,
+                "source": model.source,
+                "contentType": model.content_type,
+                "contentHash": model.content_hash,
+                "sizeBytes": model.size_bytes,
+                "chunkCount": model.chunk_count,
+                "updatedAt": updated_at,
+            }
+        )
+
+
+class DocumentIngestResult(BaseModel):
+    status: Literal["created", "updated", "unchanged"] = Field(alias="status")
+    document: DocumentOut = Field(alias="document")
+
+
+class DocumentSearchHit(BaseModel):
+    chunk_id: int = Field(alias="chunkId")
+    document_id: int = Field(alias="documentId")
+    source: str = Field(alias="source")
+    ordinal: int = Field(alias="ordinal")
+    content: str = Field(alias="content")
+    score: float = Field(alias="score")
@@ -0,0 +1,58 @@
+from datetime import datetime, timezone
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+from backend.app.model.ingestion_job import IngestionJob
+
+
+def _utc(value: datetime | None) -> datetime | None:
+    # SQLite hands timestamps back naive; they are always stored as UTC
+    return value.replace(tzinfo=timezone.utc) if value is not None and value.tzinfo is None else value
+
+
+class IngestionJobOut(BaseModel):
+    id: int = Field(alias="jobId")
+    source: str = Field(alias="source")
+    status: Literal["queued", "running", "succeeded", "failed", "cancelled"] = Field(alias="status")
+    outcome: Literal["created", "updated", "unchanged"] | None = Field(default=None, alias="outcome")
+    document_id: int | None = Field(default=None, alias="documentId")
+    size_bytes: int = Field(alias="sizeBytes")
+    total_chunks: int | None = Field(default=None, alias="totalChunks")
+    committed_chunks: int = Field(alias="committedChunks")
+    progress: float = Field(alias="progress")
+    attempts: int = Field(alias="attempts")
+    cancel_requested: bool = Field(alias="cancelRequested")
+    error: str | None = Field(default=None, alias="error")
+    created_at: datetime = Field(alias="createdAt")
+    started_at: datetime | None = Field(default=None, alias="startedAt")
+    finished_at: datetime | None = Field(default=None, alias="finishedAt")
+    updated_at: datetime = Field(alias="updatedAt")
+
+    @classmethod
+    def from_model(cls, model: IngestionJob) -> "IngestionJobOut":
+        if model.total_chunks:
+            progress = model.committed_chunks / model.total_chunks
+        else:
+            # nothing to write (yet): only a finished job is complete
+            progress = 1.0 if model.status == "succeeded" else 0.0
+        return cls.model_validate(
+            {
+                "jobId": model.job_id,
+                "source": model.source,
+                "status": model.status,
+                "outcome": model.outcome,
+                "documentId": model.document_id,
+                "sizeBytes": model.size_bytes,
+                "totalChunks": model.total_chunks,
+                "committedChunks": model.committed_chunks,
+                "progress": progress,
+                "attempts": model.attempts,
+                "cancelRequested": model.cancel_requested,
+                "error": model.error,
+                "createdAt": _utc(model.created_at),
+                "startedAt": _utc(model.started_at),
+                "finishedAt": _utc(model.finished_at),
+                "updatedAt": _utc(model.updated_at),
+            }
+        )
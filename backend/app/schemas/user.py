@@ -1,4 +1,7 @@
+from typing import Literal
+
 from pydantic import BaseModel, Field, SecretStr, ConfigDict
+from sqlalchemy import Row
 
 from backend.app.model.user import User
 from backend.app.core.security import get_password_hash
@@ -14,10 +17,10 @@ class UserCreate(BaseModel):
         use_enum_values=True
     )
 
-    def to_model(self) -> User:
+    async def to_model(self) -> User:
         return User(
             name=self.name,
-            password=get_password_hash(self.password.get_secret_value()),
+            password=await get_password_hash(self.password.get_secret_value()),
             role=self.role
         )
 
@@ -31,11 +34,11 @@ class UserUpdate(BaseModel):
         use_enum_values=True
     )
 
-    def update_model(self, model: User) -> User:
+    async def update_model(self, model: User) -> User:
         update_data = self.model_dump(by_alias=False, exclude_unset=True, exclude_none=True)
         for key, value in update_data.items():
             if key == 'password' and value is not None:
-                value = get_password_hash(value.get_secret_value())
+                value = await get_password_hash(value.get_secret_value())
             setattr(model, key, value)
         return model
 
@@ -59,3 +62,27 @@ class UserOut(BaseModel):
             },
             from_attributes=True,
         )
+
+    @classmethod
+    def from_row(cls, row: Row) -> "UserOut":
+        # rows come straight from the DB, so validation is skipped
+        return cls.model_construct(id=row.user_id, name=row.name, role=row.role)
+
+    @staticmethod
+    def row_to_json(row: Row) -> dict:
+        return {"userId": row.user_id, "name": row.name, "userRole": row.role}
+
+
+class UserImportResult(BaseModel):
+    row: int = Field(alias="row")
+    name: str | None = Field(default=None, alias="name")
+    status: Literal["created", "duplicate", "invalid"] = Field(alias="status")
+    id: int | None = Field(default=None, alias="userId")
+    detail: str | None = Field(default=None, alias="detail")
+
+
+class UserImportReport(BaseModel):
+    created: int = Field(alias="created")
+    duplicates: int = Field(alias="duplicates")
+    invalid: int = Field(alias="invalid")
+    results: list[UserImportResult] = Field(alias="results")
@@ -0,0 +1,141 @@
+import json
+import logging
+import time
+from contextlib import aclosing
+from typing import AsyncIterator, Sequence
+
+from backend.app.config import settings
+from backend.app.core.metrics import registry
+from backend.app.rag.llm import ChatGenerator
+from backend.app.rag.response_cache import CachedResponse, ResponseCache
+from backend.app.schemas.document import DocumentSearchHit
+from backend.app.service.conversation import ConversationContext, ConversationService
+from backend.app.service.document import DocumentService
+
+logger = logging.getLogger(__name__)
+
+chat_first_token = registry.histogram(
+    "chat_first_token_seconds", "Time from request to the first generated token of a chat stream.",
+)
+chat_streams = registry.counter(
+    "chat_streams_total", "Chat streams by how they ended.", ("outcome",),
+)
+chat_tokens = registry.counter(
+    "chat_tokens_total", "Tokens streamed to chat clients.",
+)
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, separators=(',', ':'))}\n\n"
+
+
+def build_prompt(
+    question: str, hits: Sequence[DocumentSearchHit], history: ConversationContext | None = None,
+) -> str:
+    context = "\n\n".join(f"[{index}] {hit.source}\n{hit.content}" for index, hit in enumerate(hits, start=1))
+    conversation = ""
+    if history is not None and (history.summary or history.turns):
+        lines = [f"Summary of earlier turns:\n{history.summary}"] if history.summary else []
+        lines += [f"{role}: {content}" for role, content in history.turns]
+        conversation = "Conversation so far:\n" + "\n".join(lines) + "\n\n"
+    return (
+        f"Answer using only the context below.\n\n{conversation}"
+        f"Context:\n{context}\n\nQuestion: {question}\nAnswer:"
+    )
+
+
+async def _replay(pieces: Sequence[str]) -> AsyncIterator[str]:
+    for piece in pieces:
+        yield piece
+
+
+class ChatService:
+    def __init__(
+        self,
+        document_service: DocumentService,
+        generator: ChatGenerator,
+        conversation_service: ConversationService | None = None,
+        response_cache: ResponseCache | None = None,
+    ):
+        self.document_service = document_service
+        self.generator = generator
+        self.conversation_service = conversation_service
+        self.response_cache = response_cache
+
+    async def load_history(self, conversation_id: int, user_id: int) -> ConversationContext:
+        # resolved before the response starts, so an unknown conversation is still a plain 404
+        return await self.conversation_service.build_context(
+            conversation_id, user_id, settings.CHAT_HISTORY_TOKEN_BUDGET, settings.CHAT_HISTORY_MAX_MESSAGES,
+        )
+
+    async def stream(
+        self,
+        question: str,
+        k: int,
+        max_tokens: int,
+        history: ConversationContext | None = None,
+        user_id: int | None = None,
+    ) -> AsyncIterator[str]:
+        # each yield is one SSE frame; StreamingResponse sends it before pulling the next, so a slow
+        # client holds generation back instead of letting tokens pile up in memory
+        started = time.perf_counter()
+        tokens = 0
+        outcome = "disconnected"  # a cancelled or closed stream never reaches the other outcomes
+        try:
+            cached = question_vector = None
+            # answers that build on earlier turns are never shared
+            cacheable = self.response_cache is not None and (history is None or not (history.summary or history.turns))
+            if cacheable:
+                scope = (k, max_tokens)
+                # read before retrieval, so an answer generated while the corpus changed is not stored
+                version = self.document_service.corpus_version
+                cached = self.response_cache.get(question, scope, version)
+                if cached is None:
+                    # the embedder cache answers the search's own embed of the same question
+                    question_vector = (await self.document_service.batcher.embed([question]))[0]
+                    cached = self.response_cache.similar(question_vector, scope, version)
+            if cached is not None:
+                retrieved, source = cached.hits, _replay(cached.pieces)
+            else:
+                hits = await self.document_service.search(question, k)
+                retrieved = [hit.model_dump(by_alias=True) for hit in hits]
+                source = self.generator.stream(build_prompt(question, hits, history), max_tokens)
+            yield _sse("retrieval", retrieved)
+
+            # aclosing stops upstream generation as soon as this stream is cancelled or closed
+            answer = []
+            async with aclosing(source) as pieces:
+                async for piece in pieces:
+                    if tokens == 0 and registry.enabled:
+                        chat_first_token.observe(time.perf_counter() - started)
+                    tokens += 1
+                    answer.append(piece)
+                    yield _sse("token", {"text": piece})
+            if question_vector is not None:
+                self.response_cache.put(question, question_vector, scope, version, CachedResponse(retrieved, answer))
+            done = {"tokens": tokens}
+            if cached is not None:
+                done["cached"] = True
+            if history is not None:
+                # only finished exchanges are recorded; a disconnect leaves the conversation as it was
+                done["conversationId"] = history.conversation_id
+                done["seq"] = await self.conversation_service.append(
+                    history.conversation_id, user_id, [("user", question), ("assistant", "".join(answer))],
+                )
+            outcome = "completed"
+            yield _sse("done", done)
+        except Exception:
+            # headers are already sent, so failures can only be reported in-band
+            logger.exception("Chat stream failed")
+            outcome = "error"
+            yield _sse("error", {"detail": "Chat generation failed"})
+        finally:
+            if registry.enabled:
+                chat_streams.inc(1, outcome)
+                chat_tokens.inc(tokens)
+        if history is not None and outcome == "completed":
+            # the client already has its answer; folding old turns only delays closing the stream
+            try:
+                await self.conversation_service.summarize(history.conversation_id, user_id)
+            except Exception:
+                logger.exception("Summarizing conversation %s failed", history.conversation_id)
@@ -0,0 +1,131 @@
+from dataclasses import dataclass
+from typing import List, Sequence
+
+from fastapi import HTTPException
+
+from backend.app.config import settings
+from backend.app.model.conversation import Conversation
+from backend.app.rag.llm import ChatGenerator, Summarizer
+from backend.app.repository.base import UnitOfWork, transactional
+from backend.app.repository.conversation import ConversationRepository
+from backend.app.schemas.conversation import ConversationOut, MessageOut
+
+# turns older than this many unsummarised messages are dropped rather than summarised
+FOLD_SCAN_LIMIT = 1_000
+
+
+@dataclass(slots=True)
+class ConversationContext:
+    conversation_id: int
+    summary: str | None
+    turns: list[tuple[str, str]]  # (role, content), oldest first
+    tokens: int
+
+
+class ConversationService:
+    def __init__(
+        self,
+        conversation_repo: ConversationRepository,
+        uow: UnitOfWork,
+        generator: ChatGenerator,
+        summarizer: Summarizer | None = None,
+    ):
+        self.conversation_repo = conversation_repo
+        self.uow = uow
+        self.generator = generator
+        self.summarizer = summarizer
+
+    async def _get_conversation(self, conversation_id: int, user_id: int) -> Conversation:
+        # someone else's conversation is indistinguishable from a missing one
+        conversation = await self.conversation_repo.get_owned(conversation_id, user_id)
+        if conversation is None:
+            raise HTTPException(status_code=404, detail="Conversation not found")
+        return conversation
+
+    @transactional
+    async def create_conversation(self, user_id: int, title: str | None = None) -> ConversationOut:
+        conversation = await self.conversation_repo.add(Conversation(user_id=user_id, title=title))
+        return ConversationOut.from_model(conversation)
+
+    async def list_conversations(self, user_id: int, limit: int) -> List[ConversationOut]:
+        return [
+            ConversationOut.from_model(conversation)
+            for conversation in await self.conversation_repo.list_for_user(user_id, limit)
+        ]
+
+    async def get_messages(
+        self, conversation_id: int, user_id: int, limit: int, before: int | None = None,
+    ) -> List[MessageOut]:
+        await self._get_conversation(conversation_id, user_id)
+        rows = await self.conversation_repo.last_messages(conversation_id, limit, before_seq=before)
+        return [MessageOut.from_row(row) for row in reversed(rows)]
+
+    @transactional
+    async def delete_conversation(self, conversation_id: int, user_id: int) -> bool:
+        conversation = await self._get_conversation(conversation_id, user_id)
+        await self.conversation_repo.delete_messages(conversation_id)
+        await self.conversation_repo.delete(conversation)
+        return True
+
+    @transactional
+    async def append(self, conversation_id: int, user_id: int, turns: Sequence[tuple[str, str]]) -> int:
+        # messages are only ever inserted; tokens are counted once here so prompt assembly just sums them
+        messages = [(role, content, self.generator.count_tokens(content)) for role, content in turns]
+        last_seq = await self.conversation_repo.reserve(
+            conversation_id, user_id, len(messages), sum(tokens for _, _, tokens in messages),
+        )
+        if last_seq is None:
+            raise HTTPException(status_code=404, detail="Conversation not found")
+        await self.conversation_repo.insert_messages(conversation_id, last_seq - len(messages) + 1, messages)
+        return last_seq
+
+    async def build_context(
+        self, conversation_id: int, user_id: int, budget: int, max_messages: int,
+    ) -> ConversationContext:
+        conversation = await self._get_conversation(conversation_id, user_id)
+        summary = conversation.summary or None
+        tokens = conversation.summary_token_count if summary else 0
+        turns: list[tuple[str, str]] = []
+        # newest first until the budget is spent; only turns the summary does not already cover
+        for row in await self.conversation_repo.last_messages(
+            conversation_id, max_messages, after_seq=conversation.summarized_through,
+        ):
+            if tokens + row.token_count > budget:
+                break
+            tokens += row.token_count
+            turns.append((row.role, row.content))
+        turns.reverse()
+        return ConversationContext(conversation_id, summary, turns, tokens)
+
+    @transactional
+    async def summarize(self, conversation_id: int, user_id: int) -> bool:
+        if self.summarizer is None:
+            return False
+        conversation = await self._get_conversation(conversation_id, user_id)
+        if conversation.token_count - conversation.summarized_token_count <= settings.CHAT_SUMMARIZE_AFTER_TOKENS:
+            return False
+
+        rows = await self.conversation_repo.last_messages(
+            conversation_id, FOLD_SCAN_LIMIT, after_seq=conversation.summarized_through,
+        )
+        # the newest turns that fit next to a full-size summary stay verbatim, everything older is folded
+        window = settings.CHAT_HISTORY_TOKEN_BUDGET - settings.CHAT_SUMMARY_MAX_TOKENS
+        kept = kept_tokens = 0
+        while kept < min(len(rows), settings.CHAT_HISTORY_MAX_MESSAGES) and kept_tokens + rows[kept].token_count <= window:
+            kept_tokens += rows[kept].token_count
+            kept += 1
+        folded = rows[kept:][::-1]
+        if not folded:
+            return False
+
+        summary = await self.summarizer.summarize(
+            conversation.summary, [(row.role, row.content) for row in folded], settings.CHAT_SUMMARY_MAX_TOKENS,
+        )
+        return await self.conversation_repo.fold_summary(
+            conversation_id,
+            conversation.summarized_through,
+            folded[-1].seq,
+            summary,
+            self.generator.count_tokens(summary),
+            kept_tokens,
+        )
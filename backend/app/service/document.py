@@ -0,0 +1,474 @@
+import asyncio
+import hashlib
+import itertools
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import BinaryIO, Callable, Dict, Iterator, List, Literal, Sequence
+
+import numpy as np
+from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
+
+from backend.app.config import settings
+from backend.app.core.metrics import registry
+from backend.app.model.document import Document
+from backend.app.rag.chunker import TextChunk, iter_chunks
+from backend.app.rag.embedding import Embedder
+from backend.app.rag.embedding_batcher import EmbeddingBatcher
+from backend.app.rag.lexical import Bm25Index
+from backend.app.rag.parser import ParsedFile, iter_file_text, iter_source_files, parse_file
+from backend.app.rag.vector_store import VectorStore
+from backend.app.repository.base import UnitOfWork, transactional
+from backend.app.repository.document import DocumentRepository
+from backend.app.schemas.document import DocumentIngestResult, DocumentOut, DocumentSearchHit
+
+
+document_ingest_files = registry.counter(
+    "document_ingest_files_total", "Files seen by directory ingestion, by outcome.", ("status",),
+)
+document_ingest_chunks = registry.counter(
+    "document_ingest_chunks_total", "Chunks written by directory ingestion.",
+)
+
+
+@dataclass(slots=True)
+class IngestReport:
+    files: int = 0
+    chunks: int = 0
+    statuses: Counter = field(default_factory=Counter)
+    failed: Dict[str, str] = field(default_factory=dict)
+    seconds: float = 0.0
+
+    @property
+    def files_per_second(self) -> float:
+        return self.files / self.seconds if self.seconds else 0.0
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self.chunks / self.seconds if self.seconds else 0.0
+
+
+def _hash_stream(stream: BinaryIO, block_size: int = 1024 * 1024) -> tuple[str, int]:
+    digest = hashlib.sha256()
+    size = 0
+    stream.seek(0)
+    while block := stream.read(block_size):
+        digest.update(block)
+        size += len(block)
+    stream.seek(0)
+    return digest.hexdigest(), size
+
+
+def _next_batch(chunks: Iterator[TextChunk], size: int) -> list[TextChunk]:
+    return list(itertools.islice(chunks, size))
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[tuple[int, float]]], k: int) -> list[tuple[int, float]]:
+    # scores only depend on rank, so BM25 and cosine scores never have to be put on one scale
+    fused: dict[int, float] = {}
+    for ranking in rankings:
+        for rank, (chunk_id, _) in enumerate(ranking, start=1):
+            fused[chunk_id] = fused.get(chunk_id, 0.0) + 1 / (k + rank)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
+
+
+class DocumentService:
+    def __init__(
+        self,
+        document_repo: DocumentRepository,
+        uow: UnitOfWork,
+        embedder: Embedder,
+        vector_store: VectorStore,
+        batcher: EmbeddingBatcher | None = None,
+        lexical_index: Bm25Index | None = None,
+    ):
+        self.document_repo = document_repo
+        self.uow = uow
+        self.embedder = embedder
+        self.vector_store = vector_store
+        # shared with every other caller so concurrent queries and uploads are embedded together
+        self.batcher = batcher or EmbeddingBatcher(embedder, max_items=0, max_wait_ms=0)
+        self.lexical_index = lexical_index
+        # bumped whenever committed chunks change, so anything derived from the corpus can tell it is stale
+        self.corpus_version = 0
+
+    async def _get_document(self, document_id: int) -> Document:
+        document = await self.document_repo.get(document_id)
+        if document is None:
+            raise HTTPException(status_code=404, detail="Document not found")
+        return document
+
+    def _replace_chunks(self, stale_ids: List[int], new_rows: List[int], new_slots: List[int], new_ids: List[int]) -> None:
+        self.corpus_version += 1
+        if stale_ids:
+            self.vector_store.delete(stale_ids)
+            if self.lexical_index is not None:
+                self.lexical_index.delete(stale_ids)
+        if new_ids:
+            self.vector_store.activate(new_rows, new_ids)
+            if self.lexical_index is not None:
+                self.lexical_index.activate(new_slots, new_ids)
+        self.vector_store.flush()
+
+    async def _reconcile_lexical(self, chunk_ids: List[int]) -> None:
+        # the snapshot may predate the last commits (or not exist yet); the database is the source of truth
+        indexed = self.lexical_index.ids()
+        committed = set(chunk_ids)
+        stale = indexed - committed
+        missing = sorted(committed - indexed)
+        if stale:
+            self.lexical_index.delete(list(stale))
+        for start in range(0, len(missing), 1_000):
+            rows = await self.document_repo.get_chunks(missing[start:start + 1_000])
+            slots = await asyncio.to_thread(self.lexical_index.append, [row.content for row in rows])
+            self.lexical_index.activate(slots, [row.chunk_id for row in rows])
+        if stale or missing:
+            await asyncio.to_thread(self.lexical_index.save)
+
+    async def open_index(self, directory: str) -> None:
+        rows, chunk_ids = await self.document_repo.vector_rows()
+        self.vector_store.open(directory, rows, chunk_ids)
+        self.embedder.open(directory)
+        if self.lexical_index is not None:
+            await asyncio.to_thread(self.lexical_index.open, directory)
+            await self._reconcile_lexical(chunk_ids)
+
+    async def close_index(self) -> None:
+        if self.lexical_index is not None:
+            await asyncio.to_thread(self.lexical_index.save)
+        self.vector_store.close()
+
+    @transactional
+    async def _find_document(self, source: str) -> Document | None:
+        # its own short transaction, so no read snapshot is held open while the upload is embedded
+        return await self.document_repo.find_by_source(source)
+
+    async def ingest(
+        self,
+        source: str,
+        stream: BinaryIO,
+        content_type: str | None = None,
+        uploaded_by: int | None = None,
+    ) -> DocumentIngestResult:
+        digest, size = await asyncio.to_thread(_hash_stream, stream)
+        if size > settings.DOCUMENT_MAX_BYTES:
+            raise HTTPException(status_code=413, detail="Document is too large")
+
+        document = await self._find_document(source)
+        if document is not None and document.content_hash == digest:
+            # unchanged upload: nothing to chunk or embed
+            return DocumentIngestResult(status="unchanged", document=DocumentOut.from_model(document))
+
+        # chunked and embedded before the write transaction opens, so the writer lock (the whole database, on
+        # SQLite) is only held for the inserts; the text and its vectors are bounded by DOCUMENT_MAX_BYTES
+        chunks = iter_chunks(
+            iter_file_text(stream, os.path.splitext(source)[1]), settings.CHUNK_SIZE, settings.CHUNK_OVERLAP,
+        )
+        new_chunks: List[TextChunk] = []
+        vectors: List[np.ndarray] = []
+        while batch := await asyncio.to_thread(_next_batch, chunks, settings.EMBEDDING_BATCH_SIZE):
+            vectors.append(await self.batcher.embed([chunk.text for chunk in batch]))
+            new_chunks.extend(batch)
+
+        for attempt in range(2):
+            try:
+                return await self._store_ingested(
+                    source, content_type, digest, size, uploaded_by, new_chunks, vectors,
+                )
+            except IntegrityError as exc:
+                # a concurrent upload created the same source since the lookup; the retry finds it and updates it
+                if attempt:
+                    raise HTTPException(status_code=409, detail="Document was changed by a concurrent upload") from exc
+
+    @transactional
+    async def _store_ingested(
+        self,
+        source: str,
+        content_type: str | None,
+        digest: str,
+        size: int,
+        uploaded_by: int | None,
+        chunks: List[TextChunk],
+        vectors: List[np.ndarray],
+    ) -> DocumentIngestResult:
+        # looked up again: another upload of the same source may have committed while this one was embedding
+        document = await self.document_repo.find_by_source(source)
+        if document is not None and document.content_hash == digest:
+            return DocumentIngestResult(status="unchanged", document=DocumentOut.from_model(document))
+
+        status = "created" if document is None else "updated"
+        stale_ids: List[int] = []
+        if document is None:
+            document = await self.document_repo.add(
+                Document(source=source, content_type=content_type, content_hash=digest, size_bytes=size, uploaded_by=uploaded_by)
+            )
+        else:
+            stale_ids = await self.document_repo.delete_chunks(document.document_id)
+        # appended only once the upload is known to change the document, so an unchanged or conflicting
+        # upload never takes store rows; they stay invisible until the commit activates them
+        new_rows = [row for batch in vectors for row in self.vector_store.append(batch).tolist()]
+        new_slots: List[int] = []
+        if self.lexical_index is not None and chunks:
+            new_slots = (await asyncio.to_thread(self.lexical_index.append, [chunk.text for chunk in chunks])).tolist()
+        new_ids = await self.document_repo.insert_chunks(
+            document.document_id, chunks, [content_hash(chunk.text) for chunk in chunks], new_rows,
+        ) if chunks else []
+
+        document.content_type = content_type
+        document.content_hash = digest
+        document.size_bytes = size
+        document.chunk_count = len(new_ids)
+        document.uploaded_by = uploaded_by
+        document.updated_at = datetime.now(timezone.utc)
+        await self.document_repo.update(document)
+
+        # the indexes only learn about chunks whose rows actually committed
+        self.uow.after_commit(lambda: self._replace_chunks(stale_ids, new_rows, new_slots, new_ids))
+        return DocumentIngestResult(status=status, document=DocumentOut.from_model(document))
+
+    @transactional
+    async def begin_document(
+        self,
+        source: str,
+        content_type: str | None,
+        digest: str,
+        size: int,
+        uploaded_by: int | None = None,
+    ) -> tuple[Literal["created", "updated", "unchanged"], Document]:
+        # first step of a resumable ingest: the document exists without chunks before any batch is written,
+        # and append_chunks/complete_document fill it in one committed batch at a time
+        document = await self.document_repo.find_by_source(source)
+        if document is not None and document.content_hash == digest:
+            return "unchanged", document
+        if document is None:
+            document = await self.document_repo.add(
+                Document(source=source, content_type=content_type, content_hash="", size_bytes=size, uploaded_by=uploaded_by)
+            )
+            return "created", document
+        stale_ids = await self.document_repo.delete_chunks(document.document_id)
+        # an empty hash matches no upload, so a half-written document is never taken as unchanged
+        document.content_hash = ""
+        document.chunk_count = 0
+        document.updated_at = datetime.now(timezone.utc)
+        self.uow.after_commit(lambda: self._replace_chunks(stale_ids, [], [], []))
+        return "updated", document
+
+    @transactional
+    async def append_chunks(self, document_id: int, chunks: Sequence[TextChunk]) -> int:
+        texts = [chunk.text for chunk in chunks]
+        rows = self.vector_store.append(await self.batcher.embed(texts)).tolist()
+        slots: List[int] = []
+        if self.lexical_index is not None:
+            slots = (await asyncio.to_thread(self.lexical_index.append, texts)).tolist()
+        new_ids = await self.document_repo.insert_chunks(
+            document_id, chunks, [content_hash(text) for text in texts], rows,
+        )
+        await self.document_repo.add_chunk_count(document_id, len(new_ids))
+        # searchable as soon as the batch commits, before the rest of the document is written
+        self.uow.after_commit(lambda: self._replace_chunks([], rows, slots, new_ids))
+        return len(new_ids)
+
+    @transactional
+    async def complete_document(
+        self,
+        document_id: int,
+        content_type: str | None,
+        digest: str,
+        size: int,
+        uploaded_by: int | None = None,
+    ) -> Document:
+        document = await self._get_document(document_id)
+        # chunk_count was advanced by plain UPDATEs, so the loaded row is refreshed before it is returned
+        await self.document_repo.db.refresh(document)
+        document.content_type = content_type
+        document.content_hash = digest
+        document.size_bytes = size
+        document.uploaded_by = uploaded_by
+        document.updated_at = datetime.now(timezone.utc)
+        return document
+
+    @transactional
+    async def store_parsed(self, files: Sequence[ParsedFile], uploaded_by: int | None = None) -> Dict[str, str]:
+        # writes a group of parsed files in one transaction: their chunks are embedded in shared batches and
+        # inserted with one statement, whichever file they came from
+        existing = await self.document_repo.find_by_sources([parsed.source for parsed in files])
+        statuses = {parsed.source: "unchanged" for parsed in files}
+        changed = [
+            parsed for parsed in files
+            if parsed.chunks is not None
+            and (parsed.source not in existing or existing[parsed.source].content_hash != parsed.digest)
+        ]
+        if not changed:
+            return statuses
+
+        stale_ids = await self.document_repo.delete_chunks(
+            [existing[parsed.source].document_id for parsed in changed if parsed.source in existing]
+        )
+        created = [parsed for parsed in changed if parsed.source not in existing]
+        created_ids = await self.document_repo.insert_documents(
+            [
+                {
+                    "source": parsed.source,
+                    "content_type": parsed.content_type,
+                    "content_hash": parsed.digest,
+                    "size_bytes": parsed.size,
+                    "chunk_count": len(parsed.chunks),
+                    "uploaded_by": uploaded_by,
+                }
+                for parsed in created
+            ]
+        ) if created else []
+        document_ids = {parsed.source: document_id for parsed, document_id in zip(created, created_ids)}
+        for parsed in changed:
+            document = existing.get(parsed.source)
+            if document is None:
+                statuses[parsed.source] = "created"
+                continue
+            document.content_type = parsed.content_type
+            document.content_hash = parsed.digest
+            document.size_bytes = parsed.size
+            document.chunk_count = len(parsed.chunks)
+            document.uploaded_by = uploaded_by
+            document.updated_at = datetime.now(timezone.utc)
+            document_ids[parsed.source] = document.document_id
+            statuses[parsed.source] = "updated"
+
+        chunks = [chunk for parsed in changed for chunk in parsed.chunks]
+        owners = [document_ids[parsed.source] for parsed in changed for _ in parsed.chunks]
+        new_rows: List[int] = []
+        new_slots: List[int] = []
+        for start in range(0, len(chunks), settings.EMBEDDING_BATCH_SIZE):
+            texts = [chunk.text for chunk in chunks[start:start + settings.EMBEDDING_BATCH_SIZE]]
+            new_rows.extend(self.vector_store.append(await self.batcher.embed(texts)).tolist())
+            if self.lexical_index is not None:
+                new_slots.extend((await asyncio.to_thread(self.lexical_index.append, texts)).tolist())
+        new_ids = await self.document_repo.insert_chunk_rows(
+            owners, chunks, [content_hash(chunk.text) for chunk in chunks], new_rows,
+        ) if chunks else []
+
+        self.uow.after_commit(lambda: self._replace_chunks(stale_ids, new_rows, new_slots, new_ids))
+        return statuses
+
+    async def ingest_directory(
+        self,
+        root: str,
+        workers: int | None = None,
+        max_in_flight: int | None = None,
+        commit_chunks: int | None = None,
+        uploaded_by: int | None = None,
+        progress: Callable[[IngestReport], None] | None = None,
+    ) -> IngestReport:
+        workers = workers or settings.INGEST_WORKERS or os.cpu_count() or 1
+        max_in_flight = max_in_flight or settings.INGEST_MAX_IN_FLIGHT_FILES
+        commit_chunks = commit_chunks or settings.INGEST_COMMIT_CHUNKS
+        # unchanged files are recognised by their hash in the worker and never chunked
+        known = await self.document_repo.content_hashes()
+        loop = asyncio.get_running_loop()
+        report = IngestReport()
+        started = time.perf_counter()
+        paths = iter_source_files(root)
+        pending: set[asyncio.Future] = set()
+        group: List[ParsedFile] = []
+        group_chunks = 0
+
+        def submit() -> None:
+            # bounded in-flight work: parsed files waiting to be written never outnumber max_in_flight
+            while len(pending) < max_in_flight and (item := next(paths, None)) is not None:
+                path, source = item
+                pending.add(loop.run_in_executor(
+                    pool, parse_file, path, source, known.get(source),
+                    settings.CHUNK_SIZE, settings.CHUNK_OVERLAP, settings.DOCUMENT_MAX_BYTES,
+                ))
+
+        pool = ProcessPoolExecutor(max_workers=workers)
+        try:
+            submit()
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # workers keep parsing the next files while this batch is embedded and written
+                submit()
+                for future in done:
+                    parsed = future.result()
+                    report.files += 1
+                    if parsed.error is not None:
+                        report.failed[parsed.source] = parsed.error
+                        report.statuses["failed"] += 1
+                    elif parsed.chunks is None:
+                        report.statuses["unchanged"] += 1
+                    else:
+                        group.append(parsed)
+                        group_chunks += len(parsed.chunks)
+                if group and (group_chunks >= commit_chunks or not pending):
+                    for status in (await self.store_parsed(group, uploaded_by)).values():
+                        report.statuses[status] += 1
+                    report.chunks += group_chunks
+                    group, group_chunks = [], 0
+                    if progress is not None:
+                        report.seconds = time.perf_counter() - started
+                        progress(report)
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+        report.seconds = time.perf_counter() - started
+        if registry.enabled:
+            for status, count in report.statuses.items():
+                document_ingest_files.inc(count, status)
+            document_ingest_chunks.inc(report.chunks)
+        return report
+
+    async def list_documents(self) -> List[DocumentOut]:
+        return [DocumentOut.from_model(document) for document in await self.document_repo.list_documents()]
+
+    @transactional
+    async def delete_document(self, document_id: int) -> bool:
+        document = await self._get_document(document_id)
+        stale_ids = await self.document_repo.delete_chunks(document_id)
+        await self.document_repo.delete(document)
+        self.uow.after_commit(lambda: self._replace_chunks(stale_ids, [], [], []))
+        return True
+
+    async def _vector_search(self, query: str, k: int) -> list[tuple[int, float]]:
+        query_vector = (await self.batcher.embed([query]))[0]
+        return await asyncio.to_thread(self.vector_store.search, query_vector, k)
+
+    async def search(
+        self, query: str, k: int, mode: Literal["vector", "lexical", "hybrid"] | None = None,
+    ) -> List[DocumentSearchHit]:
+        mode = mode or settings.RETRIEVAL_MODE
+        if self.lexical_index is None:
+            mode = "vector"
+        if mode == "hybrid":
+            # both retrievers run at once; each goes deeper than k so fusion has overlap to work with
+            depth = max(k, settings.RETRIEVAL_CANDIDATES)
+            rankings = await asyncio.gather(
+                self._vector_search(query, depth),
+                asyncio.to_thread(self.lexical_index.search, query, depth),
+            )
+            hits = reciprocal_rank_fusion(rankings, settings.RRF_K)[:k]
+        elif mode == "lexical":
+            hits = await asyncio.to_thread(self.lexical_index.search, query, k)
+        else:
+            hits = await self._vector_search(query, k)
+        if not hits:
+            return []
+        rows = {row.chunk_id: row for row in await self.document_repo.get_chunks([chunk_id for chunk_id, _ in hits])}
+        return [
+            DocumentSearchHit.model_construct(
+                chunk_id=chunk_id,
+                document_id=rows[chunk_id].document_id,
+                source=rows[chunk_id].source,
+                ordinal=rows[chunk_id].ordinal,
+                content=rows[chunk_id].content,
+                score=score,
+            )
+            for chunk_id, score in hits
+            if chunk_id in rows
+        ]
@@ -0,0 +1,280 @@
+import asyncio
+import hashlib
+import itertools
+import logging
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import BinaryIO, Callable, Iterator, List
+
+from fastapi import HTTPException
+
+from backend.app.config import settings
+from backend.app.core.metrics import registry
+from backend.app.model.ingestion_job import IngestionJob
+from backend.app.rag.chunker import TextChunk, iter_chunks
+from backend.app.rag.parser import iter_file_text
+from backend.app.repository.base import UnitOfWork, transactional
+from backend.app.repository.ingestion_job import IngestionJobRepository
+from backend.app.schemas.ingestion_job import IngestionJobOut
+from backend.app.service.document import DocumentService
+from backend.app.utils.enum import JobStatus
+
+logger = logging.getLogger(__name__)
+
+ingestion_jobs_finished = registry.counter(
+    "ingestion_jobs_finished_total", "Background ingestion jobs that stopped running, by final status.", ("status",),
+)
+ingestion_job_chunks = registry.counter(
+    "ingestion_job_chunks_total", "Chunks committed by background ingestion jobs.",
+)
+
+SPOOL_SWEEP_BATCH = 500
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobLost(Exception):
+    pass
+
+
+def _spool(stream: BinaryIO, directory: str, max_bytes: int, block_size: int = 1024 * 1024) -> tuple[str, str, int]:
+    # copies the upload out of the request and hashes it in the same pass; stops writing past max_bytes
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, uuid.uuid4().hex)
+    digest = hashlib.sha256()
+    size = 0
+    stream.seek(0)
+    with open(path, "wb") as handle:
+        while block := stream.read(block_size):
+            size += len(block)
+            if size > max_bytes:
+                break
+            digest.update(block)
+            handle.write(block)
+    return path, digest.hexdigest(), size
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _chunks(handle: BinaryIO, source: str) -> Iterator[TextChunk]:
+    return iter_chunks(
+        iter_file_text(handle, os.path.splitext(source)[1]), settings.CHUNK_SIZE, settings.CHUNK_OVERLAP,
+    )
+
+
+def _count_chunks(path: str, source: str) -> int:
+    with open(path, "rb") as handle:
+        return sum(1 for _ in _chunks(handle, source))
+
+
+def _next_batch(chunks: Iterator[TextChunk], size: int) -> List[TextChunk]:
+    return list(itertools.islice(chunks, size))
+
+
+class IngestionJobService:
+    def __init__(self, job_repo: IngestionJobRepository, document_service: DocumentService, uow: UnitOfWork):
+        self.job_repo = job_repo
+        self.document_service = document_service
+        self.uow = uow
+        # set by the worker pool while it runs, so a new job starts without waiting for the next poll
+        self.notify: Callable[[], None] | None = None
+
+    def _wake(self) -> None:
+        if self.notify is not None:
+            self.notify()
+
+    async def _get_job(self, job_id: int) -> IngestionJob:
+        job = await self.job_repo.get_fresh(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Ingestion job not found")
+        return job
+
+    @transactional
+    async def enqueue(
+        self,
+        source: str,
+        stream: BinaryIO,
+        content_type: str | None = None,
+        created_by: int | None = None,
+    ) -> IngestionJobOut:
+        path, digest, size = await asyncio.to_thread(_spool, stream, settings.INGEST_SPOOL_DIR, settings.DOCUMENT_MAX_BYTES)
+        if size > settings.DOCUMENT_MAX_BYTES:
+            await asyncio.to_thread(_remove, path)
+            raise HTTPException(status_code=413, detail="Document is too large")
+        try:
+            job = await self.job_repo.add(
+                IngestionJob(
+                    source=source, content_type=content_type, content_hash=digest, size_bytes=size,
+                    file_path=path, created_by=created_by,
+                )
+            )
+        except BaseException:
+            await asyncio.to_thread(_remove, path)
+            raise
+        self.uow.after_commit(self._wake)
+        return IngestionJobOut.from_model(job)
+
+    async def get_job(self, job_id: int) -> IngestionJobOut:
+        return IngestionJobOut.from_model(await self._get_job(job_id))
+
+    async def list_jobs(self, status: JobStatus | None, limit: int) -> List[IngestionJobOut]:
+        jobs = await self.job_repo.list_jobs(status.value if status is not None else None, limit)
+        return [IngestionJobOut.from_model(job) for job in jobs]
+
+    @transactional
+    async def cancel(self, job_id: int) -> IngestionJobOut:
+        path = (await self._get_job(job_id)).file_path
+        cancelled = await self.job_repo.transition(
+            job_id, (JobStatus.QUEUED.value,),
+            status=JobStatus.CANCELLED.value, finished_at=datetime.now(timezone.utc), file_path=None,
+        )
+        if cancelled:
+            # nothing of a job that never started is worth resuming, so its upload goes right away
+            self.uow.after_commit(lambda: _remove(path))
+        # a running job stops before its next batch; the batches it already committed stay searchable
+        elif not await self.job_repo.transition(job_id, (JobStatus.RUNNING.value,), cancel_requested=True):
+            raise HTTPException(status_code=409, detail="Ingestion job has already finished")
+        return IngestionJobOut.from_model(await self._get_job(job_id))
+
+    @transactional
+    async def retry(self, job_id: int) -> IngestionJobOut:
+        job = await self._get_job(job_id)
+        if job.status in (JobStatus.FAILED.value, JobStatus.CANCELLED.value) and job.file_path is None:
+            raise HTTPException(status_code=409, detail="The upload of this job was discarded; enqueue it again")
+        # the spooled file is kept until the job succeeds or is swept, and the retry resumes from committed_chunks
+        requeued = await self.job_repo.transition(
+            job_id, (JobStatus.FAILED.value, JobStatus.CANCELLED.value), IngestionJob.file_path.is_not(None),
+            status=JobStatus.QUEUED.value, cancel_requested=False, error=None, finished_at=None,
+        )
+        if not requeued:
+            raise HTTPException(status_code=409, detail="Only failed or cancelled jobs can be retried")
+        self.uow.after_commit(self._wake)
+        return IngestionJobOut.from_model(await self._get_job(job_id))
+
+    @transactional
+    async def _discard_uploads(self, finished_before: datetime) -> List[str]:
+        return await self.job_repo.discard_uploads(finished_before, SPOOL_SWEEP_BATCH)
+
+    async def discard_stale_uploads(self) -> int:
+        # failed and cancelled jobs nobody retried within the retention window give their upload back;
+        # the files go only after the job rows commit, so a concurrent retry never loses its file
+        finished_before = datetime.now(timezone.utc) - timedelta(hours=settings.INGEST_SPOOL_RETENTION_HOURS)
+        discarded = 0
+        while paths := await self._discard_uploads(finished_before):
+            for path in paths:
+                await asyncio.to_thread(_remove, path)
+            discarded += len(paths)
+        return discarded
+
+    @transactional
+    async def claim_next(self) -> tuple[int, int] | None:
+        stale_before = datetime.now(timezone.utc) - timedelta(seconds=settings.INGEST_JOB_STALE_SECONDS)
+        return await self.job_repo.claim_next(stale_before)
+
+    @transactional
+    async def release(self, job_id: int, attempt: int) -> bool:
+        # hands a job interrupted by shutdown straight back to the queue instead of waiting for it to go stale
+        return await self.job_repo.set_owned(job_id, attempt, status=JobStatus.QUEUED.value)
+
+    async def _write(self, job_id: int, attempt: int, **values) -> None:
+        if not await self.job_repo.set_owned(job_id, attempt, **values):
+            raise JobLost()
+
+    @transactional
+    async def _heartbeat(self, job_id: int, attempt: int) -> None:
+        await self._write(job_id, attempt)
+
+    @transactional
+    async def _begin(self, job: IngestionJob, attempt: int) -> None:
+        # fenced first, so a worker that lost the job never touches the document
+        await self._write(job.job_id, attempt)
+        outcome, document = await self.document_service.begin_document(
+            job.source, job.content_type, job.content_hash, job.size_bytes, job.created_by,
+        )
+        # the document and the job that is filling it commit together, so a restart always finds one from the other
+        await self._write(
+            job.job_id, attempt, outcome=outcome, document_id=document.document_id, committed_chunks=0,
+            total_chunks=0 if outcome == "unchanged" else None,
+        )
+
+    @transactional
+    async def _set_total(self, job_id: int, attempt: int, total: int) -> None:
+        await self._write(job_id, attempt, total_chunks=total)
+
+    @transactional
+    async def _commit_batch(self, job: IngestionJob, attempt: int, batch: List[TextChunk], committed: int) -> None:
+        await self._write(job.job_id, attempt)
+        if await self.job_repo.is_cancel_requested(job.job_id):
+            raise JobCancelled()
+        await self.document_service.append_chunks(job.document_id, batch)
+        # the resume point commits with the chunks it counts; updated_at is the heartbeat
+        await self._write(job.job_id, attempt, committed_chunks=committed)
+
+    @transactional
+    async def _complete(self, job: IngestionJob, attempt: int) -> None:
+        await self._write(job.job_id, attempt, status=JobStatus.SUCCEEDED.value, finished_at=datetime.now(timezone.utc))
+        if job.outcome != "unchanged":
+            await self.document_service.complete_document(
+                job.document_id, job.content_type, job.content_hash, job.size_bytes, job.created_by,
+            )
+
+    @transactional
+    async def _finish(self, job_id: int, attempt: int, status: JobStatus, error: str | None = None) -> None:
+        await self._write(job_id, attempt, status=status.value, error=error, finished_at=datetime.now(timezone.utc))
+
+    async def _process(self, job_id: int, attempt: int) -> None:
+        job = await self._get_job(job_id)
+        if job.outcome is None or job.document_id is None:
+            await self._begin(job, attempt)
+            job = await self._get_job(job_id)
+        if job.outcome != "unchanged":
+            if job.total_chunks is None:
+                # counting a large file takes a while; beat on both sides of it so the job is not taken as stale
+                await self._heartbeat(job_id, attempt)
+                total = await asyncio.to_thread(_count_chunks, job.file_path, job.source)
+                await self._set_total(job_id, attempt, total)
+            committed = job.committed_chunks
+            handle = await asyncio.to_thread(open, job.file_path, "rb")
+            try:
+                # chunking is deterministic, so skipping the committed prefix resumes exactly where the last attempt stopped
+                chunks = itertools.islice(_chunks(handle, job.source), committed, None)
+                while batch := await asyncio.to_thread(_next_batch, chunks, settings.INGEST_JOB_BATCH_CHUNKS):
+                    committed += len(batch)
+                    await self._commit_batch(job, attempt, batch, committed)
+                    if registry.enabled:
+                        ingestion_job_chunks.inc(len(batch))
+            finally:
+                handle.close()
+        await self._complete(job, attempt)
+        await asyncio.to_thread(_remove, job.file_path)
+
+    async def run_job(self, job_id: int, attempt: int) -> IngestionJobOut:
+        # runs a claimed job to its end; every batch is its own transaction, so a crash loses one batch at most
+        status = JobStatus.SUCCEEDED
+        try:
+            try:
+                await self._process(job_id, attempt)
+            except JobCancelled:
+                status = JobStatus.CANCELLED
+                await self._finish(job_id, attempt, status)
+            except JobLost:
+                raise
+            except Exception as exc:
+                logger.exception("Ingestion job %d failed", job_id)
+                status = JobStatus.FAILED
+                await self._finish(job_id, attempt, status, str(exc) or type(exc).__name__)
+        except JobLost:
+            # another worker took the job over after this one went quiet; it owns the job and its outcome now
+            logger.warning("Ingestion job %d attempt %d was taken over by another worker", job_id, attempt)
+            return IngestionJobOut.from_model(await self._get_job(job_id))
+        if registry.enabled:
+            ingestion_jobs_finished.inc(1, status.value)
+        return IngestionJobOut.from_model(await self._get_job(job_id))
@@ -0,0 +1,108 @@
+import asyncio
+import logging
+import time
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from backend.app.db.base import bind_session
+from backend.app.service.ingestion_job import IngestionJobService
+
+logger = logging.getLogger(__name__)
+
+SPOOL_SWEEP_SECONDS = 10 * 60
+
+
+class IngestionWorkerPool:
+    # in-process workers for the ingestion job table. The vector store takes a lock on its directory, so one
+    # app process owns the index and runs the only pool; jobs are still claimed through the database.
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        job_service: IngestionJobService,
+        workers: int,
+        poll_seconds: float,
+    ):
+        self.session_factory = session_factory
+        self.job_service = job_service
+        self.workers = workers
+        self.poll_seconds = poll_seconds
+        self.jobs_run = 0
+        self._next_sweep = 0.0
+        self._tasks: list[asyncio.Task] = []
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wakeup: asyncio.Event | None = None
+
+    def wake(self) -> None:
+        # called from after-commit hooks, which may run on another thread's loop
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def _release(self, job_id: int, attempt: int) -> None:
+        async with self.session_factory() as session:
+            with bind_session(session):
+                await self.job_service.release(job_id, attempt)
+
+    async def run_once(self) -> bool:
+        async with self.session_factory() as session:
+            with bind_session(session):
+                claimed = await self.job_service.claim_next()
+                if claimed is None:
+                    return False
+                try:
+                    await self.job_service.run_job(*claimed)
+                except asyncio.CancelledError:
+                    # a failed release must not replace the cancellation, or _run would keep the worker polling
+                    # and stop() would never return; the job is then claimed again once it goes stale
+                    try:
+                        await self._release(*claimed)
+                    except Exception:
+                        logger.exception("Could not release ingestion job %d", claimed[0])
+                    raise
+        self.jobs_run += 1
+        return True
+
+    async def sweep_uploads(self) -> None:
+        # one idle worker at a time, every SPOOL_SWEEP_SECONDS
+        if time.monotonic() < self._next_sweep:
+            return
+        self._next_sweep = time.monotonic() + SPOOL_SWEEP_SECONDS
+        async with self.session_factory() as session:
+            with bind_session(session):
+                discarded = await self.job_service.discard_stale_uploads()
+        if discarded:
+            logger.info("Discarded %d uploads of failed or cancelled ingestion jobs", discarded)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                busy = await self.run_once()
+                if not busy:
+                    await self.sweep_uploads()
+            except Exception:
+                logger.exception("Ingestion worker failed")
+                busy = False
+            if not busy:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+
+    def start(self) -> None:
+        if self.workers > 0 and not self._tasks:
+            self._loop = asyncio.get_running_loop()
+            self._wakeup = asyncio.Event()
+            self._tasks = [
+                asyncio.create_task(self._run(), name=f"ingestion-worker-{index}") for index in range(self.workers)
+            ]
+            self.job_service.notify = self.wake
+
+    async def stop(self) -> None:
+        if not self._tasks:
+            return
+        self.job_service.notify = None
+        self._loop = None
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
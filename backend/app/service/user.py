@@ -1,50 +1,155 @@
-from typing import List
+import json
+from typing import Any, AsyncIterator, List
 
 from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
 
-from backend.app.repository.base import transactional
+from backend.app.config import settings
+from backend.app.core.security import password_hasher
+from backend.app.core.token_cache import token_cache
+from backend.app.repository.base import UnitOfWork, transactional
 from backend.app.repository.user import UserRepository
-from backend.app.schemas.user import UserCreate, UserUpdate, UserOut
+from backend.app.schemas.user import UserCreate, UserImportReport, UserImportResult, UserUpdate, UserOut
 from backend.app.model.user import User
 
 
 class UserService:
-    def __init__(self, user_repo: UserRepository):
+    def __init__(self, user_repo: UserRepository, uow: UnitOfWork):
         self.user_repo = user_repo
+        self.uow = uow
 
-    def _get_user(self, user_id: int) -> User:
-        user = self.user_repo.get(user_id)
+    async def _get_user(self, user_id: int) -> User:
+        user = await self.user_repo.get(user_id)
         if user is None:
             raise HTTPException(status_code=404, detail="User not found")
         return user
 
     @transactional
-    def create_user(self, request: UserCreate) -> UserOut:
-        if self.user_repo.find_by_username(request.name):
+    async def create_user(self, request: UserCreate) -> UserOut:
+        if await self.user_repo.find_by_username(request.name):
             raise HTTPException(status_code=409, detail="User already exists")
-        return UserOut.from_model(self.user_repo.add(request.to_model()))
+        return UserOut.from_model(await self.user_repo.add(await request.to_model()))
 
-    def get_all_users(self) -> List[UserOut]:
-        users = self.user_repo.get_all()
-        return [UserOut.from_model(user) for user in users] if users else []
+    async def import_users(self, rows: list[dict[str, Any]]) -> UserImportReport:
+        if len(rows) > settings.USER_IMPORT_MAX_ROWS:
+            raise HTTPException(
+                status_code=413, detail=f"At most {settings.USER_IMPORT_MAX_ROWS} users can be imported at once"
+            )
 
-    def get_user(self, user_id: int) -> UserOut:
-        user = self._get_user(user_id)
+        results: list[UserImportResult | None] = [None] * len(rows)
+        pending: dict[str, tuple[int, UserCreate]] = {}
+        for index, row in enumerate(rows):
+            try:
+                request = UserCreate.model_validate(row)
+            except ValidationError as exc:
+                name = row.get("name") if isinstance(row, dict) else None
+                detail = "; ".join(f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in exc.errors())
+                results[index] = UserImportResult.model_construct(
+                    row=index, name=name, status="invalid", id=None, detail=detail
+                )
+                continue
+            if request.name in pending:
+                results[index] = UserImportResult.model_construct(
+                    row=index, name=request.name, status="duplicate", id=None, detail="Duplicate name in import"
+                )
+                continue
+            pending[request.name] = (index, request)
+
+        for name in await self.user_repo.find_existing_names(pending):
+            index, _ = pending.pop(name)
+            results[index] = UserImportResult.model_construct(
+                row=index, name=name, status="duplicate", id=None, detail="User already exists"
+            )
+
+        requests = list(pending.values())
+        hashes = await password_hasher.hash_many([request.password.get_secret_value() for _, request in requests])
+        batch_size = settings.USER_IMPORT_BATCH_SIZE
+        for start in range(0, len(requests), batch_size):
+            batch = [
+                {"name": request.name, "password": hashed, "role": request.role, "is_active": True}
+                for (_, request), hashed in zip(requests[start:start + batch_size], hashes[start:start + batch_size])
+            ]
+            inserted = []
+            while batch:
+                try:
+                    inserted = await self.user_repo.insert_many(batch)
+                    break
+                except IntegrityError:
+                    # concurrent creates took some names since the lookup; drop them and retry the rest,
+                    # so earlier committed batches still get their per-row report
+                    taken = await self.user_repo.find_existing_names(row["name"] for row in batch)
+                    if not taken:
+                        raise
+                    for name in taken:
+                        index, _ = pending[name]
+                        results[index] = UserImportResult.model_construct(
+                            row=index, name=name, status="duplicate", id=None, detail="User already exists"
+                        )
+                    batch = [row for row in batch if row["name"] not in taken]
+            for user_id, name in inserted:
+                index, _ = pending[name]
+                results[index] = UserImportResult.model_construct(
+                    row=index, name=name, status="created", id=user_id, detail=None
+                )
+
+        counts = {"created": 0, "duplicate": 0, "invalid": 0}
+        for result in results:
+            counts[result.status] += 1
+        return UserImportReport.model_construct(
+            created=counts["created"], duplicates=counts["duplicate"], invalid=counts["invalid"], results=results
+        )
+
+    async def list_users(
+        self,
+        cursor: int | None,
+        limit: int | None,
+        role: str | None = None,
+        is_active: bool | None = None,
+        name_prefix: str | None = None,
+    ) -> tuple[List[UserOut], int | None]:
+        if limit is None:
+            # no page requested: every matching user in one response, as before pagination
+            rows = await self.user_repo.find_page(cursor, None, role, is_active, name_prefix)
+            return [UserOut.from_row(row) for row in rows], None
+        rows = await self.user_repo.find_page(cursor, limit + 1, role, is_active, name_prefix)
+        next_cursor = rows[limit - 1].user_id if len(rows) > limit else None
+        return [UserOut.from_row(row) for row in rows[:limit]], next_cursor
+
+    async def export_users(
+        self,
+        role: str | None = None,
+        is_active: bool | None = None,
+        name_prefix: str | None = None,
+    ) -> AsyncIterator[bytes]:
+        batch: list[str] = []
+        async for row in self.user_repo.stream_rows(role, is_active, name_prefix):
+            batch.append(json.dumps(UserOut.row_to_json(row), ensure_ascii=False))
+            if len(batch) >= 1_000:
+                yield ("\n".join(batch) + "\n").encode()
+                batch.clear()
+        if batch:
+            yield ("\n".join(batch) + "\n").encode()
+
+    async def get_user(self, user_id: int) -> UserOut:
+        user = await self._get_user(user_id)
         return UserOut.from_model(user)
 
     @transactional
-    def update_user(self, user_id: int, request: UserUpdate) -> UserOut:
-        user = self._get_user(user_id)
-        user = request.update_model(user)
+    async def update_user(self, user_id: int, request: UserUpdate) -> UserOut:
+        user = await self._get_user(user_id)
+        user = await request.update_model(user)
+        self.uow.after_commit(lambda: token_cache.invalidate_user(user_id))
 
-        return UserOut.from_model(self.user_repo.update(user))
+        return UserOut.from_model(await self.user_repo.update(user))
 
     @transactional
-    def activate_user(self, user_id: int) -> bool:
-        user = self._get_user(user_id)
-        return True if self.user_repo.activate(user) else False
+    async def activate_user(self, user_id: int) -> bool:
+        user = await self._get_user(user_id)
+        return True if await self.user_repo.activate(user) else False
 
     @transactional
-    def deactivate_user(self, user_id: int) -> bool:
-        user = self._get_user(user_id)
-        return True if self.user_repo.deactivate(user) else False
+    async def deactivate_user(self, user_id: int) -> bool:
+        user = await self._get_user(user_id)
+        self.uow.after_commit(lambda: token_cache.invalidate_user(user_id))
+        return True if await self.user_repo.deactivate(user) else False
@@ -5,3 +5,11 @@ class UserRole(str, Enum):
     ADMIN = 'admin'
     USER = 'user'
     GUEST = 'guest'
+
+
+class JobStatus(str, Enum):
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    CANCELLED = 'cancelled'
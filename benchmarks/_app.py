@@ -0,0 +1,62 @@
+import os
+import statistics
+import tempfile
+from pathlib import Path
+
+DEFAULT_ENV = {
+    "NAME": "bench-backend",
+    "PORT": "8002",
+    "SECRET_KEY": "bench-secret",
+    "ALGORITHM": "HS256",
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "30",
+    "REFRESH_TOKEN_EXPIRE_MINUTES": "60",
+    "ADMIN_NAME": "bench-admin",
+    "ADMIN_PASSWORD": "bench-password",
+}
+
+
+def configure_environment(**overrides: str) -> Path:
+    for key, value in {**DEFAULT_ENV, **overrides}.items():
+        os.environ[key] = str(value)
+    return Path(tempfile.mkdtemp(prefix="rag-bench-"))
+
+
+def build_app(work_dir: Path):
+    os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{work_dir / 'bench.db'}")
+
+    from backend.app.main import create_app
+
+    return create_app()
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return float("nan")
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(label: str, samples: list[float]) -> str:
+    if not samples:
+        return f"{label:<28} no samples"
+    return (
+        f"{label:<28} n={len(samples):<6} "
+        f"mean={statistics.fmean(samples) * 1000:8.2f}ms "
+        f"p50={percentile(samples, 50) * 1000:8.2f}ms "
+        f"p99={percentile(samples, 99) * 1000:8.2f}ms"
+    )
+
+
+async def open_database(work_dir: Path, url: str | None = None):
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from backend.app.db import base as db_base
+    from backend.app.model import refresh_token, user  # noqa: F401  registers the mappers
+
+    engine = create_async_engine(url or f"sqlite+aiosqlite:///{work_dir / 'bench.db'}")
+    db_base.engine = engine
+    db_base.SessionLocal.configure(bind=engine)
+    async with engine.begin() as conn:
+        await conn.run_sync(db_base.Base.metadata.create_all)
+    return engine
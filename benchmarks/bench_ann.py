@@ -0,0 +1,87 @@
+"""Recall@k against latency for the IVF index, compared with exact search.
+
+Vectors are drawn around random cluster centres so they have the kind of
+structure a coarse quantizer can exploit; uniformly random vectors would
+make any ANN index look bad. Queries are perturbed corpus rows, and recall
+is measured against MmapVectorStore's exact top-k on the same file.
+
+    python -m benchmarks.bench_ann --vectors 100000 1000000 --nprobe 1 4 16 32 64
+"""
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks._app import summarize
+
+
+def _clustered_rows(rng, count: int, dimension: int, clusters: int, noise: float) -> np.ndarray:
+    centers = rng.standard_normal((clusters, dimension), dtype=np.float32)
+    rows = np.empty((count, dimension), dtype=np.float32)
+    for start in range(0, count, 50_000):
+        end = min(count, start + 50_000)
+        rows[start:end] = centers[rng.integers(0, clusters, end - start)]
+        rows[start:end] += noise * rng.standard_normal((end - start, dimension), dtype=np.float32)
+    rows /= np.linalg.norm(rows, axis=1, keepdims=True)
+    return rows
+
+
+def _run_size(count: int, args) -> None:
+    from backend.app.rag.ann import IvfVectorStore
+    from backend.app.rag.vector_store import MmapVectorStore
+
+    rng = np.random.default_rng(0)
+    vectors = _clustered_rows(rng, count, args.dimension, args.clusters, args.noise)
+    directory = tempfile.mkdtemp(prefix="rag-bench-ann-")
+    store = IvfVectorStore(args.dimension, args.lists, args.nprobe[0], train_min_rows=count + 1)
+    store.open(directory)
+    store.activate(store.append(vectors), np.arange(count))
+    started = time.perf_counter()
+    store.train()
+    store.flush()
+    print(f"\n{count} x {args.dimension}: trained {args.lists} lists in {time.perf_counter() - started:.1f}s")
+
+    queries = vectors[rng.choice(count, args.queries, replace=False)]
+    queries = queries + 0.1 * rng.standard_normal(queries.shape, dtype=np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    del vectors
+
+    exact = MmapVectorStore(args.dimension)
+    exact.open(directory, np.arange(count), np.arange(count))
+    truth, samples = [], []
+    for query in queries:
+        started = time.perf_counter()
+        truth.append({chunk_id for chunk_id, _ in exact.search(query, args.k)})
+        samples.append(time.perf_counter() - started)
+    print("  " + summarize(f"exact k={args.k} recall=1.000", samples))
+
+    for nprobe in args.nprobe:
+        store.search_many(queries[:1], args.k, nprobe=nprobe)  # warm-up: folds incremental list segments
+        found, samples = 0, []
+        for query, expected in zip(queries, truth):
+            started = time.perf_counter()
+            hits = store.search_many(query[None, :], args.k, nprobe=nprobe)[0]
+            samples.append(time.perf_counter() - started)
+            found += len(expected & {chunk_id for chunk_id, _ in hits})
+        recall = found / (len(queries) * args.k)
+        print("  " + summarize(f"ivf nprobe={nprobe:<3} recall={recall:.3f}", samples))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--vectors", type=int, nargs="+", default=[100_000])
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--clusters", type=int, default=2_000)
+    parser.add_argument("--noise", type=float, default=1.0, help="spread around each centre; higher is harder")
+    parser.add_argument("--lists", type=int, default=1_024)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 16, 32, 64])
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+    for count in args.vectors:
+        _run_size(count, args)
+
+
+if __name__ == "__main__":
+    main()
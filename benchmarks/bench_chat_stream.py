@@ -0,0 +1,120 @@
+"""Time to first byte, time to first token and tokens/sec of POST /api/chat/.
+
+Runs uvicorn on a local socket (httpx's in-process ASGI transport buffers
+whole responses, which would hide streaming), ingests a few documents and
+streams answers from the fake generator. With --tokens-per-second 0 the
+generator is unthrottled, so the rate measures the server's per-frame
+overhead rather than the model. The last line checks that a client that
+hangs up mid-answer is counted as disconnected, i.e. generation stopped.
+
+    python -m benchmarks.bench_chat_stream --tokens-per-second 0 50 --concurrency 1 16
+"""
+import argparse
+import asyncio
+import os
+import socket
+import time
+
+from benchmarks._app import build_app, configure_environment, summarize
+
+TOPICS = ["dependency injection", "background tasks", "streaming responses", "oauth2 scopes", "websockets"]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _ask(client, headers, max_tokens: int, ttfb: list, ttft: list, rates: list) -> None:
+    started = time.perf_counter()
+    first_token = None
+    tokens = 0
+    async with client.stream(
+        "POST", "/api/chat/", json={"question": "how do streaming responses work", "maxTokens": max_tokens},
+        headers=headers,
+    ) as response:
+        ttfb.append(time.perf_counter() - started)
+        async for line in response.aiter_lines():
+            if line == "event: token":
+                tokens += 1
+                if first_token is None:
+                    first_token = time.perf_counter()
+                    ttft.append(first_token - started)
+    if tokens > 1:
+        rates.append((tokens - 1) / (time.perf_counter() - first_token))
+
+
+async def _hang_up(client, headers) -> None:
+    async with client.stream(
+        "POST", "/api/chat/", json={"question": "streaming", "maxTokens": 4_096}, headers=headers,
+    ) as response:
+        async for line in response.aiter_lines():
+            if line == "event: token":
+                break
+
+
+async def _measure(client, headers, rate: float, args) -> None:
+    from backend.app.core.container import container
+    from backend.app.rag.llm import FakeChatGenerator
+
+    # the container is built once per process, so the pace is swapped on the shared generator
+    container.chat_service.generator = FakeChatGenerator(rate)
+    await _ask(client, headers, 8, [], [], [])
+    for concurrency in args.concurrency:
+        ttfb, ttft, rates = [], [], []
+        for _ in range(args.rounds):
+            await asyncio.gather(*(_ask(client, headers, args.max_tokens, ttfb, ttft, rates) for _ in range(concurrency)))
+        print(f"rate={rate:g} concurrency={concurrency}")
+        print("  " + summarize("time to first byte", ttfb))
+        print("  " + summarize("time to first token", ttft))
+        print(f"  tokens/sec per stream        mean={sum(rates) / len(rates):9.0f}")
+
+
+async def _run(args) -> None:
+    import httpx
+    import uvicorn
+
+    work_dir = configure_environment()
+    os.environ["VECTOR_STORE_DIR"] = str(work_dir / "vectors")
+    app = build_app(work_dir)
+    port = _free_port()
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=60) as client:
+            login = await client.post("/api/auth/token", data={"username": "bench-admin", "password": "bench-password"})
+            headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+            for index, topic in enumerate(TOPICS):
+                body = f"FastAPI {topic} section {index}. " + f"Details about {topic} and how it works. " * 200
+                await client.post(
+                    "/api/documents/", files={"file": (f"{index}.md", body.encode(), "text/markdown")}, headers=headers,
+                )
+
+            for rate in args.tokens_per_second:
+                await _measure(client, headers, rate, args)
+
+            await _hang_up(client, headers)
+            await asyncio.sleep(0.2)
+            metrics = (await client.get("/metrics")).text
+            disconnected = [line for line in metrics.splitlines() if 'outcome="disconnected"' in line]
+            print(f"after a mid-stream hang-up: {disconnected or 'no disconnect recorded'}")
+    finally:
+        server.should_exit = True
+        await serving
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tokens-per-second", type=float, nargs="+", default=[0, 50])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16])
+    parser.add_argument("--max-tokens", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=5)
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""Directory ingestion throughput: the process-pool pipeline against per-file uploads.
+
+Builds a synthetic documentation tree of --files Markdown and HTML files
+(sizes drawn between --min-kb and --max-kb) and ingests it three ways:
+"sequential" is the upload path, DocumentService.ingest once per file with
+its own transaction (it does not strip HTML, so it stores a few more
+chunks); "pipeline wN" is DocumentService.ingest_directory with
+N parser processes. A second pipeline pass over the unchanged tree shows
+the cost of a no-op re-run. Process-pool gains need as many free cores as
+workers.
+
+    python -m benchmarks.bench_directory_ingest --files 10000 --workers 1 4
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+
+from benchmarks._app import configure_environment, open_database
+
+WORDS = (
+    "path operation dependency injection router middleware background task response model "
+    "validation security token schema request body query parameter header cookie"
+).split()
+
+
+def _build_tree(root: str, files: int, min_kb: int, max_kb: int) -> int:
+    rng = random.Random(0)
+    total = 0
+    for index in range(files):
+        directory = os.path.join(root, f"section-{index % 50:02d}")
+        os.makedirs(directory, exist_ok=True)
+        size = rng.randrange(min_kb * 1024, max_kb * 1024 + 1)
+        paragraphs, length = [], 0
+        while length < size:
+            paragraph = " ".join(rng.choice(WORDS) + str(rng.randrange(500)) for _ in range(60))
+            paragraphs.append(paragraph)
+            length += len(paragraph) + 2
+        if index % 4 == 0:
+            body = "".join(f"<p>{paragraph}</p>\n" for paragraph in paragraphs)
+            text, name = f"<html><body><h1>Page {index}</h1>{body}</body></html>", f"page-{index}.html"
+        else:
+            text, name = f"# Page {index}\n\n" + "\n\n".join(paragraphs), f"page-{index}.md"
+        with open(os.path.join(directory, name), "w") as handle:
+            handle.write(text)
+        total += len(text)
+    return total
+
+
+def _service(args):
+    from backend.app.rag.embedding import HashingEmbedder
+    from backend.app.rag.lexical import Bm25Index
+    from backend.app.rag.vector_store import MmapVectorStore
+    from backend.app.repository.base import UnitOfWork
+    from backend.app.repository.document import DocumentRepository
+    from backend.app.service.document import DocumentService
+
+    return DocumentService(
+        DocumentRepository(), UnitOfWork(), HashingEmbedder(args.dimension), MmapVectorStore(args.dimension),
+        lexical_index=Bm25Index(save_every=10**9),
+    )
+
+
+async def _sequential(service, root: str) -> tuple[int, int, float]:
+    from backend.app.db.base import SessionLocal, bind_session
+    from backend.app.rag.parser import iter_source_files
+
+    files = chunks = 0
+    started = time.perf_counter()
+    for path, source in iter_source_files(root):
+        async with SessionLocal() as session:
+            with bind_session(session):
+                with open(path, "rb") as handle:
+                    result = await service.ingest(source, handle, "text/markdown")
+        files += 1
+        chunks += result.document.chunk_count
+    return files, chunks, time.perf_counter() - started
+
+
+async def _run_mode(args, root: str, label: str, workers: int | None) -> None:
+    from backend.app.db.base import SessionLocal, bind_session
+
+    work_dir = configure_environment()
+    engine = await open_database(work_dir, args.database_url)
+    service = _service(args)
+    async with SessionLocal() as session:
+        with bind_session(session):
+            await service.open_index(str(work_dir / "vectors"))
+
+    if workers is None:
+        files, chunks, seconds = await _sequential(service, root)
+        print(f"{label:<16} {files} files {chunks} chunks in {seconds:6.1f}s: "
+              f"{files / seconds:7.0f} files/s {chunks / seconds:8.0f} chunks/s")
+    else:
+        for run in ("first", "unchanged"):
+            async with SessionLocal() as session:
+                with bind_session(session):
+                    report = await service.ingest_directory(root, workers, args.max_in_flight, args.commit_chunks)
+            print(f"{label + ' ' + run:<16} {report.files} files {report.chunks} chunks in {report.seconds:6.1f}s: "
+                  f"{report.files_per_second:7.0f} files/s {report.chunks_per_second:8.0f} chunks/s")
+    await engine.dispose()
+
+
+async def _run(args) -> None:
+    from backend.app.model import document  # noqa: F401  registers the mappers
+
+    root = os.path.join(configure_environment(), "tree")
+    started = time.perf_counter()
+    size = _build_tree(root, args.files, args.min_kb, args.max_kb)
+    print(f"{args.files} files, {size / 2**20:.0f} MiB, generated in {time.perf_counter() - started:.1f}s "
+          f"({os.cpu_count()} CPUs)")
+    if not args.skip_sequential:
+        await _run_mode(args, root, "sequential", None)
+    for workers in args.workers:
+        await _run_mode(args, root, f"pipeline w{workers}", workers)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=10_000)
+    parser.add_argument("--min-kb", type=int, default=2)
+    parser.add_argument("--max-kb", type=int, default=12)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    parser.add_argument("--max-in-flight", type=int, default=64)
+    parser.add_argument("--commit-chunks", type=int, default=1_000)
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--skip-sequential", action="store_true")
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
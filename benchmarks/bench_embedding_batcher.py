@@ -0,0 +1,78 @@
+"""Query-embedding throughput and latency with and without micro-batching.
+
+Each simulated user embeds one query at a time in a loop, like the chat
+path. The model is the hashing embedder plus a sleep of --call-ms per call
+and --item-ms per text, the cost shape of a batched neural encoder (a fixed
+launch cost and a small marginal cost per row). "direct" is the previous
+behaviour: one worker-thread call per request.
+
+    python -m benchmarks.bench_embedding_batcher --users 1 16 64 --call-ms 5 --item-ms 0.1
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks._app import summarize
+
+
+class _ModelCost:
+    def __init__(self, inner, call_seconds: float, item_seconds: float):
+        self.inner = inner
+        self.name = inner.name
+        self.dimension = inner.dimension
+        self.call_seconds = call_seconds
+        self.item_seconds = item_seconds
+
+    def open(self, directory) -> None:
+        pass
+
+    def embed(self, texts):
+        time.sleep(self.call_seconds + self.item_seconds * len(texts))
+        return self.inner.embed(texts)
+
+
+async def _user(embed, user: int, requests: int, samples: list[float]) -> None:
+    for index in range(requests):
+        started = time.perf_counter()
+        await embed([f"user {user} asks question number {index} about vector search"])
+        samples.append(time.perf_counter() - started)
+
+
+async def _measure(label: str, embed, users: int, requests: int) -> None:
+    samples: list[float] = []
+    started = time.perf_counter()
+    await asyncio.gather(*(_user(embed, user, requests, samples) for user in range(users)))
+    elapsed = time.perf_counter() - started
+    print(f"{summarize(label, samples)} {len(samples) / elapsed:8.0f} req/s")
+
+
+async def _run(args) -> None:
+    from backend.app.rag.embedding import HashingEmbedder
+    from backend.app.rag.embedding_batcher import EmbeddingBatcher
+
+    model = _ModelCost(HashingEmbedder(args.dimension), args.call_ms / 1000, args.item_ms / 1000)
+    for users in args.users:
+        direct = EmbeddingBatcher(model, max_items=0, max_wait_ms=0)
+        await _measure(f"direct   users={users}", direct.embed, users, args.requests)
+
+        batcher = EmbeddingBatcher(model, args.max_items, args.max_wait_ms)
+        batcher.start()
+        await _measure(f"batched  users={users}", batcher.embed, users, args.requests)
+        await batcher.stop()
+        print(f"{'':<29}mean batch {batcher.texts / batcher.batches:6.1f} texts over {batcher.batches} calls")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--requests", type=int, default=50, help="queries per user")
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--call-ms", type=float, default=5.0)
+    parser.add_argument("--item-ms", type=float, default=0.1)
+    parser.add_argument("--max-items", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Re-ingestion time of a mostly-unchanged corpus with and without the embedding cache.
+
+Every document gets a paragraph appended, so each one is re-chunked and
+re-embedded but most of its chunks are byte-identical to the last run. The
+hashing embedder is far cheaper than a real encoder, so --model-ms adds a
+per-text sleep to stand in for model cost; with 0 the numbers show the
+cache's own overhead. The "disk" mode runs without a memory tier, which is
+how every lookup behaves right after a restart.
+
+    python -m benchmarks.bench_embedding_cache --documents 300 --model-ms 0 2
+"""
+import argparse
+import asyncio
+import io
+import random
+import time
+
+from benchmarks._app import configure_environment, open_database
+
+WORDS = "retrieval augmented generation vector index chunk overlap embedding cache query answer context".split()
+
+
+class _SlowEmbedder:
+    # wraps the hashing embedder with a fixed per-text cost, standing in for a neural encoder
+    def __init__(self, inner, seconds_per_text: float):
+        self.inner = inner
+        self.name = inner.name
+        self.dimension = inner.dimension
+        self.seconds_per_text = seconds_per_text
+        self.texts = 0
+
+    def open(self, directory) -> None:
+        pass
+
+    def embed(self, texts):
+        self.texts += len(texts)
+        if self.seconds_per_text:
+            time.sleep(self.seconds_per_text * len(texts))
+        return self.inner.embed(texts)
+
+
+def _corpus(documents: int, chars: int) -> dict[str, str]:
+    rng = random.Random(0)
+    corpus = {}
+    for index in range(documents):
+        words, size = [], 0
+        while size < chars:
+            word = rng.choice(WORDS) + str(rng.randrange(1000))
+            words.append(word)
+            size += len(word) + 1
+        corpus[f"doc-{index:05d}.md"] = " ".join(words)
+    return corpus
+
+
+async def _ingest(service, session_factory, corpus: dict[str, str]) -> float:
+    from backend.app.db.base import bind_session
+
+    started = time.perf_counter()
+    for source, text in corpus.items():
+        async with session_factory() as session:
+            with bind_session(session):
+                await service.ingest(source, io.BytesIO(text.encode()), "text/markdown")
+    return time.perf_counter() - started
+
+
+async def _run_mode(args, mode: str, model_ms: float, corpus: dict[str, str]) -> None:
+    work_dir = configure_environment()
+    engine = await open_database(work_dir)
+
+    from backend.app.db.base import SessionLocal, bind_session
+    from backend.app.rag.embedding import HashingEmbedder
+    from backend.app.rag.embedding_cache import CachedEmbedder
+    from backend.app.rag.vector_store import MmapVectorStore
+    from backend.app.repository.base import UnitOfWork
+    from backend.app.repository.document import DocumentRepository
+    from backend.app.service.document import DocumentService
+
+    model = _SlowEmbedder(HashingEmbedder(args.dimension), model_ms / 1000)
+    # disk-only has no memory tier, which is what every lookup looks like right after a restart
+    memory_bytes = args.memory_mb * 1024 * 1024 if mode == "memory+disk" else 0
+    embedder = model if mode == "uncached" else CachedEmbedder(model, memory_bytes)
+    service = DocumentService(DocumentRepository(), UnitOfWork(), embedder, MmapVectorStore(args.dimension))
+    async with SessionLocal() as session:
+        with bind_session(session):
+            await service.open_index(str(work_dir / "vectors"))
+
+    first = await _ingest(service, SessionLocal, corpus)
+    first_texts = model.texts
+    edited = {source: text + "\n\nAppended section about " + source for source, text in corpus.items()}
+    second = await _ingest(service, SessionLocal, edited)
+    label = f"{mode:<11} model={model_ms:g}ms/text"
+    print(
+        f"{label:<28} first ingest {first:7.2f}s ({first_texts} embedded)  "
+        f"re-ingest {second:7.2f}s ({model.texts - first_texts} embedded)"
+    )
+    if mode != "uncached":
+        print(f"{'':<28} hits={embedder.hits} misses={embedder.misses}")
+    await engine.dispose()
+
+
+async def _run(args) -> None:
+    from backend.app.model import document  # noqa: F401  registers the mappers
+
+    corpus = _corpus(args.documents, args.chars)
+    for model_ms in args.model_ms:
+        for mode in ("uncached", "memory+disk", "disk"):
+            await _run_mode(args, mode, model_ms, corpus)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--documents", type=int, default=300)
+    parser.add_argument("--chars", type=int, default=20_000)
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--memory-mb", type=int, default=64)
+    parser.add_argument("--model-ms", type=float, nargs="+", default=[0, 2])
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Concurrent login + refresh throughput under different engine profiles.
+
+Each profile runs in its own interpreter because the engine is built from
+settings at import time.
+
+    python -m benchmarks.bench_engine_profiles
+    python -m benchmarks.bench_engine_profiles --profile tuned --clients 32
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks._app import build_app, configure_environment, summarize
+
+PROFILES = {
+    # what db/base.py did before: statement echo, rollback journal, SQLAlchemy's default pool
+    "baseline": {
+        "DB_ECHO": "true",
+        "DB_POOL_SIZE": "5",
+        "DB_MAX_OVERFLOW": "10",
+        "SQLITE_JOURNAL_MODE": "DELETE",
+        "SQLITE_SYNCHRONOUS": "FULL",
+        "SQLITE_MMAP_SIZE": "0",
+    },
+    "tuned": {},
+}
+
+
+async def _run(args) -> None:
+    import httpx
+
+    work_dir = configure_environment(**PROFILES[args.profile])
+    app = build_app(work_dir)
+    form = {"username": "bench-admin", "password": "bench-password"}
+    login_latencies: list[float] = []
+    refresh_latencies: list[float] = []
+    failures = 0
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+
+        async def client_session() -> None:
+            nonlocal failures
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                started = time.perf_counter()
+                response = await client.post("/api/auth/token", data=form)
+                login_latencies.append(time.perf_counter() - started)
+                if response.status_code != 200:
+                    failures += 1
+                    return
+                refresh_token = response.cookies.get("refresh_token")
+                for _ in range(args.refreshes):
+                    started = time.perf_counter()
+                    response = await client.post("/api/auth/refresh", cookies={"refresh_token": refresh_token})
+                    refresh_latencies.append(time.perf_counter() - started)
+                    if response.status_code != 200:
+                        # a failed rotation rolls back, so the old token is still the live one
+                        failures += 1
+                        continue
+                    refresh_token = response.cookies.get("refresh_token")
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client_session() for _ in range(args.clients)))
+        elapsed = time.perf_counter() - started
+
+    print(f"profile={args.profile} clients={args.clients} refreshes/client={args.refreshes}", file=sys.stderr)
+    print(summarize("login", login_latencies), file=sys.stderr)
+    print(summarize("refresh", refresh_latencies), file=sys.stderr)
+    print(f"refresh throughput: {len(refresh_latencies) / elapsed:.1f}/s, failed requests: {failures}", file=sys.stderr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--profile", choices=sorted(PROFILES))
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--refreshes", type=int, default=50)
+    args = parser.parse_args()
+
+    if args.profile:
+        asyncio.run(_run(args))
+        return
+
+    for profile in PROFILES:
+        subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_engine_profiles", "--profile", profile,
+             "--clients", str(args.clients), "--refreshes", str(args.refreshes)],
+            stdout=subprocess.DEVNULL,
+            env=os.environ.copy(),
+            check=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
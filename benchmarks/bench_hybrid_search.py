@@ -0,0 +1,136 @@
+"""Relevance and latency of vector, BM25 and hybrid (reciprocal-rank fusion) retrieval.
+
+Relevance is MRR and recall@3 on the offline fixture in
+tests/backend/rag/fixtures/relevance.json. Latency uses a synthetic corpus
+with a Zipf vocabulary: BM25 over the lexical index, vector search over
+random unit vectors (retrieval cost does not depend on what the vectors
+mean), and hybrid running both concurrently the way DocumentService.search
+does. Snapshot size and save/open times of the lexical index are reported
+too.
+
+    python -m benchmarks.bench_hybrid_search --chunks 100000 1000000
+"""
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks._app import summarize
+
+FIXTURE = Path(__file__).resolve().parents[1] / "tests" / "backend" / "rag" / "fixtures" / "relevance.json"
+
+
+def _relevance(rrf_k: int) -> None:
+    from backend.app.rag.embedding import HashingEmbedder
+    from backend.app.rag.lexical import Bm25Index
+    from backend.app.service.document import reciprocal_rank_fusion
+
+    fixture = json.loads(FIXTURE.read_text())
+    names = list(fixture["passages"])
+    texts = [fixture["passages"][name] for name in names]
+    index = Bm25Index()
+    index.activate(index.append(texts), range(len(texts)))
+    embedder = HashingEmbedder(384)
+    vectors = embedder.embed(texts)
+
+    results = {"vector": [], "lexical": [], "hybrid": []}
+    for case in fixture["queries"]:
+        scores = vectors @ embedder.embed([case["query"]])[0]
+        vector = [(int(i), float(scores[i])) for i in np.argsort(-scores)[:10]]
+        lexical = index.search(case["query"], 10)
+        for mode, ranking in (("vector", vector), ("lexical", lexical),
+                              ("hybrid", reciprocal_rank_fusion([vector, lexical], rrf_k))):
+            ranked = [names[chunk_id] for chunk_id, _ in ranking]
+            first = next((rank for rank, name in enumerate(ranked, 1) if name in case["relevant"]), None)
+            results[mode].append((1 / first if first else 0.0, any(name in case["relevant"] for name in ranked[:3])))
+    print(f"relevance fixture: {len(fixture['queries'])} queries over {len(texts)} passages")
+    for mode, values in results.items():
+        print(f"  {mode:<8} MRR={np.mean([rr for rr, _ in values]):.3f} recall@3={np.mean([hit for _, hit in values]):.3f}")
+
+
+def _synthetic_texts(rng, count: int, vocabulary: int, words: int) -> list[str]:
+    ranks = np.minimum(rng.zipf(1.2, size=count * words), vocabulary) - 1
+    tokens = np.char.add("term", ranks.astype(str)).reshape(count, words)
+    return [" ".join(row) for row in tokens]
+
+
+async def _latency(count: int, args) -> None:
+    from backend.app.rag.lexical import Bm25Index
+    from backend.app.rag.vector_store import MmapVectorStore
+    from backend.app.service.document import reciprocal_rank_fusion
+
+    rng = np.random.default_rng(0)
+    directory = tempfile.mkdtemp(prefix="rag-bench-hybrid-")
+    index = Bm25Index()
+    index.open(directory)
+    store = MmapVectorStore(args.dimension)
+    store.open(directory)
+    started = time.perf_counter()
+    for start in range(0, count, 10_000):
+        batch = min(10_000, count - start)
+        index.activate(index.append(_synthetic_texts(rng, batch, args.vocabulary, args.words)), range(start, start + batch))
+        vectors = rng.standard_normal((batch, args.dimension), dtype=np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        store.activate(store.append(vectors), np.arange(start, start + batch))
+    print(f"\n{count} chunks x {args.words} words: indexed in {time.perf_counter() - started:.1f}s")
+
+    started = time.perf_counter()
+    index.save()
+    saved = time.perf_counter() - started
+    started = time.perf_counter()
+    Bm25Index().open(directory)
+    print(
+        f"  bm25 snapshot {Path(directory, 'bm25.npz').stat().st_size / 2**20:.1f} MiB, "
+        f"save {saved:.2f}s, open {time.perf_counter() - started:.2f}s"
+    )
+
+    queries = [" ".join(words.split()[:3]) for words in _synthetic_texts(rng, args.queries, args.vocabulary, 3)]
+    query_vectors = rng.standard_normal((args.queries, args.dimension), dtype=np.float32)
+    query_vectors /= np.linalg.norm(query_vectors, axis=1, keepdims=True)
+    depth = args.candidates
+    for query in queries[:3]:
+        index.search(query, depth)
+
+    samples = {"bm25": [], "vector": [], "hybrid": []}
+    for query, vector in zip(queries, query_vectors):
+        started = time.perf_counter()
+        lexical = index.search(query, depth)
+        samples["bm25"].append(time.perf_counter() - started)
+        started = time.perf_counter()
+        store.search(vector, depth)
+        samples["vector"].append(time.perf_counter() - started)
+        started = time.perf_counter()
+        rankings = await asyncio.gather(
+            asyncio.to_thread(store.search, vector, depth), asyncio.to_thread(index.search, query, depth),
+        )
+        reciprocal_rank_fusion(rankings, args.rrf_k)[: args.k]
+        samples["hybrid"].append(time.perf_counter() - started)
+    for mode, values in samples.items():
+        print("  " + summarize(f"{mode} top-{depth}", values))
+
+
+async def _run(args) -> None:
+    _relevance(args.rrf_k)
+    for count in args.chunks:
+        await _latency(count, args)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunks", type=int, nargs="+", default=[100_000])
+    parser.add_argument("--words", type=int, default=150)
+    parser.add_argument("--vocabulary", type=int, default=50_000)
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--candidates", type=int, default=50)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--rrf-k", type=int, default=60)
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""How long an upload holds its request open: synchronous ingest against the job queue.
+
+For each --sizes-mb a synthetic Markdown document is ingested twice under a
+new source name: once through DocumentService.ingest (what POST
+/api/documents does inside the request) and once through
+IngestionJobService.enqueue (what POST /api/ingestion-jobs does), after
+which a worker runs the job to completion. "request" is the time the HTTP
+handler would hold the connection; "job" is the background run, which
+commits every --batch-chunks chunks so a restart resumes from the last batch.
+
+    python -m benchmarks.bench_ingestion_jobs --sizes-mb 1 5 20 --batch-chunks 256
+"""
+import argparse
+import asyncio
+import io
+import os
+import random
+import time
+
+from benchmarks._app import configure_environment, open_database
+
+WORDS = (
+    "path operation dependency injection router middleware background task response model "
+    "validation security token schema request body query parameter header cookie"
+).split()
+
+
+def _document(size: int, seed: int) -> bytes:
+    rng = random.Random(seed)
+    paragraphs, length = [], 0
+    while length < size:
+        paragraph = " ".join(rng.choice(WORDS) + str(rng.randrange(500)) for _ in range(60))
+        paragraphs.append(paragraph)
+        length += len(paragraph) + 2
+    return "\n\n".join(paragraphs).encode()[:size]
+
+
+async def _run(args) -> None:
+    work_dir = configure_environment(
+        INGEST_JOB_BATCH_CHUNKS=str(args.batch_chunks),
+        DOCUMENT_MAX_BYTES=str(int(max(args.sizes_mb) * 2**20) + 1),
+    )
+    os.environ["INGEST_SPOOL_DIR"] = str(work_dir / "spool")
+
+    from backend.app.db.base import SessionLocal, bind_session
+    from backend.app.model import document, ingestion_job  # noqa: F401  registers the mappers
+    from backend.app.rag.embedding import HashingEmbedder
+    from backend.app.rag.lexical import Bm25Index
+    from backend.app.rag.vector_store import MmapVectorStore
+    from backend.app.repository.base import UnitOfWork
+    from backend.app.repository.document import DocumentRepository
+    from backend.app.repository.ingestion_job import IngestionJobRepository
+    from backend.app.service.document import DocumentService
+    from backend.app.service.ingestion_job import IngestionJobService
+    from backend.app.service.ingestion_worker import IngestionWorkerPool
+
+    engine = await open_database(work_dir, args.database_url)
+    document_service = DocumentService(
+        DocumentRepository(), UnitOfWork(), HashingEmbedder(args.dimension), MmapVectorStore(args.dimension),
+        lexical_index=Bm25Index(save_every=10**9),
+    )
+    job_service = IngestionJobService(IngestionJobRepository(), document_service, UnitOfWork())
+    pool = IngestionWorkerPool(SessionLocal, job_service, workers=1, poll_seconds=1)
+    async with SessionLocal() as session:
+        with bind_session(session):
+            await document_service.open_index(str(work_dir / "vectors"))
+
+    for size_mb in args.sizes_mb:
+        body = _document(int(size_mb * 2**20), int(size_mb * 100))
+        async with SessionLocal() as session:
+            with bind_session(session):
+                started = time.perf_counter()
+                result = await document_service.ingest(f"sync-{size_mb}.md", io.BytesIO(body), "text/markdown")
+                sync_seconds = time.perf_counter() - started
+
+                started = time.perf_counter()
+                job = await job_service.enqueue(f"job-{size_mb}.md", io.BytesIO(body), "text/markdown")
+                enqueue_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        await pool.run_once()
+        job_seconds = time.perf_counter() - started
+        async with SessionLocal() as session:
+            with bind_session(session):
+                job = await job_service.get_job(job.id)
+        print(f"{size_mb:>5g} MiB {result.document.chunk_count:>6} chunks  "
+              f"sync request {sync_seconds * 1000:9.1f}ms  "
+              f"queued request {enqueue_seconds * 1000:7.1f}ms  "
+              f"job {job_seconds * 1000:9.1f}ms ({job.status}, {job.committed_chunks}/{job.total_chunks} chunks)")
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes-mb", type=float, nargs="+", default=[1, 5, 20])
+    parser.add_argument("--batch-chunks", type=int, default=256)
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--database-url", default=None)
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""JWT encode/decode ops/sec: python-jose per call vs. the pre-built codecs.
+
+    python -m benchmarks.bench_jwt_codec --iterations 20000
+"""
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+
+from jose import jwt
+
+from backend.app.core.jwt_codec import HmacTokenCodec, JoseTokenCodec
+
+SECRET = "bench-secret"
+
+
+def _ops_per_second(fn, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return iterations / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=20_000)
+    args = parser.parse_args()
+
+    claims = {
+        "sub": "42",
+        "exp": datetime.now(timezone.utc) + timedelta(minutes=30),
+        "type": "access",
+        "jti": "5f0c6c1e-6c53-4f5e-9c59-1c4f3c1b2a10",
+    }
+    jose_codec = JoseTokenCodec("HS256", None, SECRET, {None: SECRET})
+    native_codec = HmacTokenCodec("HS256", None, {None: SECRET})
+    candidates = {
+        "jose per call (before)": (
+            lambda payload: jwt.encode(payload, SECRET, algorithm="HS256"),
+            lambda token: jwt.decode(token, SECRET, algorithms=["HS256"]),
+        ),
+        "jose, pre-built key": (jose_codec.encode, jose_codec.decode),
+        "native hmac": (native_codec.encode, native_codec.decode),
+    }
+
+    print(f"{'codec':<24} {'encode/s':>12} {'decode/s':>12}")
+    for name, (encode, decode) in candidates.items():
+        token = encode(claims)
+        encode_rate = _ops_per_second(lambda: encode(claims), args.iterations)
+        decode_rate = _ops_per_second(lambda: decode(token), args.iterations)
+        print(f"{name:<24} {encode_rate:>12,.0f} {decode_rate:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
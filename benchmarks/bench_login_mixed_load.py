@@ -0,0 +1,73 @@
+"""Login vs. non-login latency under a mixed load.
+
+    python -m benchmarks.bench_login_mixed_load --hash-workers 4 --hash-queue 32
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks._app import build_app, configure_environment, summarize
+
+
+async def _run(args) -> None:
+    import httpx
+
+    work_dir = configure_environment(
+        PASSWORD_HASH_WORKERS=str(args.hash_workers),
+        PASSWORD_HASH_BACKEND=args.hash_backend,
+        PASSWORD_HASH_MAX_QUEUE=str(args.hash_queue),
+    )
+    app = build_app(work_dir)
+
+    login_latencies: list[float] = []
+    read_latencies: list[float] = []
+    shed = 0
+    form = {"username": "bench-admin", "password": "bench-password"}
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            token = (await client.post("/api/auth/token", data=form)).json()["access_token"]
+            headers = {"Authorization": f"Bearer {token}"}
+            deadline = time.perf_counter() + args.duration
+
+            async def login_worker() -> None:
+                nonlocal shed
+                while time.perf_counter() < deadline:
+                    started = time.perf_counter()
+                    response = await client.post("/api/auth/token", data=form)
+                    if response.status_code == 503:
+                        shed += 1
+                    login_latencies.append(time.perf_counter() - started)
+
+            async def read_worker() -> None:
+                while time.perf_counter() < deadline:
+                    started = time.perf_counter()
+                    path = "/api/auth/me" if len(read_latencies) % 2 else "/api/users/"
+                    await client.get(path, headers=headers)
+                    read_latencies.append(time.perf_counter() - started)
+
+            await asyncio.gather(
+                *(login_worker() for _ in range(args.logins)),
+                *(read_worker() for _ in range(args.readers)),
+            )
+
+    print(f"hash backend={args.hash_backend} workers={args.hash_workers} queue={args.hash_queue}")
+    print(summarize("login", login_latencies))
+    print(summarize("/me + /users", read_latencies))
+    print(f"login requests shed with 503: {shed}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=50, help="concurrent login clients")
+    parser.add_argument("--readers", type=int, default=20, help="concurrent /me and /users clients")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to run")
+    parser.add_argument("--hash-workers", type=int, default=4)
+    parser.add_argument("--hash-backend", choices=("thread", "process"), default="thread")
+    parser.add_argument("--hash-queue", type=int, default=32)
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
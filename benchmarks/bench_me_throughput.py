@@ -0,0 +1,59 @@
+"""Requests/sec on GET /api/auth/me with a warm access-token cache.
+
+Drives the ASGI app in-process (no sockets), so the numbers isolate routing,
+dependency resolution and serialization.
+
+    python -m benchmarks.bench_me_throughput --requests 5000 --concurrency 1 16
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks._app import build_app, configure_environment, summarize
+
+
+async def _worker(client, headers, count: int, samples: list[float]) -> None:
+    for _ in range(count):
+        started = time.perf_counter()
+        response = await client.get("/api/auth/me", headers=headers)
+        samples.append(time.perf_counter() - started)
+        assert response.status_code == 200, response.text
+
+
+async def _run(args) -> None:
+    import httpx
+
+    work_dir = configure_environment(METRICS_ENABLED=str(args.metrics).lower())
+    app = build_app(work_dir)
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            login = await client.post(
+                "/api/auth/token",
+                data={"username": "bench-admin", "password": "bench-password"},
+            )
+            headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+            await _worker(client, headers, 200, [])
+
+            for concurrency in args.concurrency:
+                samples: list[float] = []
+                per_worker = args.requests // concurrency
+                started = time.perf_counter()
+                await asyncio.gather(
+                    *(_worker(client, headers, per_worker, samples) for _ in range(concurrency))
+                )
+                elapsed = time.perf_counter() - started
+                print(f"{summarize(f'/me concurrency={concurrency}', samples)} {len(samples) / elapsed:8.0f} req/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5_000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16])
+    parser.add_argument("--metrics", action=argparse.BooleanOptionalAction, default=False)
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Refresh-token rotation latency against a large REFRESH_TOKEN table.
+
+    python -m benchmarks.bench_refresh_latency --stored 10000 1000000
+    python -m benchmarks.bench_refresh_latency --stored 10000 --drop-indexes
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from benchmarks._app import configure_environment, open_database, summarize
+
+SEED_CHUNK = 50_000
+
+
+async def _seed(session_factory, stored: int, users: int) -> None:
+    from sqlalchemy import insert
+
+    from backend.app.model.refresh_token import RefreshToken
+    from backend.app.model.user import User
+
+    now = datetime.now(timezone.utc)
+    async with session_factory() as session:
+        await session.execute(
+            insert(User),
+            [{"name": f"user-{i}", "password": "x", "role": "user", "is_active": True} for i in range(users)],
+        )
+        for offset in range(0, stored, SEED_CHUNK):
+            await session.execute(
+                insert(RefreshToken),
+                [
+                    {
+                        "user_id": (offset + i) % users + 1,
+                        "jti": str(uuid.uuid4()),
+                        "family_id": str(uuid.uuid4()),
+                        "issued_at": now,
+                        "expires_at": now + timedelta(days=14),
+                        "revoked": (offset + i) % 3 == 0,
+                    }
+                    for i in range(min(SEED_CHUNK, stored - offset))
+                ],
+            )
+        await session.commit()
+
+
+async def _issue(session_factory, user_id: int) -> str:
+    from backend.app.core.security import create_refresh_token
+    from backend.app.model.refresh_token import RefreshToken
+
+    now = datetime.now(timezone.utc)
+    jti, family_id = str(uuid.uuid4()), str(uuid.uuid4())
+    async with session_factory() as session:
+        session.add(
+            RefreshToken(
+                user_id=user_id,
+                jti=jti,
+                family_id=family_id,
+                issued_at=now,
+                expires_at=now + timedelta(days=14),
+                revoked=False,
+            )
+        )
+        await session.commit()
+    return create_refresh_token(str(user_id), timedelta(days=14), jti, family_id)
+
+
+async def _measure(stored: int, args) -> None:
+    from sqlalchemy import text
+    from starlette.responses import Response
+
+    work_dir = configure_environment()
+    engine = await open_database(work_dir)
+
+    from backend.app.db.base import SessionLocal
+    from backend.app.model.refresh_token import RefreshToken
+    from backend.app.repository.auth import AuthRepository
+    from backend.app.service.auth import AuthService
+
+    if args.drop_indexes:
+        async with engine.begin() as conn:
+            for index in RefreshToken.__table__.indexes:
+                await conn.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+
+    started = time.perf_counter()
+    await _seed(SessionLocal, stored, args.users)
+    seed_seconds = time.perf_counter() - started
+
+    token = await _issue(SessionLocal, user_id=1)
+    latencies: list[float] = []
+    for _ in range(args.refreshes):
+        async with SessionLocal() as session:
+            response = Response()
+            started = time.perf_counter()
+            await AuthService(AuthRepository(session)).refresh_token(token, response)
+            latencies.append(time.perf_counter() - started)
+        token = response.headers["set-cookie"].split(";", 1)[0].split("=", 1)[1]
+
+    label = f"{stored:,} stored{' (no idx)' if args.drop_indexes else ''}"
+    print(f"seeded {stored:,} tokens in {seed_seconds:.1f}s")
+    print(summarize(label, latencies))
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--stored", type=int, nargs="+", default=[10_000, 1_000_000])
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--refreshes", type=int, default=200)
+    parser.add_argument("--drop-indexes", action="store_true", help="measure the pre-index baseline")
+    args = parser.parse_args()
+    for stored in args.stored:
+        asyncio.run(_measure(stored, args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Chat answer latency and hit rate with and without the response cache.
+
+Questions are drawn from a Zipf distribution over --distinct questions, and
+--variants of them arrive re-cased and re-punctuated, so they only hit
+through normalisation. Retrieval is a fixed --retrieval-ms stand-in and the
+fake generator streams --tokens-per-second, so the "uncached" numbers scale
+with the answer length the way a real model does. The cost of a semantic
+lookup against a full cache is reported too.
+
+    python -m benchmarks.bench_response_cache --questions 300 --tokens-per-second 200 --max-tokens 100
+"""
+import argparse
+import asyncio
+import random
+import time
+
+import numpy as np
+
+from benchmarks._app import configure_environment, summarize
+
+WORDS = "dependency injection router middleware background task response model validation security".split()
+
+
+class _FixedRetrieval:
+    # DocumentService stand-in: every question retrieves the same chunks after a fixed delay
+    def __init__(self, batcher, seconds: float, words: int):
+        self.batcher = batcher
+        self.seconds = seconds
+        self.corpus_version = 0
+        self.content = " ".join(WORDS[index % len(WORDS)] for index in range(words))
+
+    async def search(self, query, k):
+        from backend.app.schemas.document import DocumentSearchHit
+
+        await self.batcher.embed([query])
+        await asyncio.sleep(self.seconds)
+        return [
+            DocumentSearchHit.model_construct(
+                chunk_id=index, document_id=1, source="guide.md", ordinal=index, content=self.content, score=1.0,
+            )
+            for index in range(k)
+        ]
+
+
+def _variant(rng: random.Random, question: str) -> str:
+    return rng.choice([question.upper(), question.lower() + "??", "  " + question.replace(" ", "  ")])
+
+
+async def _ask(service, question: str, args) -> tuple[float, float, bool]:
+    started = time.perf_counter()
+    first = None
+    async for frame in service.stream(question, args.k, args.max_tokens):
+        if first is None and frame.startswith("event: token"):
+            first = time.perf_counter() - started
+    return first or 0.0, time.perf_counter() - started, '"cached":true' in frame
+
+
+async def _run(args) -> None:
+    configure_environment()
+
+    from backend.app.rag.embedding import HashingEmbedder
+    from backend.app.rag.embedding_batcher import EmbeddingBatcher
+    from backend.app.rag.embedding_cache import CachedEmbedder
+    from backend.app.rag.llm import FakeChatGenerator
+    from backend.app.rag.response_cache import CachedResponse, ResponseCache
+    from backend.app.service.chat import ChatService
+
+    rng = random.Random(0)
+    distinct = [
+        f"how do I {' '.join(rng.sample(WORDS, 3))} in fastapi {index}" for index in range(args.distinct)
+    ]
+    ranks = np.minimum(np.random.default_rng(0).zipf(1.3, size=args.questions), args.distinct) - 1
+    questions = [
+        _variant(rng, distinct[rank]) if rng.random() < args.variants else distinct[rank] for rank in ranks
+    ]
+
+    for label, max_entries in (("uncached", 0), ("cached", args.max_entries)):
+        embedder = CachedEmbedder(HashingEmbedder(args.dimension), 64 * 1024 * 1024, disk=False)
+        retrieval = _FixedRetrieval(EmbeddingBatcher(embedder, 0, 0), args.retrieval_ms / 1000, args.context_words)
+        cache = ResponseCache(args.dimension, max_entries, 3600, args.threshold) if max_entries else None
+        service = ChatService(retrieval, FakeChatGenerator(args.tokens_per_second), response_cache=cache)
+        first_token, total, hits = [], [], 0
+        for question in questions:
+            first, elapsed, cached = await _ask(service, question, args)
+            first_token.append(first)
+            total.append(elapsed)
+            hits += cached
+        print(summarize(f"{label} first token", first_token))
+        print(summarize(f"{label} full answer", total) + f"  hit rate {hits / len(questions):.1%}")
+
+    cache = ResponseCache(args.dimension, args.max_entries, 3600, args.threshold)
+    vectors = HashingEmbedder(args.dimension).embed([f"filler question {index}" for index in range(args.max_entries)])
+    for index, vector in enumerate(vectors):
+        cache.put(f"filler question {index}", vector, None, 0, CachedResponse([], []))
+    probes = HashingEmbedder(args.dimension).embed([f"probe {index}" for index in range(200)])
+    samples = []
+    for vector in probes:
+        started = time.perf_counter()
+        cache.similar(vector, None, 0)
+        samples.append(time.perf_counter() - started)
+    print(summarize(f"semantic lookup {args.max_entries} entries", samples))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--questions", type=int, default=2_000)
+    parser.add_argument("--distinct", type=int, default=300)
+    parser.add_argument("--variants", type=float, default=0.3, help="share of questions re-cased or re-punctuated")
+    parser.add_argument("--tokens-per-second", type=float, default=0, help="0 streams as fast as possible")
+    parser.add_argument("--retrieval-ms", type=float, default=5.0)
+    parser.add_argument("--context-words", type=int, default=40)
+    parser.add_argument("--max-tokens", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--max-entries", type=int, default=10_000)
+    parser.add_argument("--threshold", type=float, default=0.95)
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Logout / logout-all cost for users holding many live token families.
+
+Compares the old load-then-commit-per-row loop with the set-based
+AuthRepository.revoke_family / revoke_all_for_user.
+
+    python -m benchmarks.bench_revocation --families 1 100 10000
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from benchmarks._app import configure_environment, open_database
+
+
+async def _seed(session_factory, user_id: int, families: int) -> list[str]:
+    from sqlalchemy import delete, insert
+
+    from backend.app.model.refresh_token import RefreshToken
+
+    now = datetime.now(timezone.utc)
+    family_ids = [str(uuid.uuid4()) for _ in range(families)]
+    async with session_factory() as session:
+        await session.execute(delete(RefreshToken))
+        await session.execute(
+            insert(RefreshToken),
+            [
+                {
+                    "user_id": user_id,
+                    "jti": str(uuid.uuid4()),
+                    "family_id": family_id,
+                    "issued_at": now,
+                    "expires_at": now + timedelta(days=14),
+                    "revoked": False,
+                }
+                for family_id in family_ids
+            ],
+        )
+        await session.commit()
+    return family_ids
+
+
+async def _per_row_revoke_all(session, user_id: int) -> int:
+    from sqlalchemy import select
+
+    from backend.app.model.refresh_token import RefreshToken
+
+    tokens = (
+        await session.scalars(
+            select(RefreshToken).where(RefreshToken.user_id == user_id, RefreshToken.revoked.is_(False))
+        )
+    ).all()
+    for token in tokens:
+        token.revoked = True
+        session.add(token)
+        await session.commit()
+        await session.refresh(token)
+    return len(tokens)
+
+
+async def _run(args) -> None:
+    work_dir = configure_environment()
+    engine = await open_database(work_dir)
+
+    from backend.app.db.base import SessionLocal
+    from backend.app.model.user import User
+    from backend.app.repository.auth import AuthRepository
+
+    async with SessionLocal() as session:
+        user = User(name="bench-user", password="x", role="user", is_active=True)
+        session.add(user)
+        await session.commit()
+        user_id = user.user_id
+
+    print(f"{'families':>10} {'per-row loop':>14} {'revoke_all':>12} {'revoke_family':>14}")
+    for families in args.families:
+        baseline = "skipped"
+        if families <= args.baseline_limit:
+            await _seed(SessionLocal, user_id, families)
+            async with SessionLocal() as session:
+                started = time.perf_counter()
+                await _per_row_revoke_all(session, user_id)
+                baseline = f"{(time.perf_counter() - started) * 1000:.2f}ms"
+
+        await _seed(SessionLocal, user_id, families)
+        async with SessionLocal() as session:
+            started = time.perf_counter()
+            revoked = await AuthRepository(session).revoke_all_for_user(user_id)
+            bulk = (time.perf_counter() - started) * 1000
+        assert revoked == families
+
+        family_ids = await _seed(SessionLocal, user_id, families)
+        async with SessionLocal() as session:
+            started = time.perf_counter()
+            await AuthRepository(session).revoke_family(user_id, family_ids[-1])
+            single = (time.perf_counter() - started) * 1000
+
+        print(f"{families:>10} {baseline:>14} {bulk:>10.2f}ms {single:>12.2f}ms")
+
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--families", type=int, nargs="+", default=[1, 100, 10_000])
+    parser.add_argument(
+        "--baseline-limit",
+        type=int,
+        default=10_000,
+        help="skip the per-row baseline above this many families",
+    )
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Per-call overhead of the @transactional decorator.
+
+Compares the previous reflection-based decorator (dir() + getattr over the
+whole service on every call) with the UnitOfWork-backed one. The session is
+real but never touches a connection, so only decorator and commit
+bookkeeping is measured.
+
+    python -m benchmarks.bench_transactional --calls 100000
+"""
+import argparse
+import asyncio
+import functools
+import time
+
+from benchmarks._app import configure_environment
+
+
+def _reflective_transactional(func):
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    from backend.app.repository.base import BaseRepository
+
+    @functools.wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        repository = None
+        for attr_name in dir(self):
+            attr = getattr(self, attr_name)
+            if isinstance(attr, BaseRepository):
+                repository = attr
+                break
+        if repository is None:
+            raise AttributeError(f"Cannot find repository in service class: {self.__class__.__name__}")
+        db = getattr(repository, "db", None)
+        if db is None or not isinstance(db, AsyncSession):
+            raise AttributeError("Repository instance does not expose a valid AsyncSession")
+        try:
+            result = await func(self, *args, **kwargs)
+            await db.commit()
+            return result
+        except Exception:
+            await db.rollback()
+            raise
+
+    return wrapper
+
+
+async def _time(method, calls: int) -> float:
+    for _ in range(1_000):
+        await method()
+    started = time.perf_counter()
+    for _ in range(calls):
+        await method()
+    return (time.perf_counter() - started) / calls
+
+
+async def _run(args) -> None:
+    configure_environment()
+
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    from backend.app.repository.base import UnitOfWork, transactional
+    from backend.app.repository.user import UserRepository
+    from backend.app.service.user import UserService
+
+    class ReflectiveService(UserService):
+        @_reflective_transactional
+        async def noop(self):
+            return None
+
+    class UnitOfWorkService(UserService):
+        @transactional
+        async def noop(self):
+            return None
+
+    async def bare_commit():
+        await session.commit()
+
+    session = AsyncSession()
+    reflective = ReflectiveService(UserRepository(session), UnitOfWork(session))
+    unit_of_work = UnitOfWorkService(UserRepository(session), UnitOfWork(session))
+
+    baseline = await _time(bare_commit, args.calls)
+    print(f"{'bare session.commit()':<26} {baseline * 1e6:8.2f}us/call")
+    for label, method in (("reflective @transactional", reflective.noop), ("UnitOfWork @transactional", unit_of_work.noop)):
+        per_call = await _time(method, args.calls)
+        print(f"{label:<26} {per_call * 1e6:8.2f}us/call  overhead {(per_call - baseline) * 1e6:8.2f}us")
+    await session.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=100_000)
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
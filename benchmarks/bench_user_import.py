@@ -0,0 +1,94 @@
+"""Bulk user import versus one create_user call per user.
+
+The per-user baseline runs on a sample and is extrapolated, since at full
+bcrypt cost it would take hours for 50k users. Both paths use the same
+PASSWORD_HASH_ROUNDS so the comparison is about round trips, not hashing.
+
+    python -m benchmarks.bench_user_import --users 50000 --rounds 4
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks._app import configure_environment, open_database
+
+
+async def _reset(session_factory) -> None:
+    from sqlalchemy import delete
+
+    from backend.app.model.user import User
+
+    async with session_factory() as session:
+        await session.execute(delete(User))
+        await session.commit()
+
+
+def _rows(prefix: str, users: int) -> list[dict]:
+    return [{"name": f"{prefix}-{index:06d}", "password": "import-password", "userRole": "user"} for index in range(users)]
+
+
+async def _run(args) -> None:
+    work_dir = configure_environment(
+        PASSWORD_HASH_ROUNDS=str(args.rounds),
+        PASSWORD_HASH_WORKERS=str(args.hash_workers),
+        PASSWORD_HASH_BACKEND=args.hash_backend,
+        USER_IMPORT_MAX_ROWS=str(max(args.users, 100_000)),
+    )
+    engine = await open_database(work_dir)
+
+    from backend.app.core.security import password_hasher
+    from backend.app.db.base import SessionLocal
+    from backend.app.repository.base import UnitOfWork
+    from backend.app.repository.user import UserRepository
+    from backend.app.schemas.user import UserCreate
+    from backend.app.service.user import UserService
+
+    await _reset(SessionLocal)
+    sample = _rows("single", args.baseline_sample)
+    started = time.perf_counter()
+    async with SessionLocal() as session:
+        service = UserService(UserRepository(session), UnitOfWork(session))
+        for row in sample:
+            await service.create_user(UserCreate.model_validate(row))
+    per_user = (time.perf_counter() - started) / len(sample)
+    print(
+        f"create_user loop  sample={len(sample):<6} {per_user * 1000:8.2f}ms/user "
+        f"-> ~{per_user * args.users:8.1f}s for {args.users}"
+    )
+
+    await _reset(SessionLocal)
+    rows = _rows("bulk", args.users)
+    # a tenth of the rows are already taken so the dedupe query has something to find
+    async with SessionLocal() as session:
+        await UserService(UserRepository(session), UnitOfWork(session)).import_users(rows[: args.users // 10])
+
+    started = time.perf_counter()
+    async with SessionLocal() as session:
+        report = await UserService(UserRepository(session), UnitOfWork(session)).import_users(rows)
+    elapsed = time.perf_counter() - started
+    print(
+        f"import_users      rows={len(rows):<8} {elapsed:8.2f}s total "
+        f"{elapsed / len(rows) * 1000:8.3f}ms/row  created={report.created} duplicates={report.duplicates}"
+    )
+
+    started = time.perf_counter()
+    await password_hasher.hash_many(["import-password"] * report.created)
+    hashing = time.perf_counter() - started
+    print(f"  of which hashing ~{hashing:8.2f}s ({args.hash_workers} {args.hash_backend} workers)")
+
+    password_hasher.shutdown()
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=50_000)
+    parser.add_argument("--rounds", type=int, default=4, help="bcrypt cost factor (4 is the minimum)")
+    parser.add_argument("--baseline-sample", type=int, default=500)
+    parser.add_argument("--hash-workers", type=int, default=4)
+    parser.add_argument("--hash-backend", choices=("thread", "process"), default="thread")
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Memory and time-to-first-byte of GET /api/users strategies.
+
+Compares the old get_all() + UserOut.from_model list, a keyset page
+(UserService.list_users) and the NDJSON export (UserService.export_users).
+Peak memory is measured in a separate tracemalloc pass so it does not skew
+the timings.
+
+    python -m benchmarks.bench_user_listing --users 100000 1000000
+"""
+import argparse
+import asyncio
+import gc
+import time
+import tracemalloc
+
+from benchmarks._app import configure_environment, open_database
+
+
+async def _seed(session_factory, users: int) -> None:
+    from sqlalchemy import delete, insert
+
+    from backend.app.model.user import User
+
+    async with session_factory() as session:
+        await session.execute(delete(User))
+        for start in range(0, users, 50_000):
+            await session.execute(
+                insert(User),
+                [
+                    {"name": f"user-{index:07d}", "password": "x", "is_active": True, "role": "user"}
+                    for index in range(start, min(users, start + 50_000))
+                ],
+            )
+        await session.commit()
+
+
+async def _full_list(session) -> tuple[float, int]:
+    from pydantic import TypeAdapter
+
+    from backend.app.repository.base import UnitOfWork
+    from backend.app.repository.user import UserRepository
+    from backend.app.schemas.user import UserOut
+
+    # the pre-pagination handler: every ORM object, one validated model each, one JSON body
+    started = time.perf_counter()
+    users = await UserRepository(session).get_all()
+    body = TypeAdapter(list[UserOut]).dump_json([UserOut.from_model(user) for user in users], by_alias=True)
+    return time.perf_counter() - started, len(body)
+
+
+async def _keyset_page(session, cursor: int | None, limit: int) -> tuple[float, int]:
+    from pydantic import TypeAdapter
+
+    from backend.app.repository.base import UnitOfWork
+    from backend.app.repository.user import UserRepository
+    from backend.app.schemas.user import UserOut
+    from backend.app.service.user import UserService
+
+    started = time.perf_counter()
+    users, _ = await UserService(UserRepository(session), UnitOfWork(session)).list_users(cursor, limit)
+    body = TypeAdapter(list[UserOut]).dump_json(users, by_alias=True)
+    return time.perf_counter() - started, len(body)
+
+
+async def _export(session) -> tuple[float, float, int]:
+    from backend.app.repository.base import UnitOfWork
+    from backend.app.repository.user import UserRepository
+    from backend.app.service.user import UserService
+
+    started = time.perf_counter()
+    first_byte = None
+    size = 0
+    async for chunk in UserService(UserRepository(session), UnitOfWork(session)).export_users():
+        if first_byte is None:
+            first_byte = time.perf_counter() - started
+        size += len(chunk)
+    return first_byte, time.perf_counter() - started, size
+
+
+async def _peak_memory(session_factory, strategy) -> float:
+    gc.collect()
+    async with session_factory() as session:
+        tracemalloc.start()
+        await strategy(session)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return peak / 1024 / 1024
+
+
+async def _run(args) -> None:
+    work_dir = configure_environment()
+    engine = await open_database(work_dir)
+
+    from backend.app.db.base import SessionLocal
+
+    print(f"{'users':>9} {'strategy':<16} {'ttfb':>10} {'total':>10} {'peak mem':>10} {'bytes':>12}")
+    for users in args.users:
+        await _seed(SessionLocal, users)
+
+        gc.collect()
+        async with SessionLocal() as session:
+            total, size = await _full_list(session)
+        peak = await _peak_memory(SessionLocal, _full_list)
+        # the whole body has to exist before the first byte goes out
+        print(f"{users:>9} {'full list':<16} {total * 1000:>8.1f}ms {total * 1000:>8.1f}ms {peak:>8.1f}MB {size:>12}")
+
+        # a page from the middle of the table; keyset cost should not depend on depth
+        cursor = users // 2
+        async with SessionLocal() as session:
+            samples = [await _keyset_page(session, cursor, args.page_size) for _ in range(20)]
+        total, size = sorted(samples)[len(samples) // 2]
+        peak = await _peak_memory(SessionLocal, lambda session: _keyset_page(session, cursor, args.page_size))
+        label = f"keyset page {args.page_size}"
+        print(f"{users:>9} {label:<16} {total * 1000:>8.1f}ms {total * 1000:>8.1f}ms {peak:>8.1f}MB {size:>12}")
+
+        gc.collect()
+        async with SessionLocal() as session:
+            first_byte, total, size = await _export(session)
+        peak = await _peak_memory(SessionLocal, _export)
+        print(f"{users:>9} {'ndjson export':<16} {first_byte * 1000:>8.1f}ms {total * 1000:>8.1f}ms {peak:>8.1f}MB {size:>12}")
+
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--page-size", type=int, default=100)
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
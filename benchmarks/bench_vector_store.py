@@ -0,0 +1,102 @@
+"""Top-k query latency and resident memory of MmapVectorStore.
+
+Compares a single-query search, a batched search (one matmul for many
+queries) and the previous full-argsort in-memory search. RSS is read from
+/proc after reopening the store, so the mapped file is counted only as far
+as pages have been touched.
+
+    python -m benchmarks.bench_vector_store --vectors 100000 1000000
+"""
+import argparse
+import gc
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks._app import summarize
+
+
+def _rss() -> str:
+    fields = {}
+    with open("/proc/self/status") as status:
+        for line in status:
+            key, _, value = line.partition(":")
+            fields[key] = value.strip()
+    return f"rss={fields.get('VmRSS')} (anon {fields.get('RssAnon')}, file {fields.get('RssFile')})"
+
+
+def _unit_rows(rng, count: int, dimension: int) -> np.ndarray:
+    vectors = rng.standard_normal((count, dimension), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def _run_size(count: int, args) -> None:
+    from backend.app.rag.vector_store import MmapVectorStore
+
+    rng = np.random.default_rng(0)
+    directory = tempfile.mkdtemp(prefix="rag-bench-vectors-")
+    store = MmapVectorStore(args.dimension)
+    store.open(directory)
+    started = time.perf_counter()
+    for start in range(0, count, 50_000):
+        batch = _unit_rows(rng, min(50_000, count - start), args.dimension)
+        store.activate(store.append(batch), np.arange(start, start + len(batch)))
+    store.flush()
+    print(f"\n{count} x {args.dimension} float32: appended in {time.perf_counter() - started:.1f}s")
+    del store
+    gc.collect()
+
+    # reopen as the app does at startup: nothing is read until a query touches the pages
+    reopened = MmapVectorStore(args.dimension)
+    reopened.open(directory, np.arange(count), np.arange(count))
+    print(f"  after open        {_rss()}")
+    reopened.delete(np.arange(0, count, 10))
+
+    queries = _unit_rows(rng, args.queries, args.dimension)
+    reopened.search(queries[0], args.k)
+    print(f"  after first query {_rss()}")
+
+    samples = []
+    for query in queries:
+        started = time.perf_counter()
+        reopened.search(query, args.k)
+        samples.append(time.perf_counter() - started)
+    print("  " + summarize(f"single query k={args.k}", samples))
+
+    samples = []
+    for start in range(0, len(queries), args.batch):
+        batch = queries[start:start + args.batch]
+        started = time.perf_counter()
+        reopened.search_many(batch, args.k)
+        samples.extend([(time.perf_counter() - started) / len(batch)] * len(batch))
+    print("  " + summarize(f"batched x{args.batch} per query", samples))
+
+    if count <= args.baseline_limit:
+        # the previous store: whole matrix in anonymous memory, full argsort per query
+        vectors = np.array(reopened._vectors[:count])
+        samples = []
+        for query in queries[: args.queries // 4]:
+            started = time.perf_counter()
+            np.argsort(-(vectors @ query))[: args.k]
+            samples.append(time.perf_counter() - started)
+        print("  " + summarize("in-memory full argsort", samples))
+        print(f"  with a resident copy {_rss()}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--vectors", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=64)
+    parser.add_argument("--batch", type=int, default=32)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--baseline-limit", type=int, default=1_000_000)
+    args = parser.parse_args()
+    for count in args.vectors:
+        _run_size(count, args)
+
+
+if __name__ == "__main__":
+    main()
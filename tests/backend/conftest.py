@@ -1,13 +1,20 @@
+import asyncio
 import os
-import sys
-from importlib import reload
 from pathlib import Path
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
 
 from backend.app.db import base as db_base
+from backend.app.model import conversation, document, ingestion_job, refresh_token, user  # noqa: F401
+
+
+async def _reset_schema(engine) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(db_base.Base.metadata.drop_all)
+        await conn.run_sync(db_base.Base.metadata.create_all)
 
 
 @pytest.fixture(scope="session")
@@ -21,23 +28,30 @@ def app(tmp_path_factory):
     os.environ["ADMIN_NAME"] = "test-admin"
     os.environ["ADMIN_PASSWORD"] = "test-password"
     os.environ["PYTHONHASHSEED"] = "0"
+    os.environ["VECTOR_STORE_DIR"] = str(tmp_path_factory.mktemp("vector_store"))
+    os.environ["INGEST_SPOOL_DIR"] = str(tmp_path_factory.mktemp("ingest_spool"))
+    # queued jobs stay queued until a test runs the ingestion workers itself
+    os.environ["INGEST_JOB_WORKERS"] = "0"
+
+    # test modules import the container, and with it the settings, before this fixture runs; the shared
+    # instance is updated in place so modules that bound it early read the test values too
+    from backend.app import config
 
-    if "backend.app.config" in sys.modules:
-        reload(sys.modules["backend.app.config"])
-    else:
-        import backend.app.config  # noqa: F401
+    fresh = config.Settings()
+    for name in type(fresh).model_fields:
+        setattr(config.settings, name, getattr(fresh, name))
 
-    tmp_dir = tmp_path_factory.mktemp("db")
-    db_path = Path(tmp_dir) / "test.db"
-    test_db_url = f"sqlite:///{db_path}"
+    test_db_url = os.environ.get("TEST_DATABASE_URL")
+    if test_db_url is None:
+        tmp_dir = tmp_path_factory.mktemp("db")
+        db_path = Path(tmp_dir) / "test.db"
+        test_db_url = f"sqlite+aiosqlite:///{db_path}"
 
-    engine = create_engine(
-        test_db_url,
-        connect_args={"check_same_thread": False},
-    )
+    # every TestClient runs its own event loop, so connections must not be pooled across them
+    engine = create_async_engine(test_db_url, poolclass=NullPool)
+    asyncio.run(_reset_schema(engine))
     db_base.engine = engine
     db_base.SessionLocal.configure(bind=engine)
-    db_base.Base.metadata.create_all(bind=engine)
 
     from backend.app.main import create_app
 
@@ -0,0 +1,29 @@
+import asyncio
+
+import pytest
+
+from backend.app.core.container import container
+from backend.app.db import base as db_base
+
+
+async def _resolve_in_request() -> tuple[object, object]:
+    async with db_base.SessionLocal() as first, db_base.SessionLocal() as second:
+        async def bound(session):
+            with db_base.bind_session(session):
+                await asyncio.sleep(0)
+                return container.user_repository.db
+
+        return await asyncio.gather(
+            asyncio.create_task(bound(first)), asyncio.create_task(bound(second))
+        ), (first, second)
+
+
+def test_shared_repositories_use_the_session_bound_to_each_request(app):
+    (seen_first, seen_second), (first, second) = asyncio.run(_resolve_in_request())
+    assert seen_first is first
+    assert seen_second is second
+
+
+def test_repositories_require_a_bound_session_outside_requests():
+    with pytest.raises(RuntimeError):
+        container.auth_repository.db
@@ -0,0 +1,64 @@
+import time
+
+import pytest
+import rsa
+from jose import jwt
+
+from backend.app.core.jwt_codec import HmacTokenCodec, JoseTokenCodec, TokenError
+
+
+def _claims(ttl: int = 60) -> dict:
+    return {"sub": "1", "type": "access", "jti": "abc", "exp": int(time.time()) + ttl}
+
+
+def test_hmac_codec_interoperates_with_jose():
+    codec = HmacTokenCodec("HS256", None, {None: "secret"})
+
+    assert jwt.decode(codec.encode(_claims()), "secret", algorithms=["HS256"])["jti"] == "abc"
+    assert codec.decode(jwt.encode(_claims(), "secret", algorithm="HS256"))["jti"] == "abc"
+
+
+def test_hmac_codec_rejects_tampering_expiry_and_foreign_algorithms():
+    codec = HmacTokenCodec("HS256", None, {None: "secret"})
+    header, payload, signature = codec.encode(_claims()).split(".")
+
+    with pytest.raises(TokenError):
+        codec.decode(f"{header}.{payload}.{signature[:-2]}AA")
+    with pytest.raises(TokenError):
+        codec.decode(codec.encode(_claims(ttl=-1)))
+    with pytest.raises(TokenError):
+        codec.decode(jwt.encode(_claims(), "secret", algorithm="HS512"))
+    with pytest.raises(TokenError):
+        codec.decode("not-a-token")
+
+
+def test_hmac_codec_accepts_retired_key_ids_during_rotation():
+    old = HmacTokenCodec("HS256", "2024", {"2024": "old-secret"})
+    new = HmacTokenCodec("HS256", "2025", {"2025": "new-secret", "2024": "old-secret"})
+
+    assert new.decode(old.encode(_claims()))["sub"] == "1"
+    with pytest.raises(TokenError):
+        old.decode(new.encode(_claims()))
+
+
+def test_jose_codec_signs_with_private_key_and_verifies_by_kid():
+    public_key, private_key = rsa.newkeys(1024)
+    private_pem = private_key.save_pkcs1().decode()
+    public_pem = public_key.save_pkcs1().decode()
+    codec = JoseTokenCodec("RS256", "k1", private_pem, {"k1": public_pem})
+
+    token = codec.encode(_claims())
+    assert jwt.get_unverified_header(token)["kid"] == "k1"
+    assert codec.decode(token)["jti"] == "abc"
+
+
+@pytest.mark.parametrize("kid", [[], {}, ["k1"], 1])
+def test_codecs_reject_non_string_key_ids(kid):
+    public_key, private_key = rsa.newkeys(1024)
+    jose_codec = JoseTokenCodec("RS256", "k1", private_key.save_pkcs1().decode(), {"k1": public_key.save_pkcs1().decode()})
+    hmac_codec = HmacTokenCodec("HS256", "k1", {"k1": "secret"})
+
+    with pytest.raises(TokenError):
+        hmac_codec.decode(jwt.encode(_claims(), "secret", algorithm="HS256", headers={"kid": kid}))
+    with pytest.raises(TokenError):
+        jose_codec.decode(jwt.encode(_claims(), "secret", algorithm="HS256", headers={"kid": kid}))
@@ -0,0 +1,66 @@
+import asyncio
+import os
+import time
+
+from sqlalchemy import select
+
+from backend.app.core.deps import get_current_user
+from backend.app.core.security import create_access_token
+from backend.app.core.token_cache import TokenCache, UserSnapshot, token_cache
+from backend.app.db import base as db_base
+from backend.app.model.user import User
+from backend.app.schemas.auth import TokenPayload
+
+
+def test_snapshot_read_before_an_invalidation_is_not_cached():
+    cache = TokenCache(maxsize=10, ttl_seconds=60)
+    payload = TokenPayload(sub=1, type="access")
+    active = UserSnapshot(user_id=1, name="dana", role="user", is_active=True)
+    other = UserSnapshot(user_id=2, name="eve", role="user", is_active=True)
+    expires = time.time() + 60
+
+    generation = cache.generation()
+    # deactivate_user commits and invalidates while the request is still reading the user
+    cache.invalidate_user(1)
+    cache.put("stale", payload, active, expires, generation)
+    assert cache.get("stale") is None
+    # other users, and reads that started after the invalidation, are cached as before
+    cache.put("other", payload, other, expires, generation)
+    cache.put("fresh", payload, active, expires, cache.generation())
+    assert cache.get("other").user == other and cache.get("fresh").user == active
+
+    generation = cache.generation()
+    cache.clear()
+    cache.put("cleared", payload, other, expires, generation)
+    assert cache.get("cleared") is None
+
+
+class _InvalidatedWhileReading:
+    # the after-commit hook of a deactivate_user fires between the user lookup and the cache fill
+    def __init__(self, session):
+        self.session = session
+
+    async def get(self, model, ident):
+        user = await self.session.get(model, ident)
+        token_cache.invalidate_user(ident)
+        return user
+
+
+async def _admin_id() -> int:
+    async with db_base.SessionLocal() as session:
+        return await session.scalar(select(User.user_id).where(User.name == os.environ["ADMIN_NAME"]))
+
+
+async def _authenticate(token, interleaved):
+    async with db_base.SessionLocal() as session:
+        return await get_current_user(_InvalidatedWhileReading(session) if interleaved else session, token)
+
+
+def test_user_invalidated_during_lookup_is_not_cached(app):
+    admin_id = asyncio.run(_admin_id())
+    token = create_access_token(str(admin_id))
+
+    assert asyncio.run(_authenticate(token, interleaved=True)).user_id == admin_id
+    assert token_cache.get(token) is None
+    assert asyncio.run(_authenticate(token, interleaved=False)).user_id == admin_id
+    assert token_cache.get(token).user.user_id == admin_id
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from backend.app.rag.ann import IvfVectorStore
+
+
+def _clustered_rows(count: int, dimension: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((20, dimension)).astype(np.float32)
+    vectors = centers[rng.integers(0, 20, count)] + 0.3 * rng.standard_normal((count, dimension)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _exact(vectors: np.ndarray, ids: np.ndarray, query: np.ndarray, k: int) -> list[int]:
+    return [int(ids[i]) for i in np.argsort(-(vectors @ query))[:k]]
+
+
+def test_ivf_train_insert_delete_and_reopen(tmp_path):
+    vectors = _clustered_rows(2_000, 16, seed=1)
+    ids = np.arange(2_000)
+
+    store = IvfVectorStore(16, nlist=16, nprobe=16, train_min_rows=1_000)
+    store.open(tmp_path)
+    store.activate(store.append(vectors[:1_500]), ids[:1_500])
+    assert not store.trained
+    store.train()
+    assert store.trained
+
+    # rows appended after training are assigned to a list straight away
+    store.activate(store.append(vectors[1_500:]), ids[1_500:])
+    queries = vectors[[3, 1_700]]
+    # probing every list is exact search
+    for query, hits in zip(queries, store.search_many(queries, 10)):
+        assert [chunk_id for chunk_id, _ in hits] == _exact(vectors, ids, query, 10)
+    # the nearest list still finds each query's own row
+    assert [hits[0][0] for hits in store.search_many(queries, 1, nprobe=1)] == [3, 1_700]
+
+    store.delete([3])
+    assert 3 not in [chunk_id for chunk_id, _ in store.search(vectors[3], 10)]
+    store.close()
+
+    # centroids and assignments come back from disk without retraining
+    reopened = IvfVectorStore(16, nlist=16, nprobe=2, train_min_rows=10**9)
+    reopened.open(tmp_path, np.arange(1, 2_000), ids[1:])
+    assert reopened.trained
+    assert reopened.search(vectors[1_700], 1)[0][0] == 1_700
+
+
+def test_ivf_retrain_swaps_files_and_tolerates_foreign_assignments(tmp_path):
+    vectors = _clustered_rows(1_200, 16, seed=2)
+    ids = np.arange(1_200)
+
+    running = IvfVectorStore(16, nlist=16, nprobe=16, train_min_rows=10**9)
+    running.open(tmp_path)
+    running.activate(running.append(vectors[:1_000]), ids[:1_000])
+    running.train()
+    # the offline trainer cannot open the index while the app holds it
+    offline = IvfVectorStore(16, nlist=4, nprobe=4, train_min_rows=10**9)
+    with pytest.raises(RuntimeError, match="already open"):
+        offline.open(tmp_path, np.arange(1_000), ids[:1_000])
+    running.close()
+
+    # a retrain with fewer lists replaces the files instead of rewriting them in place
+    offline.open(tmp_path, np.arange(1_000), ids[:1_000])
+    offline.train()
+    offline.close()
+    on_disk = np.fromfile(tmp_path / "ivf_assignments.i32", dtype=np.int32)
+    assert on_disk[:1_000].max() < 4
+    assert not list(tmp_path.glob("*.tmp"))
+
+    # an assignment past the centroids (e.g. from a larger retrain) is reassigned instead of lost
+    on_disk[5] = 15
+    on_disk.tofile(tmp_path / "ivf_assignments.i32")
+    reopened = IvfVectorStore(16, nlist=4, nprobe=4, train_min_rows=10**9)
+    reopened.open(tmp_path, np.arange(1_000), ids[:1_000])
+    reopened.activate(reopened.append(vectors[1_000:1_020]), ids[1_000:1_020])
+    for row in (5, 1_010):
+        assert reopened.search(vectors[row], 1)[0][0] == row
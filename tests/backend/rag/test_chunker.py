@@ -0,0 +1,23 @@
+import io
+
+from backend.app.rag.chunker import iter_chunks, iter_text
+
+
+def test_chunks_cover_the_text_with_overlap_across_piece_boundaries():
+    text = " ".join(f"word{index}" for index in range(500))
+    pieces = [text[start:start + 37] for start in range(0, len(text), 37)]
+
+    chunks = list(iter_chunks(pieces, size=200, overlap=50))
+
+    assert [chunk.ordinal for chunk in chunks] == list(range(len(chunks)))
+    assert chunks[0].start == 0 and chunks[-1].end == len(text)
+    for chunk in chunks:
+        assert text[chunk.start:chunk.end] == chunk.text
+        assert len(chunk.text) <= 200
+    for previous, current in zip(chunks, chunks[1:]):
+        assert current.start < previous.end
+
+
+def test_iter_text_decodes_characters_split_across_blocks():
+    data = "한국어 문서 " * 100
+    assert "".join(iter_text(io.BytesIO(data.encode()), block_size=7)) == data
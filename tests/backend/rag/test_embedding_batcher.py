@@ -0,0 +1,47 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from backend.app.rag.embedding import HashingEmbedder
+from backend.app.rag.embedding_batcher import EmbeddingBatcher
+
+
+class _RecordingEmbedder(HashingEmbedder):
+    def __init__(self, dimension: int):
+        super().__init__(dimension)
+        self.calls: list[int] = []
+
+    def embed(self, texts):
+        if "boom" in texts:
+            raise RuntimeError("model failed")
+        self.calls.append(len(texts))
+        return super().embed(texts)
+
+
+def test_concurrent_requests_share_embed_calls():
+    embedder = _RecordingEmbedder(16)
+    batcher = EmbeddingBatcher(embedder, max_items=8, max_wait_ms=50)
+    queries = [f"question {index}" for index in range(20)]
+
+    async def run():
+        batcher.start()
+        try:
+            results = await asyncio.gather(*(batcher.embed([query]) for query in queries))
+            with pytest.raises(RuntimeError):
+                await batcher.embed(["boom"])
+            return results
+        finally:
+            await batcher.stop()
+
+    results = asyncio.run(run())
+    assert np.array_equal(np.vstack(results), HashingEmbedder(16).embed(queries))
+    assert embedder.calls == [8, 8, 4]
+    assert batcher.batches == 3
+
+
+def test_unstarted_batcher_embeds_directly():
+    embedder = _RecordingEmbedder(16)
+    batcher = EmbeddingBatcher(embedder, max_items=8, max_wait_ms=50)
+    assert asyncio.run(batcher.embed(["a", "b"])).shape == (2, 16)
+    assert embedder.calls == [2] and batcher.batches == 0
@@ -0,0 +1,47 @@
+import numpy as np
+
+from backend.app.rag.embedding import HashingEmbedder
+from backend.app.rag.embedding_cache import ENTRY_OVERHEAD_BYTES, CachedEmbedder
+
+
+class _CountingEmbedder(HashingEmbedder):
+    def __init__(self, dimension: int):
+        super().__init__(dimension)
+        self.embedded: list[str] = []
+
+    def embed(self, texts):
+        self.embedded.extend(texts)
+        return super().embed(texts)
+
+
+def test_memory_tier_is_lru_within_its_byte_budget():
+    inner = _CountingEmbedder(16)
+    cache = CachedEmbedder(inner, memory_bytes=2 * (16 * 4 + ENTRY_OVERHEAD_BYTES), disk=False)
+
+    vectors = cache.embed(["alpha", "beta", "alpha"])
+    assert np.array_equal(vectors, HashingEmbedder(16).embed(["alpha", "beta", "alpha"]))
+    assert inner.embedded == ["alpha", "beta"]
+
+    cache.embed(["alpha"])  # alpha becomes most recent, so gamma evicts beta
+    cache.embed(["gamma"])
+    cache.embed(["alpha", "beta"])
+    assert inner.embedded == ["alpha", "beta", "gamma", "beta"]
+    assert cache.hits == {"memory": 2, "disk": 0}
+
+
+def test_disk_tier_survives_a_restart(tmp_path):
+    first = CachedEmbedder(_CountingEmbedder(16), memory_bytes=0)
+    first.open(tmp_path)
+    expected = first.embed(["unchanged chunk", "another chunk"])
+    first.close()
+
+    inner = _CountingEmbedder(16)
+    second = CachedEmbedder(inner, memory_bytes=1024 * 1024)
+    second.open(tmp_path)
+    assert np.array_equal(second.embed(["another chunk", "unchanged chunk", "new chunk"])[:2], expected[::-1])
+    assert inner.embedded == ["new chunk"]
+    assert second.hits == {"memory": 0, "disk": 2} and second.misses == 1
+
+    # disk hits are promoted to the memory tier
+    second.embed(["unchanged chunk"])
+    assert second.hits["memory"] == 1
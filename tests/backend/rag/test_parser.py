@@ -0,0 +1,40 @@
+import hashlib
+from pathlib import Path
+
+from backend.app.rag.parser import extract_text, iter_source_files, parse_file
+
+
+def test_html_keeps_visible_text_on_separate_lines():
+    html = (
+        b"<html><head><title>x</title><style>p {}</style></head><body>"
+        b"<h1>Dependencies</h1><p>Use <code>Depends</code> &amp; friends.</p><script>alert(1)</script></body></html>"
+    )
+    assert extract_text(html, ".HTML") == "Dependencies\n\nUse Depends & friends."
+
+
+def test_pdf_pages_are_extracted_as_text():
+    pdf = (Path(__file__).parent / "fixtures" / "sample.pdf").read_bytes()
+    assert extract_text(pdf, ".pdf") == "Pdfword pages are extracted as text."
+
+
+def test_parse_file_chunks_changed_files_only(tmp_path):
+    (tmp_path / "guide").mkdir()
+    (tmp_path / ".git").mkdir()
+    (tmp_path / ".git" / "notes.md").write_text("ignored")
+    (tmp_path / "guide" / "b.md").write_text("word " * 100)
+    (tmp_path / "a.html").write_text("<p>hello</p>")
+    (tmp_path / "image.png").write_bytes(b"\x89PNG")
+    files = list(iter_source_files(str(tmp_path)))
+    assert [source for _, source in files] == ["a.html", "guide/b.md"]
+
+    path = files[1][0]
+    parsed = parse_file(path, "guide/b.md", None, chunk_size=200, overlap=20, max_bytes=10_000)
+    assert parsed.digest == hashlib.sha256(("word " * 100).encode()).hexdigest()
+    assert parsed.content_type == "text/markdown" and len(parsed.chunks) == 3
+
+    unchanged = parse_file(path, "guide/b.md", parsed.digest, chunk_size=200, overlap=20, max_bytes=10_000)
+    assert unchanged.chunks is None and unchanged.error is None
+    too_large = parse_file(path, "guide/b.md", None, chunk_size=200, overlap=20, max_bytes=100)
+    assert too_large.error == "Document is too large"
+    missing = parse_file(str(tmp_path / "gone.md"), "gone.md", None, chunk_size=200, overlap=20, max_bytes=100)
+    assert missing.error and missing.chunks is None
@@ -0,0 +1,39 @@
+import numpy as np
+
+from backend.app.rag.response_cache import CachedResponse, ResponseCache
+
+
+def _unit(*values):
+    vector = np.array(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def test_exact_then_semantic_lookup_within_scope():
+    cache = ResponseCache(dimension=3, max_entries=4, ttl_seconds=60, threshold=0.95)
+    response = CachedResponse(hits=[{"chunkId": 1}], pieces=["Use ", "Depends."])
+    cache.put("How do I use Depends?", _unit(1, 0, 0), (5, 100), 0, response)
+
+    assert cache.get("how do i use depends", (5, 100), 0) is response
+    assert cache.get("how do i use depends", (3, 100), 0) is None
+    assert cache.similar(_unit(1, 0.1, 0), (5, 100), 0) is response
+    assert cache.similar(_unit(1, 1, 0), (5, 100), 0) is None
+    assert cache.similar(_unit(1, 0.1, 0), (5, 200), 0) is None
+    assert cache.hits == {"exact": 1, "semantic": 1} and cache.misses == 2
+
+
+def test_corpus_version_ttl_and_lru_eviction():
+    cache = ResponseCache(dimension=2, max_entries=2, ttl_seconds=60, threshold=0.95)
+    for index in range(3):
+        cache.put(f"question {index}", _unit(1, index), None, 0, CachedResponse([], [str(index)]))
+    assert len(cache) == 2 and cache.get("question 0", None, 0) is None
+    assert cache.get("question 2", None, 0).pieces == ["2"]
+
+    # a newer corpus empties the cache, and answers generated against the old one are not stored
+    assert cache.get("question 2", None, 1) is None and len(cache) == 0
+    cache.put("question 2", _unit(1, 2), None, 0, CachedResponse([], ["stale"]))
+    assert len(cache) == 0
+
+    expiring = ResponseCache(dimension=2, max_entries=2, ttl_seconds=0, threshold=0.95)
+    expiring.put("question", _unit(1, 0), None, 0, CachedResponse([], ["x"]))
+    assert expiring.get("question", None, 0) is None
+    assert expiring.similar(_unit(1, 0), None, 0) is None and len(expiring) == 0
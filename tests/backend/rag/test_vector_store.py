@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from backend.app.rag import vector_store
+from backend.app.rag.vector_store import MmapVectorStore
+
+
+def _unit_rows(count: int, dimension: int, seed: int) -> np.ndarray:
+    vectors = np.random.default_rng(seed).standard_normal((count, dimension)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _exact(vectors: np.ndarray, ids: np.ndarray, query: np.ndarray, k: int) -> list[int]:
+    return [int(ids[i]) for i in np.argsort(-(vectors @ query))[:k]]
+
+
+def test_append_activate_delete_and_reopen(tmp_path, monkeypatch):
+    monkeypatch.setattr(vector_store, "SEARCH_BLOCK_ROWS", 256)
+    vectors = _unit_rows(1_000, 16, seed=1)
+    ids = np.arange(1_000, 2_000)
+
+    store = MmapVectorStore(16)
+    store.open(tmp_path)
+    rows = np.concatenate([store.append(vectors[:600]), store.append(vectors[600:])])
+    assert store.search(vectors[0], 5) == []
+    store.activate(rows, ids)
+
+    queries = _unit_rows(4, 16, seed=2)
+    for query, hits in zip(queries, store.search_many(queries, 10)):
+        assert [chunk_id for chunk_id, _ in hits] == _exact(vectors, ids, query, 10)
+
+    store.delete(ids[:500])
+    assert len(store) == 500
+    assert all(chunk_id >= 1_500 for chunk_id, _ in store.search(vectors[0], 20))
+    store.flush()
+
+    # an uncommitted append has no mapping and stays invisible after a restart
+    store.append(_unit_rows(3, 16, seed=3))
+    # a second writer on the same files would hand out the same rows, so it is refused until the first closes
+    with pytest.raises(RuntimeError, match="already open"):
+        MmapVectorStore(16).open(tmp_path)
+    store.close()
+    reopened = MmapVectorStore(16)
+    reopened.open(tmp_path, rows[500:], ids[500:])
+    assert len(reopened) == 500
+    assert [hit[0] for hit in reopened.search(vectors[700], 1)] == [1_700]
+    assert reopened.append(vectors[:1]).tolist() == [1_000]
@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+from backend.app.db import base as db_base
+from backend.app.model.user import User
+from backend.app.repository.base import UnitOfWork
+from backend.app.repository.user import UserRepository
+
+
+def _user(name: str) -> User:
+    return User(name=name, password="x", role="user", is_active=True)
+
+
+async def _savepoint_scenario() -> tuple[set[str], list[str]]:
+    fired: list[str] = []
+    async with db_base.SessionLocal() as session:
+        uow = UnitOfWork(session)
+        repository = UserRepository(session)
+        async with uow:
+            await repository.add(_user("uow_outer"))
+            uow.after_commit(lambda: fired.append("outer"))
+
+            with pytest.raises(ValueError):
+                async with uow:
+                    await repository.add(_user("uow_rolled_back"))
+                    uow.after_commit(lambda: fired.append("rolled back"))
+                    raise ValueError("undo the savepoint")
+
+            async with uow:
+                await repository.add(_user("uow_inner"))
+                uow.after_commit(lambda: fired.append("inner"))
+            assert fired == []
+
+    async with db_base.SessionLocal() as session:
+        names = await UserRepository(session).find_existing_names(["uow_outer", "uow_rolled_back", "uow_inner"])
+    return names, fired
+
+
+async def _rollback_scenario() -> tuple[set[str], list[str]]:
+    fired: list[str] = []
+    async with db_base.SessionLocal() as session:
+        uow = UnitOfWork(session)
+        with pytest.raises(RuntimeError):
+            async with uow:
+                await UserRepository(session).add(_user("uow_failed"))
+                uow.after_commit(lambda: fired.append("failed"))
+                raise RuntimeError("boom")
+
+    async with db_base.SessionLocal() as session:
+        names = await UserRepository(session).find_existing_names(["uow_failed"])
+    return names, fired
+
+
+def test_savepoints_and_after_commit_hooks(app):
+    names, fired = asyncio.run(_savepoint_scenario())
+    assert names == {"uow_outer", "uow_inner"}
+    assert fired == ["outer", "inner"]
+
+
+def test_rollback_discards_work_and_hooks(app):
+    names, fired = asyncio.run(_rollback_scenario())
+    assert names == set()
+    assert fired == []
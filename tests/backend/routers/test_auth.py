@@ -1,4 +1,5 @@
 import http
+import threading
 
 def _login(client, username: str, password: str):
     return client.post(
@@ -85,3 +86,28 @@ def test_logout_all_sessions_revokes_other_sessions(client, admin_credentials):
             cookies={"refresh_token": cookie},
         )
         assert response.status_code == http.HTTPStatus.UNAUTHORIZED
+
+
+def test_login_sheds_load_when_hash_pool_is_full(client, admin_credentials, monkeypatch):
+    from backend.app.core import security
+
+    exhausted = threading.BoundedSemaphore(1)
+    exhausted.acquire()
+    monkeypatch.setattr(security.password_hasher, "_slots", exhausted)
+
+    response = _login(client, **admin_credentials)
+    assert response.status_code == http.HTTPStatus.SERVICE_UNAVAILABLE
+    assert response.headers.get("retry-after") == "1"
+
+
+def test_rotated_refresh_token_cannot_be_reused(client, admin_credentials):
+    refresh_token = _login(client, **admin_credentials).cookies.get("refresh_token")
+
+    first = client.post("/api/auth/refresh", cookies={"refresh_token": refresh_token})
+    assert first.status_code == http.HTTPStatus.OK
+
+    replay = client.post("/api/auth/refresh", cookies={"refresh_token": refresh_token})
+    assert replay.status_code == http.HTTPStatus.UNAUTHORIZED
+
+    rotated = client.post("/api/auth/refresh", cookies={"refresh_token": first.cookies.get("refresh_token")})
+    assert rotated.status_code == http.HTTPStatus.OK
@@ -0,0 +1,108 @@
+import asyncio
+import http
+import json
+
+from backend.app.rag.llm import ChatGenerator
+from backend.app.service.chat import ChatService
+
+from .test_document import _upload
+from .test_user import _admin_login, _auth_header
+
+
+STREAMING_DOC = "StreamingResponse sends each chunk an async generator yields as soon as it is produced. " * 20
+
+
+def _events(body: str) -> list[tuple[str, object]]:
+    events = []
+    for frame in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in frame.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def test_chat_streams_retrieval_then_tokens(client):
+    assert client.post("/api/chat/", json={"question": "login"}).status_code == http.HTTPStatus.UNAUTHORIZED
+
+    token = _admin_login(client).json()["access_token"]
+    _upload(client, token, "streaming.md", STREAMING_DOC)
+
+    with client.stream(
+        "POST", "/api/chat/", json={"question": "StreamingResponse async generator", "k": 2, "maxTokens": 8},
+        headers=_auth_header(token),
+    ) as response:
+        assert response.status_code == http.HTTPStatus.OK
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = _events(response.read().decode())
+
+    kinds = [kind for kind, _ in events]
+    assert kinds[0] == "retrieval" and kinds[-1] == "done"
+    assert events[0][1][0]["source"] == "streaming.md"
+    assert kinds.count("token") == events[-1][1]["tokens"] == 8
+
+
+class _EndlessGenerator(ChatGenerator):
+    def __init__(self):
+        self.closed = False
+
+    async def stream(self, prompt, max_tokens):
+        try:
+            while True:
+                await asyncio.sleep(0)
+                yield "token "
+        finally:
+            self.closed = True
+
+
+class _NoHits:
+    async def search(self, query, k):
+        return []
+
+
+def test_closing_the_stream_stops_generation():
+    generator = _EndlessGenerator()
+    stream = ChatService(_NoHits(), generator).stream("question", 3, 1_000_000)
+
+    async def read_two_frames_then_disconnect():
+        assert (await anext(stream)).startswith("event: retrieval")
+        assert (await anext(stream)).startswith("event: token")
+        await stream.aclose()
+
+    asyncio.run(read_two_frames_then_disconnect())
+    assert generator.closed
+
+
+class _FailingSearch:
+    async def search(self, query, k):
+        raise RuntimeError("index unavailable")
+
+
+def test_stream_failures_are_logged_and_reported_in_band(caplog):
+    async def read_all():
+        return [frame async for frame in ChatService(_FailingSearch(), _EndlessGenerator()).stream("question", 3, 8)]
+
+    frames = asyncio.run(read_all())
+    assert _events("".join(frames)) == [("error", {"detail": "Chat generation failed"})]
+    assert any(
+        record.message == "Chat stream failed" and "index unavailable" in record.exc_text
+        for record in caplog.records
+    )
+
+
+def test_repeated_questions_are_served_from_the_cache(client):
+    token = _admin_login(client).json()["access_token"]
+    _upload(client, token, "streaming.md", STREAMING_DOC)
+
+    def ask(question):
+        with client.stream(
+            "POST", "/api/chat/", json={"question": question, "maxTokens": 6}, headers=_auth_header(token),
+        ) as response:
+            return _events(response.read().decode())
+
+    first = ask("What does StreamingResponse send?")
+    repeated = ask("  what does streamingresponse SEND ")
+    assert "cached" not in first[-1][1] and repeated[-1][1]["cached"] is True
+    assert repeated[:-1] == first[:-1]
+
+    # any change to the indexed corpus retires every cached answer
+    _upload(client, token, "cache-buster.md", "Response caches are scoped by corpus version. " * 10)
+    assert "cached" not in ask("What does StreamingResponse send?")[-1][1]
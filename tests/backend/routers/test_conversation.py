@@ -0,0 +1,71 @@
+import http
+
+from .test_auth import _login
+from .test_chat import STREAMING_DOC, _events
+from .test_document import _upload
+from .test_user import _admin_login, _auth_header
+
+
+def _chat(client, token, conversation_id, question):
+    with client.stream(
+        "POST", "/api/chat/", json={"question": question, "maxTokens": 4, "conversationId": conversation_id},
+        headers=_auth_header(token),
+    ) as response:
+        assert response.status_code == http.HTTPStatus.OK
+        return _events(response.read().decode())
+
+
+def test_chat_turns_are_recorded_in_order(client):
+    token = _admin_login(client).json()["access_token"]
+    _upload(client, token, "streaming.md", STREAMING_DOC)
+    created = client.post("/api/conversations/", json={"title": "streams"}, headers=_auth_header(token))
+    assert created.status_code == http.HTTPStatus.OK
+    conversation_id = created.json()["conversationId"]
+
+    first = _chat(client, token, conversation_id, "How does StreamingResponse send chunks?")
+    second = _chat(client, token, conversation_id, "And the async generator?")
+    assert first[-1] == ("done", {"tokens": 4, "conversationId": conversation_id, "seq": 2})
+    assert second[-1][1]["seq"] == 4
+
+    messages = client.get(f"/api/conversations/{conversation_id}/messages", headers=_auth_header(token)).json()
+    assert [message["seq"] for message in messages] == [1, 2, 3, 4]
+    assert [message["role"] for message in messages] == ["user", "assistant", "user", "assistant"]
+    assert messages[0]["content"] == "How does StreamingResponse send chunks?"
+    assert messages[1]["content"] == "".join(event["text"] for kind, event in first if kind == "token")
+    assert messages[0]["tokenCount"] == 6
+
+    page = client.get(
+        f"/api/conversations/{conversation_id}/messages", params={"limit": 2, "before": 4}, headers=_auth_header(token),
+    ).json()
+    assert [message["seq"] for message in page] == [2, 3]
+
+    listed = client.get("/api/conversations/", headers=_auth_header(token)).json()
+    summary = next(item for item in listed if item["conversationId"] == conversation_id)
+    assert summary["messageCount"] == 4
+    assert summary["tokenCount"] == sum(message["tokenCount"] for message in messages)
+
+
+def test_conversations_are_private_to_their_owner(client):
+    admin_token = _admin_login(client).json()["access_token"]
+    client.post(
+        "/api/users/", json={"name": "dora", "password": "dora123", "userRole": "user"},
+        headers=_auth_header(admin_token),
+    )
+    conversation_id = client.post("/api/conversations/", json={}, headers=_auth_header(admin_token)).json()["conversationId"]
+
+    user_token = _login(client, "dora", "dora123").json()["access_token"]
+    assert client.get(
+        f"/api/conversations/{conversation_id}/messages", headers=_auth_header(user_token)
+    ).status_code == http.HTTPStatus.NOT_FOUND
+    assert client.post(
+        "/api/chat/", json={"question": "hello", "conversationId": conversation_id}, headers=_auth_header(user_token),
+    ).status_code == http.HTTPStatus.NOT_FOUND
+    assert all(
+        item["conversationId"] != conversation_id
+        for item in client.get("/api/conversations/", headers=_auth_header(user_token)).json()
+    )
+
+    assert client.delete(f"/api/conversations/{conversation_id}", headers=_auth_header(admin_token)).json() is True
+    assert client.get(
+        f"/api/conversations/{conversation_id}/messages", headers=_auth_header(admin_token)
+    ).status_code == http.HTTPStatus.NOT_FOUND
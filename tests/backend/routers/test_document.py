@@ -0,0 +1,80 @@
+import http
+
+from .test_user import _admin_login, _auth_header
+
+FASTAPI_DOC = (
+    "Security utilities. OAuth2PasswordRequestForm is a class dependency that declares a form body "
+    "with username and password. Use it together with OAuth2PasswordBearer to implement login. "
+) * 20
+OTHER_DOC = "Background tasks run after returning a response. Use BackgroundTasks in a path operation. " * 20
+
+
+def _upload(client, token, name, body):
+    return client.post(
+        "/api/documents/",
+        files={"file": (name, body.encode(), "text/markdown")},
+        headers=_auth_header(token),
+    )
+
+
+def test_upload_is_incremental_and_searchable(client):
+    token = _admin_login(client).json()["access_token"]
+
+    created = _upload(client, token, "security.md", FASTAPI_DOC)
+    assert created.status_code == http.HTTPStatus.OK
+    assert created.json()["status"] == "created"
+    assert created.json()["document"]["chunkCount"] > 1
+    _upload(client, token, "background.md", OTHER_DOC)
+
+    unchanged = _upload(client, token, "security.md", FASTAPI_DOC)
+    assert unchanged.json()["status"] == "unchanged"
+    assert unchanged.json()["document"]["updatedAt"] == created.json()["document"]["updatedAt"]
+
+    hits = client.get(
+        "/api/documents/search", params={"q": "OAuth2PasswordRequestForm login", "k": 3}, headers=_auth_header(token)
+    ).json()
+    assert hits and hits[0]["source"] == "security.md"
+    lexical = client.get(
+        "/api/documents/search",
+        params={"q": "OAuth2PasswordRequestForm", "k": 3, "mode": "lexical"},
+        headers=_auth_header(token),
+    ).json()
+    assert lexical and {hit["source"] for hit in lexical} == {"security.md"}
+
+    updated = _upload(client, token, "security.md", "Dependencies with yield. " * 10)
+    assert updated.json()["status"] == "updated"
+    assert updated.json()["document"]["chunkCount"] == 1
+    hits = client.get(
+        "/api/documents/search", params={"q": "OAuth2PasswordRequestForm", "k": 10}, headers=_auth_header(token)
+    ).json()
+    assert all("OAuth2PasswordRequestForm" not in hit["content"] for hit in hits)
+
+    document_id = updated.json()["document"]["documentId"]
+    assert client.delete(f"/api/documents/{document_id}", headers=_auth_header(token)).json() is True
+    sources = [document["source"] for document in client.get("/api/documents/", headers=_auth_header(token)).json()]
+    assert "security.md" not in sources
+
+
+def test_html_upload_is_indexed_as_visible_text(client):
+    token = _admin_login(client).json()["access_token"]
+    page = (
+        "<html><head><title>ignored</title><style>.Stylesheetword { color: red }</style></head><body>"
+        + "<p>Middlewareword runs around every request and response.</p>" * 20
+        + "<script>var Scriptword = 1;</script></body></html>"
+    )
+    uploaded = client.post(
+        "/api/documents/", files={"file": ("middleware.html", page.encode(), "text/html")}, headers=_auth_header(token),
+    )
+    assert uploaded.json()["status"] == "created"
+
+    hits = client.get(
+        "/api/documents/search",
+        params={"q": "Middlewareword", "k": 3, "mode": "lexical"},
+        headers=_auth_header(token),
+    ).json()
+    assert hits and hits[0]["source"] == "middleware.html"
+    assert all("<p>" not in hit["content"] and "Scriptword" not in hit["content"] for hit in hits)
+    for hidden in ("Stylesheetword", "Scriptword"):
+        assert not client.get(
+            "/api/documents/search", params={"q": hidden, "k": 3, "mode": "lexical"}, headers=_auth_header(token),
+        ).json()
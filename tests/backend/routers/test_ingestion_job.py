@@ -0,0 +1,78 @@
+import asyncio
+import http
+
+from backend.app.core.container import container
+from backend.app.db import base as db_base
+from backend.app.service.ingestion_worker import IngestionWorkerPool
+
+from .test_auth import _login
+from .test_user import _admin_login, _auth_header
+
+JOB_DOC = "Jobqueueword explains how lifespan events start background workers. " * 60
+
+
+def _enqueue(client, token, name, body):
+    return client.post(
+        "/api/ingestion-jobs/",
+        files={"file": (name, body.encode(), "text/markdown")},
+        headers=_auth_header(token),
+    )
+
+
+def _run_queued() -> int:
+    async def drain() -> int:
+        pool = IngestionWorkerPool(db_base.SessionLocal, container.ingestion_job_service, workers=1, poll_seconds=1)
+        while await pool.run_once():
+            pass
+        return pool.jobs_run
+
+    return asyncio.run(drain())
+
+
+def test_ingestion_job_can_be_cancelled_retried_and_completed(client):
+    token = _admin_login(client).json()["access_token"]
+    client.post(
+        "/api/users/", json={"name": "erin", "password": "erin123", "userRole": "user"},
+        headers=_auth_header(token),
+    )
+    user_token = _login(client, "erin", "erin123").json()["access_token"]
+    assert _enqueue(client, user_token, "jobs.md", JOB_DOC).status_code == http.HTTPStatus.FORBIDDEN
+    assert client.get("/api/ingestion-jobs/", headers=_auth_header(user_token)).status_code == http.HTTPStatus.FORBIDDEN
+
+    job = _enqueue(client, token, "jobs.md", JOB_DOC).json()
+    assert job["status"] == "queued" and job["progress"] == 0 and job["totalChunks"] is None
+    job_id = job["jobId"]
+
+    cancelled = client.post(f"/api/ingestion-jobs/{job_id}/cancel", headers=_auth_header(token))
+    assert cancelled.json()["status"] == "cancelled" and cancelled.json()["finishedAt"] is not None
+    again = client.post(f"/api/ingestion-jobs/{job_id}/cancel", headers=_auth_header(token))
+    assert again.status_code == http.HTTPStatus.CONFLICT
+    listed = client.get("/api/ingestion-jobs/", params={"status": "cancelled"}, headers=_auth_header(token)).json()
+    assert [listed_job["jobId"] for listed_job in listed] == [job_id]
+
+    # a job cancelled before it started drops its upload, so it cannot be retried
+    discarded = client.post(f"/api/ingestion-jobs/{job_id}/retry", headers=_auth_header(token))
+    assert discarded.status_code == http.HTTPStatus.CONFLICT
+    job_id = _enqueue(client, token, "jobs.md", JOB_DOC).json()["jobId"]
+
+    assert _run_queued() == 1
+    done = client.get(f"/api/ingestion-jobs/{job_id}", headers=_auth_header(token)).json()
+    assert done["status"] == "succeeded" and done["outcome"] == "created"
+    assert done["committedChunks"] == done["totalChunks"] > 1 and done["progress"] == 1.0
+    assert done["attempts"] == 1 and done["documentId"] is not None
+    hits = client.get(
+        "/api/documents/search", params={"q": "Jobqueueword", "k": 3, "mode": "lexical"}, headers=_auth_header(token)
+    ).json()
+    assert hits and hits[0]["source"] == "jobs.md"
+    documents = client.get("/api/documents/", headers=_auth_header(token)).json()
+    document = next(document for document in documents if document["source"] == "jobs.md")
+    assert document["chunkCount"] == done["totalChunks"] and document["contentHash"]
+
+    unchanged = _enqueue(client, token, "jobs.md", JOB_DOC).json()
+    _run_queued()
+    unchanged = client.get(f"/api/ingestion-jobs/{unchanged['jobId']}", headers=_auth_header(token)).json()
+    assert unchanged["status"] == "succeeded" and unchanged["outcome"] == "unchanged"
+    assert unchanged["documentId"] == done["documentId"]
+
+    missing = client.get("/api/ingestion-jobs/999999", headers=_auth_header(token))
+    assert missing.status_code == http.HTTPStatus.NOT_FOUND
@@ -0,0 +1,18 @@
+import http
+
+from .test_auth import _login
+
+
+def test_metrics_exposes_route_db_and_hash_timings(client, admin_credentials):
+    token = _login(client, **admin_credentials).json()["access_token"]
+    client.get("/api/auth/me", headers={"Authorization": f"Bearer {token}"})
+
+    response = client.get("/metrics")
+    assert response.status_code == http.HTTPStatus.OK
+    assert response.headers["content-type"].startswith("text/plain")
+
+    body = response.text
+    assert 'http_request_duration_seconds_count{method="POST",route="/api/auth/token",status="200"}' in body
+    assert 'db_statements_per_request_bucket{route="/api/auth/token",le="+Inf"}' in body
+    assert 'password_hash_duration_seconds_count{operation="verify"}' in body
+    assert 'jwt_duration_seconds_count{operation="encode"}' in body
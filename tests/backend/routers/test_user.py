@@ -1,7 +1,10 @@
+import json
 import os
 
 import http
 
+from backend.app.router import user as user_router
+
 from .test_auth import _login
 
 
@@ -87,3 +90,94 @@ def test_update_and_activation_flow(client):
     # Ensure updated password works
     login_updated = _login(client, "charlie", "newpass123")
     assert login_updated.status_code == http.HTTPStatus.OK
+
+
+def test_deactivation_invalidates_cached_access_token(client):
+    admin_token = _admin_login(client).json()["access_token"]
+    create_response = client.post(
+        "/api/users/",
+        json={"name": "dana", "password": "dana123", "userRole": "user"},
+        headers=_auth_header(admin_token),
+    )
+    user_id = create_response.json()["userId"]
+
+    user_token = _login(client, "dana", "dana123").json()["access_token"]
+    assert client.get("/api/auth/me", headers=_auth_header(user_token)).status_code == http.HTTPStatus.OK
+
+    client.delete(f"/api/users/{user_id}", headers=_auth_header(admin_token))
+
+    response = client.get("/api/auth/me", headers=_auth_header(user_token))
+    assert response.status_code == http.HTTPStatus.BAD_REQUEST
+
+
+def test_list_users_keyset_pagination_and_export(client, monkeypatch):
+    token = _admin_login(client).json()["access_token"]
+    for index in range(5):
+        client.post(
+            "/api/users/",
+            json={"name": f"page_{index}", "password": "page123", "userRole": "user"},
+            headers=_auth_header(token),
+        )
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2, "namePrefix": "page_"}
+        if cursor is not None:
+            params["cursor"] = cursor
+        response = client.get("/api/users/", params=params, headers=_auth_header(token))
+        assert response.status_code == http.HTTPStatus.OK
+        seen.extend(user["name"] for user in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+    assert seen == [f"page_{index}" for index in range(5)]
+
+    # without paging parameters the whole list comes back, as it did before pagination
+    monkeypatch.setattr(user_router, "USER_PAGE_SIZE", 2)
+    everyone = client.get("/api/users/", params={"namePrefix": "page_"}, headers=_auth_header(token))
+    assert [user["name"] for user in everyone.json()] == seen and "X-Next-Cursor" not in everyone.headers
+    # a cursor alone pages with the default size
+    first_id = everyone.json()[0]["userId"]
+    page = client.get("/api/users/", params={"namePrefix": "page_", "cursor": first_id}, headers=_auth_header(token))
+    assert [user["name"] for user in page.json()] == seen[1:3] and "X-Next-Cursor" in page.headers
+
+    admins = client.get("/api/users/", params={"userRole": "admin"}, headers=_auth_header(token)).json()
+    assert admins and all(user["userRole"] == "admin" for user in admins)
+
+    export = client.get(
+        "/api/users/", params={"format": "ndjson", "namePrefix": "page_"}, headers=_auth_header(token)
+    )
+    assert export.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in export.text.splitlines()]
+    assert [row["name"] for row in rows] == seen
+    assert set(rows[0]) == {"userId", "name", "userRole"}
+
+
+def test_bulk_import_reports_each_row(client):
+    token = _admin_login(client).json()["access_token"]
+    rows = [
+        {"name": "import_a", "password": "import123", "userRole": "user"},
+        {"name": os.environ["ADMIN_NAME"], "password": "whatever", "userRole": "admin"},
+        {"name": "import_a", "password": "again123", "userRole": "user"},
+        {"name": "import_b", "password": "import123", "userRole": "superuser"},
+        {"name": "import_c", "password": "import123", "userRole": "admin"},
+    ]
+    response = client.post("/api/users/import", json=rows, headers=_auth_header(token))
+    assert response.status_code == http.HTTPStatus.OK
+    report = response.json()
+    assert (report["created"], report["duplicates"], report["invalid"]) == (2, 2, 1)
+    assert [result["status"] for result in report["results"]] == [
+        "created", "duplicate", "duplicate", "invalid", "created",
+    ]
+    assert report["results"][0]["userId"] is not None
+    assert _login(client, "import_a", "import123").status_code == http.HTTPStatus.OK
+
+    csv_body = "name,password,userRole\nimport_d,import123,user\nimport_c,import123,user\n"
+    response = client.post(
+        "/api/users/import/csv",
+        files={"file": ("users.csv", csv_body, "text/csv")},
+        headers=_auth_header(token),
+    )
+    assert response.status_code == http.HTTPStatus.OK
+    assert [result["status"] for result in response.json()["results"]] == ["created", "duplicate"]
@@ -0,0 +1,53 @@
+import asyncio
+import os
+
+from sqlalchemy import select
+
+from backend.app.db import base as db_base
+from backend.app.model.user import User
+from backend.app.rag.llm import ExtractiveSummarizer, FakeChatGenerator
+from backend.app.repository.base import UnitOfWork
+from backend.app.repository.conversation import ConversationRepository
+from backend.app.service import conversation as conversation_module
+from backend.app.service.conversation import ConversationService
+
+
+def _turn(index: int) -> tuple[str, str]:
+    # ten tokens each
+    return ("user" if index % 2 == 0 else "assistant", f"turn {index} is about topic {index}. more words here")
+
+
+async def _conversation_flow(monkeypatch):
+    service = ConversationService(
+        ConversationRepository(), UnitOfWork(), FakeChatGenerator(0), ExtractiveSummarizer(),
+    )
+    settings = conversation_module.settings
+    monkeypatch.setattr(settings, "CHAT_HISTORY_TOKEN_BUDGET", 50)
+    monkeypatch.setattr(settings, "CHAT_SUMMARY_MAX_TOKENS", 20)
+    monkeypatch.setattr(settings, "CHAT_SUMMARIZE_AFTER_TOKENS", 100)
+    async with db_base.SessionLocal() as session:
+        with db_base.bind_session(session):
+            user_id = await session.scalar(select(User.user_id).where(User.name == os.environ["ADMIN_NAME"]))
+            conversation_id = (await service.create_conversation(user_id)).id
+            for index in range(0, 12, 2):
+                await service.append(conversation_id, user_id, [_turn(index), _turn(index + 1)])
+
+            context = await service.build_context(conversation_id, user_id, budget=35, max_messages=50)
+            assert context.summary is None
+            assert context.turns == [_turn(9), _turn(10), _turn(11)]
+            assert context.tokens == 30
+
+            # 120 unsummarised tokens are over the threshold: keep what fits beside a full summary, fold the rest
+            assert await service.summarize(conversation_id, user_id)
+            assert not await service.summarize(conversation_id, user_id)
+            context = await service.build_context(conversation_id, user_id, budget=50, max_messages=50)
+            assert context.turns == [_turn(9), _turn(10), _turn(11)]
+            assert context.summary.split("\n")[-1] == "user: turn 8 is about topic 8."
+            assert context.tokens == 30 + service.generator.count_tokens(context.summary) <= 50
+
+            messages = await service.get_messages(conversation_id, user_id, limit=100)
+            assert [message.seq for message in messages] == list(range(1, 13))
+
+
+def test_context_window_and_summary(app, monkeypatch):
+    asyncio.run(_conversation_flow(monkeypatch))
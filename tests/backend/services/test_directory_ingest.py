@@ -0,0 +1,44 @@
+import asyncio
+
+from backend.app.core.container import container
+from backend.app.db import base as db_base
+
+
+async def _ingest(root, **options):
+    async with db_base.SessionLocal() as session:
+        with db_base.bind_session(session):
+            return await container.document_service.ingest_directory(str(root), **options)
+
+
+async def _search(query):
+    async with db_base.SessionLocal() as session:
+        with db_base.bind_session(session):
+            return await container.document_service.search(query, 3, "lexical")
+
+
+def test_directory_ingest_is_parallel_incremental_and_searchable(app, tmp_path):
+    tree = tmp_path / "tree"
+    (tree / "guide").mkdir(parents=True)
+    for index in range(6):
+        (tree / "guide" / f"page-{index}.md").write_text(f"Directorypage{index} explains routing. " * 60)
+    (tree / "index.html").write_text("<h1>Treeindexpage</h1><script>var hidden;</script><p>Start here.</p>")
+    (tree / "broken.pdf").write_bytes(b"%PDF-1.4 not really")
+
+    progress = []
+    report = asyncio.run(_ingest(tmp_path, workers=2, max_in_flight=3, commit_chunks=5, progress=progress.append))
+    assert report.files == 8
+    assert report.statuses == {"created": 7, "failed": 1}
+    assert "tree/broken.pdf" in report.failed
+    assert report.chunks > 7 and len(progress) > 1
+    assert report.files_per_second > 0 and report.chunks_per_second > 0
+
+    hits = asyncio.run(_search("Directorypage3"))
+    assert hits and hits[0].source == "tree/guide/page-3.md"
+    assert asyncio.run(_search("Treeindexpage"))[0].source == "tree/index.html"
+    assert not asyncio.run(_search("hidden"))
+
+    (tree / "guide" / "page-3.md").write_text("Rewrittenpage now covers middleware. " * 10)
+    again = asyncio.run(_ingest(tmp_path, workers=1))
+    assert again.statuses == {"unchanged": 6, "updated": 1, "failed": 1}
+    assert not asyncio.run(_search("Directorypage3"))
+    assert asyncio.run(_search("Rewrittenpage"))[0].source == "tree/guide/page-3.md"
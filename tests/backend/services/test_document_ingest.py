@@ -0,0 +1,88 @@
+import asyncio
+import io
+
+from backend.app.core.container import container
+from backend.app.db import base as db_base
+from backend.app.rag.embedding_batcher import EmbeddingBatcher
+from backend.app.repository.base import UnitOfWork
+from backend.app.repository.document import DocumentRepository
+from backend.app.service.document import DocumentService
+
+
+class _ConcurrentUpload:
+    # embeds normally, but the first call lets another upload of the same source commit meanwhile
+    def __init__(self, source: str, body: bytes):
+        self.batcher = EmbeddingBatcher(container.embedder, 0, 0)
+        self.pending = (source, body)
+
+    async def embed(self, texts):
+        if self.pending is not None:
+            source, body = self.pending
+            self.pending = None
+            async with db_base.SessionLocal() as session:
+                with db_base.bind_session(session):
+                    await container.document_service.ingest(source, io.BytesIO(body), "text/markdown")
+        return await self.batcher.embed(texts)
+
+
+class _StaleLookupRepository(DocumentRepository):
+    # the lookup inside the write transaction misses a document committed just before the insert
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    async def find_by_source(self, source):
+        self.calls += 1
+        return None if self.calls == 2 else await super().find_by_source(source)
+
+
+def _service(repository, batcher) -> DocumentService:
+    return DocumentService(
+        repository, UnitOfWork(), container.embedder, container.vector_store, batcher, container.lexical_index,
+    )
+
+
+async def _ingest(service, source, body):
+    async with db_base.SessionLocal() as session:
+        with db_base.bind_session(session):
+            return await service.ingest(source, io.BytesIO(body), "text/markdown")
+
+
+async def _search(query):
+    async with db_base.SessionLocal() as session:
+        with db_base.bind_session(session):
+            return await container.document_service.search(query, 3, "lexical")
+
+
+def test_upload_racing_a_new_source_updates_instead_of_failing(app):
+    ours, theirs = b"Raceoursword covers dependencies. " * 80, b"Racetheirsword covers routers. " * 80
+    service = _service(DocumentRepository(), _ConcurrentUpload("race.md", theirs))
+    result = asyncio.run(_ingest(service, "race.md", ours))
+    assert result.status == "updated" and result.document.chunk_count > 1
+    assert asyncio.run(_search("Raceoursword"))[0].source == "race.md"
+    assert not asyncio.run(_search("Racetheirsword"))
+
+    # the lookup in the write transaction can still miss it: the unique index rejects the insert and it is retried
+    repository = _StaleLookupRepository()
+    result = asyncio.run(_ingest(_service(repository, EmbeddingBatcher(container.embedder, 0, 0)), "race.md", theirs))
+    assert result.status == "updated" and repository.calls == 3
+    assert asyncio.run(_search("Racetheirsword"))[0].source == "race.md"
+    assert not asyncio.run(_search("Raceoursword"))
+
+
+def test_upload_that_turns_out_unchanged_takes_no_store_rows(app, monkeypatch):
+    appended = {"rows": 0, "slots": 0}
+
+    def counting(name, append):
+        def wrapper(batch):
+            appended[name] += len(batch)
+            return append(batch)
+        return wrapper
+
+    monkeypatch.setattr(container.vector_store, "append", counting("rows", container.vector_store.append))
+    monkeypatch.setattr(container.lexical_index, "append", counting("slots", container.lexical_index.append))
+    body = b"Sameword covers middleware. " * 80
+    result = asyncio.run(_ingest(_service(DocumentRepository(), _ConcurrentUpload("same.md", body)), "same.md", body))
+    assert result.status == "unchanged"
+    # only the upload that committed took rows and slots
+    assert appended == {"rows": result.document.chunk_count, "slots": result.document.chunk_count}
@@ -0,0 +1,255 @@
+import asyncio
+import io
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from backend.app.core.container import container
+from backend.app.db import base as db_base
+from backend.app.model.document import DocumentChunk
+from backend.app.rag.embedding_batcher import EmbeddingBatcher
+from backend.app.repository.base import UnitOfWork
+from backend.app.repository.document import DocumentRepository
+from backend.app.repository.ingestion_job import IngestionJobRepository
+from backend.app.service import ingestion_job as ingestion_job_module
+from backend.app.service.document import DocumentService
+from backend.app.service.ingestion_job import IngestionJobService
+from backend.app.service.ingestion_worker import IngestionWorkerPool
+
+RESUME_DOC = "Resumeword marks a document ingested across a worker crash and a restart. " * 120
+
+
+class _FailingBatcher:
+    # embeds the first `calls` batches, then fails like an embedding backend going away
+    def __init__(self, calls: int):
+        self.batcher = EmbeddingBatcher(container.embedder, 0, 0)
+        self.calls = calls
+
+    async def embed(self, texts):
+        if self.calls == 0:
+            raise RuntimeError("embedding backend unavailable")
+        self.calls -= 1
+        return await self.batcher.embed(texts)
+
+
+async def _in_session(call):
+    async with db_base.SessionLocal() as session:
+        with db_base.bind_session(session):
+            return await call()
+
+
+async def _chunks(document_id):
+    async with db_base.SessionLocal() as session:
+        result = await session.execute(
+            select(DocumentChunk.ordinal, DocumentChunk.chunk_id)
+            .where(DocumentChunk.document_id == document_id)
+            .order_by(DocumentChunk.ordinal)
+        )
+        return result.all()
+
+
+async def _spool_path(job_id):
+    job = await _in_session(lambda: IngestionJobRepository().get_fresh(job_id))
+    return job.file_path
+
+
+async def _wait_for(job_id, status):
+    for _ in range(500):
+        job = await _in_session(lambda: container.ingestion_job_service.get_job(job_id))
+        if job.status == status:
+            return job
+        await asyncio.sleep(0.02)
+    raise AssertionError(f"job {job_id} is still {job.status}")
+
+
+def _flaky_service(calls: int) -> IngestionJobService:
+    document_service = DocumentService(
+        DocumentRepository(), UnitOfWork(), container.embedder, container.vector_store, _FailingBatcher(calls),
+        container.lexical_index,
+    )
+    return IngestionJobService(IngestionJobRepository(), document_service, UnitOfWork())
+
+
+async def _crash_and_resume():
+    flaky = _flaky_service(2)
+    job = await _in_session(lambda: flaky.enqueue("resume.md", io.BytesIO(RESUME_DOC.encode()), "text/markdown"))
+    assert os.path.exists(await _spool_path(job.id))
+
+    # two batches commit, the third fails: the job stops with its resume point at four chunks
+    assert await IngestionWorkerPool(db_base.SessionLocal, flaky, workers=1, poll_seconds=1).run_once()
+    failed = await _in_session(lambda: flaky.get_job(job.id))
+    assert failed.status == "failed" and failed.error == "embedding backend unavailable"
+    assert failed.committed_chunks == 4 and failed.total_chunks > 4
+    before = await _chunks(failed.document_id)
+    assert [ordinal for ordinal, _ in before] == [0, 1, 2, 3]
+
+    # the worker "died" mid-job: still running, but its heartbeat is long past the stale window
+    async def crash():
+        async with UnitOfWork():
+            await IngestionJobRepository().set_values(
+                job.id, status="running", error=None, finished_at=None,
+                updated_at=datetime.now(timezone.utc) - timedelta(hours=1),
+            )
+    await _in_session(crash)
+
+    pool = IngestionWorkerPool(db_base.SessionLocal, container.ingestion_job_service, workers=2, poll_seconds=30)
+    pool.start()
+    try:
+        resumed = await _wait_for(job.id, "succeeded")
+        # a job enqueued while the pool idles is picked up at once rather than at the next poll
+        other = await _in_session(
+            lambda: container.ingestion_job_service.enqueue("woken.md", io.BytesIO(b"Wokenword " * 50), "text/markdown")
+        )
+        woken = await _wait_for(other.id, "succeeded")
+        # a job commits before its worker counts it, so stopping straight away could cut the count short
+        for _ in range(500):
+            if pool.jobs_run == 2:
+                break
+            await asyncio.sleep(0.02)
+    finally:
+        await pool.stop()
+    assert pool.jobs_run == 2 and woken.outcome == "created"
+
+    assert resumed.attempts == 2 and resumed.outcome == "created"
+    assert resumed.committed_chunks == resumed.total_chunks and resumed.progress == 1.0
+    after = await _chunks(resumed.document_id)
+    assert [ordinal for ordinal, _ in after] == list(range(resumed.total_chunks))
+    # the chunks committed before the crash were kept, not written again
+    assert after[:4] == before
+    assert not os.path.exists(await _spool_path(job.id))
+    hits = await _in_session(lambda: container.document_service.search("Resumeword", 3, "lexical"))
+    assert hits and hits[0].source == "resume.md"
+
+
+def test_crashed_job_resumes_from_last_committed_batch(app, monkeypatch):
+    monkeypatch.setattr(ingestion_job_module.settings, "INGEST_JOB_BATCH_CHUNKS", 2)
+    asyncio.run(_crash_and_resume())
+
+
+async def _same_source_twice():
+    first, second = ("Firstversionword " * 600).encode(), ("Secondversionword " * 500).encode()
+    service = container.ingestion_job_service
+    jobs = [
+        await _in_session(lambda body=body: service.enqueue("twice.md", io.BytesIO(body), "text/markdown"))
+        for body in (first, second)
+    ]
+    pool = IngestionWorkerPool(db_base.SessionLocal, service, workers=2, poll_seconds=0.05)
+    pool.start()
+    try:
+        done = [await _wait_for(job.id, "succeeded") for job in jobs]
+    finally:
+        await pool.stop()
+    # the second job waited for the first instead of writing into the same document alongside it
+    assert done[0].started_at <= done[0].finished_at <= done[1].started_at
+    assert done[0].document_id == done[1].document_id and done[1].outcome == "updated"
+    assert [ordinal for ordinal, _ in await _chunks(done[1].document_id)] == list(range(done[1].total_chunks))
+    hits = await _in_session(lambda: container.document_service.search("Firstversionword", 3, "lexical"))
+    assert not [hit for hit in hits if hit.source == "twice.md"]
+    hits = await _in_session(lambda: container.document_service.search("Secondversionword", 3, "lexical"))
+    assert hits and hits[0].source == "twice.md"
+
+
+def test_jobs_for_one_source_run_one_at_a_time(app, monkeypatch):
+    monkeypatch.setattr(ingestion_job_module.settings, "INGEST_JOB_BATCH_CHUNKS", 2)
+    asyncio.run(_same_source_twice())
+
+
+async def _taken_over():
+    service = container.ingestion_job_service
+    job = await _in_session(
+        lambda: service.enqueue("takeover.md", io.BytesIO(b"Takeoverword " * 400), "text/markdown")
+    )
+    job_id, attempt = await _in_session(service.claim_next)
+    assert job_id == job.id and attempt == 1
+
+    # this worker went quiet past the stale window and another one claimed the job
+    async def go_stale():
+        async with UnitOfWork():
+            await IngestionJobRepository().set_values(job_id, updated_at=datetime.now(timezone.utc) - timedelta(hours=1))
+    await _in_session(go_stale)
+    assert await _in_session(service.claim_next) == (job_id, 2)
+
+    # the first worker wakes up and carries on: it is fenced off before writing anything
+    late = await _in_session(lambda: service.run_job(job_id, attempt))
+    assert late.status == "running" and late.attempts == 2
+    assert late.document_id is None and late.committed_chunks == 0 and late.error is None
+
+    done = await _in_session(lambda: service.run_job(job_id, 2))
+    assert done.status == "succeeded" and done.committed_chunks == done.total_chunks
+    assert [ordinal for ordinal, _ in await _chunks(done.document_id)] == list(range(done.total_chunks))
+
+
+def test_worker_that_lost_its_job_writes_nothing(app):
+    asyncio.run(_taken_over())
+
+
+async def _abandoned_uploads():
+    service = container.ingestion_job_service
+    queued = await _in_session(lambda: service.enqueue("dropped.md", io.BytesIO(b"Droppedword " * 50), "text/markdown"))
+    path = await _spool_path(queued.id)
+    await _in_session(lambda: service.cancel(queued.id))
+    assert not os.path.exists(path) and await _spool_path(queued.id) is None
+    with pytest.raises(HTTPException) as discarded:
+        await _in_session(lambda: service.retry(queued.id))
+    assert discarded.value.status_code == 409
+
+    # a failed job keeps its upload for a retry while it is inside the retention window
+    flaky = _flaky_service(0)
+    job = await _in_session(lambda: flaky.enqueue("abandoned.md", io.BytesIO(b"Abandonedword " * 50), "text/markdown"))
+    path = await _spool_path(job.id)
+    worker = IngestionWorkerPool(db_base.SessionLocal, flaky, workers=1, poll_seconds=1)
+    assert await worker.run_once()
+    await IngestionWorkerPool(db_base.SessionLocal, service, workers=1, poll_seconds=1).sweep_uploads()
+    assert os.path.exists(path)
+    assert (await _in_session(lambda: service.retry(job.id))).status == "queued"
+    assert await worker.run_once()
+
+    async def age():
+        async with UnitOfWork():
+            await IngestionJobRepository().set_values(job.id, finished_at=datetime.now(timezone.utc) - timedelta(hours=73))
+    await _in_session(age)
+    await IngestionWorkerPool(db_base.SessionLocal, service, workers=1, poll_seconds=1).sweep_uploads()
+    assert not os.path.exists(path) and await _spool_path(job.id) is None
+    with pytest.raises(HTTPException):
+        await _in_session(lambda: service.retry(job.id))
+
+
+def test_uploads_of_abandoned_jobs_are_discarded(app, monkeypatch):
+    monkeypatch.setattr(ingestion_job_module.settings, "INGEST_SPOOL_RETENTION_HOURS", 72)
+    asyncio.run(_abandoned_uploads())
+
+
+class _UnreleasableJobs:
+    # hands out one job that never finishes and whose release fails, like a database that stays locked
+    def __init__(self):
+        self.notify = None
+        self.started = asyncio.Event()
+        self.released = []
+
+    async def claim_next(self):
+        return (7, 1) if not self.started.is_set() else None
+
+    async def run_job(self, job_id, attempt):
+        self.started.set()
+        await asyncio.Event().wait()
+
+    async def release(self, job_id, attempt):
+        self.released.append((job_id, attempt))
+        raise RuntimeError("database is locked")
+
+
+async def _stop_mid_job():
+    jobs = _UnreleasableJobs()
+    pool = IngestionWorkerPool(db_base.SessionLocal, jobs, workers=1, poll_seconds=0.05)
+    pool.start()
+    await asyncio.wait_for(jobs.started.wait(), 5)
+    await asyncio.wait_for(pool.stop(), 5)
+    return jobs.released
+
+
+def test_stop_is_not_blocked_by_a_failed_release(app, caplog):
+    assert asyncio.run(_stop_mid_job()) == [(7, 1)]
+    assert "Could not release ingestion job 7" in caplog.text
@@ -0,0 +1,32 @@
+import asyncio
+from datetime import timedelta
+
+from sqlalchemy import func, select
+
+from backend.app.db import base as db_base
+from backend.app.model.refresh_token import RefreshToken
+from backend.app.service.token_sweeper import RefreshTokenSweeper
+
+from ..routers.test_auth import _login
+
+
+async def _count_tokens(revoked: bool) -> int:
+    async with db_base.SessionLocal() as session:
+        return await session.scalar(
+            select(func.count()).select_from(RefreshToken).where(RefreshToken.revoked.is_(revoked))
+        )
+
+
+def test_sweep_once_deletes_revoked_tokens_in_batches(client, admin_credentials):
+    for _ in range(3):
+        refresh_token = _login(client, **admin_credentials).cookies.get("refresh_token")
+    client.post("/api/auth/logout/all", cookies={"refresh_token": refresh_token})
+    assert asyncio.run(_count_tokens(revoked=True)) >= 3
+
+    sweeper = RefreshTokenSweeper(db_base.SessionLocal, interval_seconds=0, batch_size=2, grace=timedelta(0))
+    swept = asyncio.run(sweeper.sweep_once())
+
+    assert swept >= 3
+    assert sweeper.rows_swept == swept
+    assert sweeper.runs == 1
+    assert asyncio.run(_count_tokens(revoked=True)) == 0
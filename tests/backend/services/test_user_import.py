@@ -0,0 +1,35 @@
+import asyncio
+
+from backend.app.db import base as db_base
+from backend.app.model.user import User
+from backend.app.repository.base import UnitOfWork
+from backend.app.repository.user import UserRepository
+from backend.app.service.user import UserService
+
+
+class _RacingRepository(UserRepository):
+    # before each of the first inserts, another request commits one of the names being imported
+    def __init__(self, racing: list[str]):
+        super().__init__()
+        self.racing = racing
+
+    async def insert_many(self, rows):
+        if self.racing:
+            self.db.add(User(name=self.racing.pop(0), password="taken", role="user", is_active=True))
+            await self.db.commit()
+        return await super().insert_many(rows)
+
+
+async def _import(rows, racing):
+    async with db_base.SessionLocal() as session:
+        with db_base.bind_session(session):
+            return await UserService(_RacingRepository(racing), UnitOfWork()).import_users(rows)
+
+
+def test_import_keeps_reporting_through_repeated_concurrent_creates(app):
+    rows = [{"name": f"racer_{index}", "password": "racer123", "userRole": "user"} for index in range(4)]
+    report = asyncio.run(_import(rows, ["racer_1", "racer_3"]))
+
+    assert (report.created, report.duplicates, report.invalid) == (2, 2, 0)
+    assert [result.status for result in report.results] == ["created", "duplicate", "created", "duplicate"]
+    assert all(result.id is not None for result in report.results if result.status == "created")